@@ -1,7 +1,222 @@
-"""Audit logging for security tracking"""
-from datetime import datetime
+"""Audit logging for security tracking
+
+Events are queued in a bounded in-process buffer and written to audit_logs in
+batches by ``AuditWriter`` (on AUDIT_BATCH_SIZE or every AUDIT_FLUSH_SECONDS),
+so audited requests don't wait on a database round trip. When the buffer is
+full events are dropped and counted, or with AUDIT_BLOCK_WHEN_FULL the caller
+waits up to AUDIT_BLOCK_TIMEOUT_SECONDS for room. Until the writer is started
+(scripts, tests) events are inserted directly.
+
+Every write also bumps per-action-per-hour counters in audit_hourly, which the
+summary endpoint aggregates instead of scanning audit_logs.
+"""
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from pymongo import UpdateOne
+from .core.settings import settings
 from .db import get_database
+from .monitoring import audit_queue_depth, audit_flush_duration, audit_events_total
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+async def bump_hourly_counts(db, records: list):
+    """Add a batch of written records to the audit_hourly pre-aggregates"""
+    counts = Counter()
+    failed = Counter()
+    for record in records:
+        key = (record.get("action") or "unknown", hour_bucket(record["timestamp"]))
+        counts[key] += 1
+        if record.get("status", "success") != "success":
+            failed[key] += 1
+    if not counts:
+        return
+    await db.audit_hourly.bulk_write([
+        UpdateOne(
+            {"_id": {"action": action, "hour": hour}},
+            {"$inc": {"count": count, "failed": failed[(action, hour)]}, "$set": {"action": action, "hour": hour}},
+            upsert=True
+        )
+        for (action, hour), count in counts.items()
+    ], ordered=False)
+
+
+async def rebuild_hourly_counts(since: datetime, until: Optional[datetime] = None) -> int:
+    """Recompute audit_hourly for [since, until) from audit_logs.
+
+    Used to backfill history and to repair counters after failed writes; by
+    default stops at the current hour, which is still receiving live increments.
+    Starts no earlier than the first whole hour still inside
+    AUDIT_LOG_RETENTION_DAYS: older logs have been archived, so their rollups
+    could be deleted but not recomputed.
+    """
+    db = get_database()
+    if db is None:
+        return 0
+    retained = hour_bucket(datetime.utcnow() - timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS)) + timedelta(hours=1)
+    since = max(hour_bucket(since), retained)
+    until = hour_bucket(until or datetime.utcnow())
+    if until <= since:
+        return 0
+
+    hour = {"$dateFromParts": {
+        "year": {"$year": "$timestamp"}, "month": {"$month": "$timestamp"},
+        "day": {"$dayOfMonth": "$timestamp"}, "hour": {"$hour": "$timestamp"}
+    }}
+    await db.audit_hourly.delete_many({"hour": {"$gte": since, "$lt": until}})
+    await db.audit_logs.aggregate([
+        {"$match": {"timestamp": {"$gte": since, "$lt": until}}},
+        {"$group": {
+            "_id": {"action": {"$ifNull": ["$action", "unknown"]}, "hour": hour},
+            "count": {"$sum": 1},
+            "failed": {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$status", "success"]}, "success"]}, 0, 1]}}
+        }},
+        {"$set": {"action": "$_id.action", "hour": "$_id.hour"}},
+        {"$merge": {"into": "audit_hourly", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ]).to_list(None)
+    return await db.audit_hourly.count_documents({"hour": {"$gte": since, "$lt": until}})
+
+
+class AuditWriter:
+    """Bounded queue drained into audit_logs with insert_many by a background task"""
+
+    def __init__(self, max_size: Optional[int] = None, batch_size: Optional[int] = None, flush_seconds: Optional[float] = None):
+        self.max_size = max_size or settings.AUDIT_BUFFER_SIZE
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_seconds = flush_seconds or settings.AUDIT_FLUSH_SECONDS
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything queued, giving up after AUDIT_DRAIN_TIMEOUT_SECONDS"""
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._task, settings.AUDIT_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            dropped = self._queue.qsize()
+            audit_events_total.labels(outcome="dropped_shutdown").inc(dropped)
+            print(f"⚠️ Audit writer drain timed out, {dropped} events dropped")
+        self._task = None
+
+    async def submit(self, record: dict) -> bool:
+        """Queue a record; returns False if it was dropped"""
+        if not self.running or self._stopping:
+            return await self._write_direct(record)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if not settings.AUDIT_BLOCK_WHEN_FULL:
+                audit_events_total.labels(outcome="dropped_full").inc()
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(record), settings.AUDIT_BLOCK_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                audit_events_total.labels(outcome="dropped_full").inc()
+                return False
+        audit_queue_depth.set(self._queue.qsize())
+        return True
+
+    async def _write_direct(self, record: dict) -> bool:
+        db = get_database()
+        if db is None:
+            print(f"⚠️ Database unavailable for audit: {record.get('action')}")
+            return False
+        try:
+            await db.audit_logs.insert_one(record)
+            audit_events_total.labels(outcome="written").inc()
+        except Exception as e:
+            print(f"⚠️ Error logging audit event: {str(e)}")
+            audit_events_total.labels(outcome="failed").inc()
+            return False
+        await self._bump_hourly(db, [record])
+        return True
+
+    async def _next_batch(self) -> list:
+        batch = []
+        # First event: wait at most one interval so shutdown is noticed
+        try:
+            batch.append(await asyncio.wait_for(self._queue.get(), self.flush_seconds))
+        except asyncio.TimeoutError:
+            return batch
+
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if self._stopping or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._next_batch()
+            audit_queue_depth.set(self._queue.qsize())
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        db = get_database()
+        if db is None:
+            print(f"⚠️ Database unavailable for audit, {len(batch)} events dropped")
+            audit_events_total.labels(outcome="failed").inc(len(batch))
+            return
+        start = time.perf_counter()
+        try:
+            await db.audit_logs.insert_many(batch, ordered=False)
+            audit_events_total.labels(outcome="written").inc(len(batch))
+        except Exception as e:
+            print(f"⚠️ Error writing {len(batch)} audit events: {str(e)}")
+            audit_events_total.labels(outcome="failed").inc(len(batch))
+            audit_flush_duration.observe(time.perf_counter() - start)
+            return
+        await self._bump_hourly(db, batch)
+        audit_flush_duration.observe(time.perf_counter() - start)
+
+    async def _bump_hourly(self, db, records: list):
+        try:
+            await bump_hourly_counts(db, records)
+        except Exception as e:
+            # The audit_rollup job rebuilds recent hours from audit_logs
+            print(f"⚠️ Could not update audit_hourly: {str(e)}")
+
+
+audit_writer = AuditWriter()
+
+
+def start_audit_writer():
+    audit_writer.start()
+
+
+async def stop_audit_writer():
+    await audit_writer.stop()
 
 
 async def log_audit_event(
@@ -13,27 +228,17 @@ async def log_audit_event(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ):
-    """Log an audit event to audit_logs collection"""
-    db = get_database()
-    if db is None:
-        print(f"⚠️ Database unavailable for audit: {action}")
-        return
-    
-    try:
-        audit_log = {
-            "action": action,
-            "user_id": user_id,
-            "resource": resource,
-            "status": status,
-            "details": details or {},
-            "ip_address": ip_address,
-            "user_agent": user_agent,
-            "timestamp": datetime.utcnow()
-        }
-        
-        await db.audit_logs.insert_one(audit_log)
-    except Exception as e:
-        print(f"⚠️ Error logging audit event: {str(e)}")
+    """Queue an audit event for the audit_logs collection"""
+    await audit_writer.submit({
+        "action": action,
+        "user_id": user_id,
+        "resource": resource,
+        "status": status,
+        "details": details or {},
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "timestamp": datetime.utcnow()
+    })
 
 
 async def log_login_attempt(email: str, success: bool, ip: Optional[str] = None, user_agent: Optional[str] = None):
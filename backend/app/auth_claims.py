@@ -0,0 +1,107 @@
+"""Authorization claims carried in access tokens
+
+Access tokens for regular users carry ``role``, ``membership_status``,
+``department`` and ``name`` plus ``ver``, the user's ``auth_version`` at issue
+time. Any change to role, membership or department bumps ``auth_version`` and
+records it in ``auth_changes``; every worker keeps the recent changes in memory
+(synced like the revocation filter), so a token with an older ``ver`` falls
+back to loading the user document instead of trusting stale claims.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from bson import ObjectId
+
+from .core.settings import settings
+from .db import get_database
+
+CLAIM_FIELDS = ("role", "membership_status", "department", "name")
+# Recorded for deleted users so every outstanding token is stale
+REMOVED_VERSION = 2 ** 31
+
+
+def user_claims(user: dict) -> dict:
+    """Token payload for a user document"""
+    claims = {"sub": str(user["_id"]), "ver": user.get("auth_version", 0)}
+    for field in CLAIM_FIELDS:
+        if user.get(field) is not None:
+            claims[field] = user[field]
+    return claims
+
+
+class AuthVersionFilter:
+    """user_id -> latest auth_version for users changed within one token lifetime"""
+
+    def __init__(self):
+        self._versions: dict = {}
+        self._synced_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_stale(self, user_id: str, version: int) -> bool:
+        latest = self._versions.get(user_id)
+        return latest is not None and latest[0] > version
+
+    async def record_change(self, user_ids: Iterable):
+        """Bump auth_version for users whose role/membership/department changed (or who were deleted)"""
+        db = get_database()
+        if db is None:
+            return
+        ids = [ObjectId(str(u)) for u in user_ids]
+        if not ids:
+            return
+        await db.users.update_many({"_id": {"$in": ids}}, {"$inc": {"auth_version": 1}})
+        now = datetime.utcnow()
+        expires_at = now + self._lifetime()
+        versions = {str(u): REMOVED_VERSION for u in ids}
+        async for u in db.users.find({"_id": {"$in": ids}}, {"auth_version": 1}):
+            versions[str(u["_id"])] = u.get("auth_version", 0)
+        changes = [{"user_id": user_id, "version": version, "changed_at": now, "expires_at": expires_at}
+                   for user_id, version in versions.items()]
+        for change in changes:
+            self._versions[change["user_id"]] = (change["version"], expires_at)
+        await db.auth_changes.insert_many(changes, ordered=False)
+
+    async def sync(self):
+        db = get_database()
+        if db is None:
+            return
+        now = datetime.utcnow()
+        query = {"expires_at": {"$gt": now}}
+        if self._synced_until is not None:
+            query["changed_at"] = {"$gte": self._synced_until - timedelta(seconds=settings.REVOCATION_SYNC_SECONDS)}
+        async for change in db.auth_changes.find(query, {"user_id": 1, "version": 1, "expires_at": 1}):
+            current = self._versions.get(change["user_id"])
+            if current is None or current[0] < change["version"]:
+                self._versions[change["user_id"]] = (change["version"], change["expires_at"])
+        self._synced_until = now
+        for user_id in [u for u, (_, expires_at) in self._versions.items() if expires_at <= now]:
+            del self._versions[user_id]
+
+    def _lifetime(self) -> timedelta:
+        # Older tokens have expired by then, so the entry can go
+        return timedelta(minutes=settings.JWT_ACCESS_EXPIRATION_MINUTES, seconds=settings.REVOCATION_SYNC_SECONDS * 2)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"⚠️ Auth version sync failed: {str(e)}")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+
+auth_versions = AuthVersionFilter()
@@ -0,0 +1,116 @@
+"""Per-collection change counters and conditional GET for public endpoints
+
+Every write to a collection behind a public, cacheable endpoint calls
+``change_counters.bump(collection)``, which increments that collection's
+document in ``change_counters``. Each worker keeps the versions in memory and
+re-reads the (few, tiny) counter documents every CHANGE_COUNTER_SYNC_SECONDS,
+so an ETag is built from memory alone and a matching ``If-None-Match`` is
+answered with 304 before the handler touches Mongo. A write is visible on the
+worker that made it at once and on the others within one sync interval.
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from pymongo import ReturnDocument
+
+from .core.settings import settings
+from .db import get_database
+
+
+class ChangeCounters:
+    """collection -> version, bumped on write and synced from Mongo"""
+
+    def __init__(self):
+        self.versions: dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def version(self, collection: str) -> int:
+        return self.versions.get(collection, 0)
+
+    def etag(self, key: str, *collections: str) -> str:
+        # Weak: the compression middleware re-encodes the body
+        stamp = ".".join(str(self.version(c)) for c in collections)
+        return f'W/"{key}-{stamp}"'
+
+    def _observe(self, collection: str, version: int):
+        if version > self.versions.get(collection, 0):
+            self.versions[collection] = version
+
+    async def bump(self, *collections: str):
+        """Record a write; never fails the write itself"""
+        db = get_database()
+        for collection in collections:
+            try:
+                if db is None:
+                    raise RuntimeError("Database unavailable")
+                doc = await db.change_counters.find_one_and_update(
+                    {"_id": collection},
+                    {"$inc": {"version": 1}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                self._observe(collection, doc["version"])
+            except Exception as e:
+                # Still change this worker's ETags; others catch up on the next successful bump
+                self.versions[collection] = self.versions.get(collection, 0) + 1
+                print(f"⚠️ Change counter bump failed for {collection}: {str(e)}")
+
+    async def sync(self):
+        db = get_database()
+        if db is None:
+            return
+        async for doc in db.change_counters.find({}):
+            self._observe(doc["_id"], doc.get("version", 0))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"⚠️ Change counter sync failed: {str(e)}")
+            await asyncio.sleep(settings.CHANGE_COUNTER_SYNC_SECONDS)
+
+
+change_counters = ChangeCounters()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_get(key: str, *collections: str, max_age: Optional[int] = None):
+    """Dependency for a public GET served from ``collections``.
+
+    Answers 304 when the client's ETag is current; otherwise returns the
+    validator headers (already set on the injected Response, so handlers that
+    return a Response object must copy them).
+    """
+    async def dependency(request: Request, response: Response) -> dict:
+        etag = change_counters.etag(key, *(collections or (key,)))
+        age = settings.PUBLIC_CACHE_MAX_AGE if max_age is None else max_age
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={age}, must-revalidate"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return dependency
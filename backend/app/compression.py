@@ -0,0 +1,175 @@
+"""Response compression (brotli / gzip) as a pure ASGI middleware
+
+Compresses responses whose media type has a configured level, once the body
+reaches COMPRESSION_MIN_SIZE bytes. Bodies are buffered only up to that
+threshold: a complete small body goes out untouched, anything larger (or a
+stream that passes the threshold) is compressed chunk by chunk with a sync
+flush per chunk, so streaming responses still stream. Responses that already
+carry a Content-Encoding and media types without a level (images, archives,
+PDFs...) pass through. brotli is used when the client accepts it and the
+``brotli`` package is installed, gzip otherwise.
+"""
+import zlib
+from typing import Optional
+
+from .core.settings import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SKIP_STATUS = {204, 304}
+
+
+def parse_accept_encoding(value: str) -> set:
+    """Codings the client accepts (q > 0)"""
+    accepted = set()
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def level_for(levels: dict, content_type: str) -> Optional[int]:
+    """Exact media type first, then its 'type/' prefix; None means don't compress"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in levels:
+        return levels[media_type]
+    return levels.get(media_type.split("/", 1)[0] + "/")
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None, gzip_levels: Optional[dict] = None,
+                 brotli_levels: Optional[dict] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.gzip_levels = settings.COMPRESSION_GZIP_LEVELS if gzip_levels is None else gzip_levels
+        self.brotli_levels = settings.COMPRESSION_BROTLI_LEVELS if brotli_levels is None else brotli_levels
+
+    def _encoder(self, accepted: set, content_type: str):
+        if brotli is not None and "br" in accepted:
+            quality = level_for(self.brotli_levels, content_type)
+            if quality is not None:
+                return BrotliEncoder(quality)
+        if "gzip" in accepted:
+            level = level_for(self.gzip_levels, content_type)
+            if level is not None:
+                return GzipEncoder(level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        accepted = parse_accept_encoding(accept) if accept else set()
+        if not accepted & {"gzip", "br"}:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        encoder = None
+        buffered = []
+        buffered_size = 0
+        passthrough = False
+        started = False
+
+        async def start_compressed(body: bytes, more_body: bool):
+            headers = [(k, v) for k, v in start_message["headers"] if k not in (b"content-length", b"vary")]
+            vary = [v for k, v in start_message["headers"] if k == b"vary"]
+            headers.append((b"content-encoding", encoder.name.encode()))
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"))
+            payload = encoder.chunk(body) if more_body else encoder.finish(body)
+            if not more_body:
+                headers.append((b"content-length", str(len(payload)).encode()))
+            await send(dict(start_message, headers=headers))
+            await send({"type": "http.response.body", "body": payload, "more_body": more_body})
+
+        async def send_original(body: bytes, more_body: bool):
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        async def wrapped_send(message):
+            nonlocal start_message, encoder, buffered_size, passthrough, started
+
+            if message["type"] == "http.response.start":
+                start_message = dict(message, headers=list(message.get("headers", [])))
+                headers = {k.lower(): v for k, v in start_message["headers"]}
+                length = headers.get(b"content-length")
+                if (message["status"] in SKIP_STATUS or b"content-encoding" in headers
+                        or (length is not None and int(length) < self.minimum_size)):
+                    passthrough = True
+                else:
+                    encoder = self._encoder(accepted, headers.get(b"content-type", b"").decode("latin-1"))
+                    passthrough = encoder is None
+                if passthrough:
+                    await send(start_message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not started:
+                # Still deciding: buffer until the threshold or the end of the body
+                buffered.append(body)
+                buffered_size += len(body)
+                if more_body and buffered_size < self.minimum_size:
+                    return
+                whole = b"".join(buffered)
+                buffered.clear()
+                started = True
+                if not more_body and buffered_size < self.minimum_size:
+                    passthrough = True
+                    await send_original(whole, False)
+                else:
+                    await start_compressed(whole, more_body)
+                return
+
+            await send({"type": "http.response.body",
+                        "body": encoder.chunk(body) if more_body else encoder.finish(body),
+                        "more_body": more_body})
+
+        await self.app(scope, receive, wrapped_send)
@@ -0,0 +1,96 @@
+"""In-process cache of site content (homepage, sections, gallery, featured lists, donation stats)
+
+These collections hold a handful of documents that change maybe weekly but are
+read on every public page view. Each is loaded whole at warm-up and kept in
+memory keyed the way the routes look documents up. Writes go through
+``content_cache.refresh(collection)``, which bumps the collection's change
+counter and reloads it on this worker; other workers see the bumped counter
+on their next change counter sync (every CHANGE_COUNTER_SYNC_SECONDS) and
+reload on the following read. Reads otherwise never touch the database.
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from .change_counters import change_counters
+from .db import get_database
+
+# collection -> how its documents are looked up
+KEYS = {
+    "content": lambda doc: (doc.get("type"), doc.get("name")),
+    "content_sections": lambda doc: doc.get("section_name"),
+    "donation_stats": lambda doc: doc.get("_id"),
+    "settings": lambda doc: doc.get("type"),
+}
+
+
+class ContentCache:
+    def __init__(self):
+        self._docs: dict = {}
+        self._versions: dict = {}
+        self._locks: dict = {}
+        self.loads = 0
+
+    def _stale(self, collection: str) -> bool:
+        loaded = self._versions.get(collection)
+        return loaded is None or change_counters.version(collection) > loaded
+
+    async def _reload(self, collection: str):
+        db = get_database()
+        if db is None:
+            raise RuntimeError("Database unavailable")
+        # Read the version first: a write landing during the query bumps it again
+        version = change_counters.version(collection)
+        docs = await db[collection].find({}).to_list(None)
+        key = KEYS[collection]
+        self._docs[collection] = {key(doc): doc for doc in docs}
+        self._versions[collection] = version
+        self.loads += 1
+
+    async def _ensure(self, collection: str):
+        if not self._stale(collection):
+            return
+        lock = self._locks.setdefault(collection, asyncio.Lock())
+        async with lock:
+            if not self._stale(collection):
+                return
+            try:
+                await self._reload(collection)
+            except Exception as e:
+                if collection not in self._docs:
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
+                print(f"⚠️ Content cache reload failed for {collection}, serving cached copy: {str(e)}")
+
+    async def get(self, collection: str, key) -> Optional[dict]:
+        """Shallow copy of the cached document, or None"""
+        await self._ensure(collection)
+        doc = self._docs[collection].get(key)
+        return dict(doc) if doc is not None else None
+
+    async def values(self, collection: str) -> list:
+        await self._ensure(collection)
+        return [dict(doc) for doc in self._docs[collection].values()]
+
+    async def load(self) -> int:
+        """Warm-up: load every cached collection"""
+        for collection in KEYS:
+            await self._reload(collection)
+        return sum(len(docs) for docs in self._docs.values())
+
+    async def refresh(self, collection: str):
+        """After a write: invalidate on every worker and reload here"""
+        await change_counters.bump(collection)
+        lock = self._locks.setdefault(collection, asyncio.Lock())
+        async with lock:
+            try:
+                await self._reload(collection)
+            except Exception as e:
+                print(f"⚠️ Content cache reload failed for {collection}: {str(e)}")
+
+    def clear(self):
+        self._docs.clear()
+        self._versions.clear()
+
+
+content_cache = ContentCache()
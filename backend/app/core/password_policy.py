@@ -0,0 +1,166 @@
+"""Password hashing policy: scheme selection, cost calibration and rehash checks
+
+The active scheme is PASSWORD_SCHEME (``bcrypt`` or ``argon2id``). Costs start
+from the configured settings (BCRYPT_ROUNDS, ARGON2_*) and can be calibrated to
+take about PASSWORD_TARGET_MS per hash on this hardware, either at startup
+(PASSWORD_CALIBRATE_ON_STARTUP) or once via the CLI, which prints the values to
+pin in the environment:
+
+    cd backend && python -m app.core.password_policy --target-ms 250
+
+Calibration never goes below the configured cost. Hashes made with another
+scheme or a lower cost still verify and are flagged by ``needs_rehash`` so the
+login path can upgrade them.
+"""
+import argparse
+import time
+from typing import Optional
+
+import bcrypt
+
+from .settings import settings
+
+BCRYPT = "bcrypt"
+ARGON2ID = "argon2id"
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_MAX_TIME_COST = 10
+
+
+def _argon2():
+    try:
+        import argon2
+    except ImportError:
+        return None
+    return argon2
+
+
+def identify(hashed: str) -> Optional[str]:
+    if hashed.startswith(("$2a$", "$2b$", "$2y$")):
+        return BCRYPT
+    if hashed.startswith("$argon2id$"):
+        return ARGON2ID
+    return None
+
+
+class PasswordPolicy:
+    def __init__(self, scheme: Optional[str] = None, bcrypt_rounds: Optional[int] = None,
+                 argon2_time_cost: Optional[int] = None, argon2_memory_kib: Optional[int] = None,
+                 argon2_parallelism: Optional[int] = None):
+        scheme = scheme or settings.PASSWORD_SCHEME
+        if scheme == ARGON2ID and _argon2() is None:
+            print("⚠️ argon2-cffi not installed, hashing passwords with bcrypt")
+            scheme = BCRYPT
+        self.scheme = scheme
+        self.bcrypt_rounds = bcrypt_rounds or settings.BCRYPT_ROUNDS
+        self.argon2_time_cost = argon2_time_cost or settings.ARGON2_TIME_COST
+        self.argon2_memory_kib = argon2_memory_kib or settings.ARGON2_MEMORY_KIB
+        self.argon2_parallelism = argon2_parallelism or settings.ARGON2_PARALLELISM
+        self._argon2_hasher = None
+
+    def _hasher(self):
+        if self._argon2_hasher is None:
+            argon2 = _argon2()
+            self._argon2_hasher = argon2.PasswordHasher(
+                time_cost=self.argon2_time_cost,
+                memory_cost=self.argon2_memory_kib,
+                parallelism=self.argon2_parallelism,
+                type=argon2.Type.ID
+            )
+        return self._argon2_hasher
+
+    def hash(self, password: str) -> str:
+        if self.scheme == ARGON2ID:
+            return self._hasher().hash(password)
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.bcrypt_rounds)).decode()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            scheme = identify(hashed)
+            if scheme == BCRYPT:
+                return bcrypt.checkpw(password.encode(), hashed.encode())
+            if scheme == ARGON2ID and _argon2() is not None:
+                return self._hasher().verify(hashed, password)
+        except Exception:
+            pass
+        return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the hash uses another scheme or a lower cost than the policy"""
+        scheme = identify(hashed)
+        if scheme != self.scheme:
+            return True
+        if scheme == BCRYPT:
+            try:
+                return int(hashed.split("$")[2]) < self.bcrypt_rounds
+            except (IndexError, ValueError):
+                return True
+        try:
+            return self._hasher().check_needs_rehash(hashed)
+        except Exception:
+            return True
+
+    def time_hash(self, password: str = "Calibrate#2024", samples: int = 3) -> float:
+        """Median seconds per hash at the current cost"""
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            self.hash(password)
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
+
+    def calibrate(self, target_ms: Optional[float] = None) -> float:
+        """Raise the cost (never lower it) to get closest to target_ms per hash; returns the measured ms"""
+        target = (target_ms or settings.PASSWORD_TARGET_MS) / 1000
+        elapsed = self.time_hash()
+        if self.scheme == ARGON2ID:
+            while elapsed < target and self.argon2_time_cost < ARGON2_MAX_TIME_COST:
+                self.argon2_time_cost += 1
+                self._argon2_hasher = None
+                elapsed = self.time_hash()
+        else:
+            # Each bcrypt round doubles the cost: stop before overshooting by more than half
+            while elapsed * 2 <= target * 1.5 and self.bcrypt_rounds < BCRYPT_MAX_ROUNDS:
+                self.bcrypt_rounds += 1
+                elapsed = self.time_hash()
+        return elapsed * 1000
+
+    def describe(self) -> dict:
+        if self.scheme == ARGON2ID:
+            return {"scheme": ARGON2ID, "time_cost": self.argon2_time_cost,
+                    "memory_kib": self.argon2_memory_kib, "parallelism": self.argon2_parallelism}
+        return {"scheme": BCRYPT, "rounds": self.bcrypt_rounds}
+
+    def env(self) -> dict:
+        """Settings that pin this policy"""
+        if self.scheme == ARGON2ID:
+            return {"PASSWORD_SCHEME": ARGON2ID, "ARGON2_TIME_COST": self.argon2_time_cost,
+                    "ARGON2_MEMORY_KIB": self.argon2_memory_kib, "ARGON2_PARALLELISM": self.argon2_parallelism}
+        return {"PASSWORD_SCHEME": BCRYPT, "BCRYPT_ROUNDS": self.bcrypt_rounds}
+
+
+password_policy = PasswordPolicy()
+
+
+def calibrate_password_policy():
+    """Startup hook: tune the cost to this host when enabled"""
+    if not settings.PASSWORD_CALIBRATE_ON_STARTUP:
+        return
+    elapsed = password_policy.calibrate()
+    print(f"✅ Password hashing calibrated: {password_policy.describe()} ({elapsed:.0f} ms/hash)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate password hashing cost for this host")
+    parser.add_argument("--scheme", choices=[BCRYPT, ARGON2ID], default=settings.PASSWORD_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_TARGET_MS)
+    args = parser.parse_args()
+
+    policy = PasswordPolicy(scheme=args.scheme)
+    elapsed = policy.calibrate(args.target_ms)
+    print(f"{policy.describe()}: {elapsed:.0f} ms/hash, ~{1000 / elapsed:.1f} logins/s per core")
+    for key, value in policy.env().items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import uuid
 import jwt
 from jwt import InvalidTokenError
-import bcrypt
+import asyncio
 from .settings import settings
+from .password_policy import password_policy
 import re
 
 
@@ -21,15 +23,40 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
-    except Exception:
-        return False
+    return password_policy.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash password with bcrypt using configured rounds"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+    """Hash password with the active policy (scheme and calibrated cost)"""
+    return password_policy.hash(password)
+
+
+async def hash_password(password: str) -> str:
+    """get_password_hash off the event loop; the calibrated cost can be hundreds of ms"""
+    return await asyncio.to_thread(password_policy.hash, password)
+
+
+_admin_hash_reported = False
+
+
+async def verify_admin_password(plain_password: str) -> bool:
+    """Verify against ADMIN_PASSWORD_HASH off the event loop. The env hash can't be
+    replaced from here, so one below policy is only reported (once) instead of rehashed"""
+    global _admin_hash_reported
+    valid = await asyncio.to_thread(password_policy.verify, plain_password, settings.ADMIN_PASSWORD_HASH)
+    if valid and not _admin_hash_reported and password_policy.needs_rehash(settings.ADMIN_PASSWORD_HASH):
+        _admin_hash_reported = True
+        print(f"⚠️ ADMIN_PASSWORD_HASH is below the password policy ({password_policy.describe()}); regenerate it")
+    return valid
+
+
+async def verify_and_rehash(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify off the event loop; returns (valid, new_hash) where new_hash is set when
+    the stored hash is below the current policy and should be replaced"""
+    valid = await asyncio.to_thread(password_policy.verify, plain_password, hashed_password)
+    if not valid or not password_policy.needs_rehash(hashed_password):
+        return valid, None
+    return True, await asyncio.to_thread(password_policy.hash, plain_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -39,7 +66,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_EXPIRATION_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -51,7 +78,7 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
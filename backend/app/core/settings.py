@@ -7,12 +7,24 @@ class Settings(BaseSettings):
     # Database
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "alumni_portal")
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_POOL_SIZE: int = 100
+    
+    # Warm-up before /api/ready reports ready
+    WARMUP_STEP_TIMEOUT_SECONDS: float = 30.0
+    WARMUP_RETRY_BASE_SECONDS: float = 1.0
+    WARMUP_RETRY_MAX_SECONDS: float = 60.0
+    STUDENT_MASTER_LOOKUP_SECONDS: float = 600.0
+    STUDENT_MASTER_LOOKUP_MAX: int = 200000
     
     # JWT - Production Grade Security
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_EXPIRATION_MINUTES: int = 15  # Short-lived access token
     JWT_REFRESH_EXPIRATION_DAYS: int = 7  # Longer-lived refresh token
+    REFRESH_COOKIE_NAME: str = "refresh_token"
+    REFRESH_COOKIE_SAMESITE: str = os.getenv("REFRESH_COOKIE_SAMESITE", "lax")
+    REFRESH_REUSE_GRACE_SECONDS: int = 10
     MAX_REFRESH_TOKENS_PER_USER: int = 3  # Max concurrent sessions
     
     # Admin
@@ -23,6 +35,24 @@ class Settings(BaseSettings):
     RZP_KEY_ID: str = os.getenv("RZP_KEY_ID", "")
     RZP_KEY_SECRET: str = os.getenv("RZP_KEY_SECRET", "")
     RZP_WEBHOOK_SECRET: str = os.getenv("RZP_WEBHOOK_SECRET", "")
+    RZP_API_BASE_URL: str = os.getenv("RZP_API_BASE_URL", "https://api.razorpay.com/v1")
+    RZP_TIMEOUT_SECONDS: float = 10.0
+    RZP_MAX_RETRIES: int = 2
+    RZP_POOL_MAX_CONNECTIONS: int = 50
+    RZP_POOL_MAX_KEEPALIVE: int = 20
+    RZP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    RZP_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Webhook processing
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_POLL_SECONDS: float = 5.0
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_LEASE_SECONDS: int = 60
+    
+    # Settlement reconciliation
+    RECON_SORT_CHUNK_ROWS: int = 100000
+    RECON_DB_BATCH_SIZE: int = 1000
+    RECON_WRITE_BATCH_SIZE: int = 500
     
     # URLs
     BACKEND_URL: str = os.getenv("BACKEND_URL", "http://localhost:8000")
@@ -30,14 +60,95 @@ class Settings(BaseSettings):
     
     # Payments
     MEMBERSHIP_AMOUNT: int = 50000
+    ORDER_IDEMPOTENCY_WINDOW_MINUTES: int = 15
+    ORDER_IDEMPOTENCY_CACHE_SECONDS: int = 60
+    ORDER_IDEMPOTENCY_CACHE_SIZE: int = 10000
+    
+    # Background jobs
+    UPGRADE_BATCH_SIZE: int = 1000
+    INSTANCE_ID: str = os.getenv("INSTANCE_ID", "")
+    SCHEDULER_LEASE_TTL_SECONDS: int = 30
+    DISCUSSION_INACTIVE_DAYS: int = 30
+    STALE_ORDER_HOURS: int = 24
+    ROLLUP_DAYS: int = 2
+
+    # Audit log writer
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1.0
+    AUDIT_BLOCK_WHEN_FULL: bool = False
+    AUDIT_BLOCK_TIMEOUT_SECONDS: float = 0.5
+    AUDIT_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    AUDIT_ROLLUP_HOURS: int = 3
+    AUDIT_PAGE_MAX: int = 500
+
+    # Retention (days); notifications expire via TTL, the rest are archived
+    # (login_counters expire on their own expires_at)
+    # "file" needs ARCHIVE_DIR on a persistent volume; instance disks are wiped on redeploy
+    ARCHIVE_BACKEND: str = os.getenv("ARCHIVE_BACKEND", "collection")
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "")
+    ARCHIVE_BATCH_SIZE: int = 5000
+    AUDIT_LOG_RETENTION_DAYS: int = 180
+    NOTIFICATION_TTL_DAYS: int = 180
+    WEBHOOK_LOG_RETENTION_DAYS: int = 90
+    UPGRADE_LOG_RETENTION_DAYS: int = 365
+    MODERATION_LOG_RETENTION_DAYS: int = 365
+    EMAIL_LOG_RETENTION_DAYS: int = 180
+    
+    # Importing app.main (all route modules) and building the app; checked by tests/test_startup_time.py
+    STARTUP_BUDGET_SECONDS: float = 5.0
     
     # Security
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    # Password hashing: "bcrypt" or "argon2id" (needs argon2-cffi); costs are floors for calibration
+    PASSWORD_SCHEME: str = "bcrypt"
+    PASSWORD_TARGET_MS: float = 250.0
+    PASSWORD_CALIBRATE_ON_STARTUP: bool = False
     BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_KIB: int = 65536
+    ARGON2_PARALLELISM: int = 1
     MAX_LOGIN_ATTEMPTS: int = 5
     LOCKOUT_DURATION_MINUTES: int = 10
+    LOCKOUT_BUCKETS: int = 10
+    LOCKOUT_CACHE_SECONDS: float = 5.0
+    LOCKOUT_CACHE_SIZE: int = 10000
+    REVOCATION_SYNC_SECONDS: float = 5.0
+    # Public GET caching: ETags from per-collection change counters
+    CHANGE_COUNTER_SYNC_SECONDS: float = 2.0
+    PUBLIC_CACHE_MAX_AGE: int = 30
+    LANDING_CACHE_SECONDS: float = 10.0
+    # Identical concurrent reads share one query
+    SINGLE_FLIGHT_ENABLED: bool = True
+    RATE_LIMIT_ENABLED: bool = True
+    # "" for per-process limits, redis://host:6379/0 to share them across workers
+    RATE_LIMIT_STORAGE_URL: str = os.getenv("RATE_LIMIT_STORAGE_URL", "")
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100000
+    # Comma-separated IPs/CIDRs of reverse proxies whose X-Forwarded-For is believed
+    RATE_LIMIT_TRUSTED_PROXIES: str = os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "")
     PASSWORD_HISTORY_COUNT: int = 3
     
+    # Response compression: levels per media type ("type/" prefix matches the
+    # whole family); types without a level (images, archives, PDFs) are not compressed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVELS: dict = {
+        "application/json": 6,
+        "text/csv": 6,
+        "text/": 6,
+        "application/javascript": 6,
+        "application/xml": 6,
+        "image/svg+xml": 6,
+    }
+    COMPRESSION_BROTLI_LEVELS: dict = {
+        "application/json": 4,
+        "text/csv": 5,
+        "text/": 5,
+        "application/javascript": 5,
+        "application/xml": 5,
+        "image/svg+xml": 5,
+    }
+    
     # File Upload
     MAX_FILE_SIZE_MB: int = 5
     ALLOWED_IMAGE_TYPES: list = ["jpg", "jpeg", "png", "webp"]
@@ -1,13 +1,98 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from .db import get_database
-from .core.security import get_password_hash
+from .core.security import hash_password
+from .auth_claims import CLAIM_FIELDS, auth_versions
+from .change_counters import change_counters
+from .core.settings import settings
+from .services.email_service import send_bulk_email_in_background
 from typing import Optional
 from fastapi import HTTPException, status
+import asyncio
+import time
 import uuid
 
 
+class StudentMasterLookup:
+    """Active student_master records keyed by (registration_number, department, passout_year).
+
+    Loaded at warm-up; hits are served from memory while the snapshot is younger
+    than STUDENT_MASTER_LOOKUP_SECONDS and the ``student_master`` change counter
+    has not moved since it was taken, misses still go to the database so
+    uploads from other workers are found. A stale snapshot is reloaded in the
+    background; until then every lookup goes to the database, so a record an
+    admin removed stops matching within one counter sync.
+    """
+
+    FIELDS = {"registration_number": 1, "department": 1, "passout_year": 1, "name": 1, "status": 1}
+
+    def __init__(self):
+        self._records: dict = {}
+        self._loaded_at: Optional[float] = None
+        self._version = 0
+        self._reloading = False
+
+    def __len__(self):
+        return len(self._records)
+
+    @staticmethod
+    def key(registration_number: str, department: str, passout_year: int) -> tuple:
+        return registration_number, department, passout_year
+
+    @property
+    def fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < settings.STUDENT_MASTER_LOOKUP_SECONDS \
+            and change_counters.version("student_master") <= self._version
+
+    async def load(self) -> int:
+        db = get_database()
+        if db is None:
+            return 0
+        # Read the version first: a write landing during the query bumps it again
+        version = change_counters.version("student_master")
+        records = {}
+        async for record in db.student_master.find({"status": "active"}, self.FIELDS).limit(settings.STUDENT_MASTER_LOOKUP_MAX):
+            records[self.key(record["registration_number"], record.get("department"), record.get("passout_year"))] = record
+        self._records = records
+        self._loaded_at = time.monotonic()
+        self._version = version
+        return len(records)
+
+    async def _reload(self):
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"⚠️ Student master reload failed: {str(e)}")
+        finally:
+            self._reloading = False
+
+    def get(self, key: tuple) -> Optional[dict]:
+        if self._loaded_at is None:
+            return None
+        if not self.fresh and not self._reloading:
+            self._reloading = True
+            asyncio.create_task(self._reload())
+            return None
+        return self._records.get(key) if self.fresh else None
+
+    def add(self, record: dict):
+        if self._loaded_at is not None and record.get("status") == "active":
+            self._records[self.key(record["registration_number"], record.get("department"), record.get("passout_year"))] = record
+
+    def clear(self):
+        self._records = {}
+        self._loaded_at = None
+
+
+student_master_lookup = StudentMasterLookup()
+
+
 async def get_student_master_record(registration_number: str, department: str, passout_year: int):
+    key = StudentMasterLookup.key(registration_number, department, passout_year)
+    record = student_master_lookup.get(key)
+    if record is not None:
+        return record
     db = get_database()
     if db is None:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
@@ -17,6 +102,8 @@ async def get_student_master_record(registration_number: str, department: str, p
         "passout_year": passout_year,
         "status": "active"
     })
+    if record is not None:
+        student_master_lookup.add(record)
     return record
 
 
@@ -57,7 +144,7 @@ async def create_user(user_data: dict):
         "email": user_data["email"],
         "registration_number": user_data["registration_number"],
         "passout_year": user_data["passout_year"],
-        "password_hash": get_password_hash(user_data["password"]),
+        "password_hash": await hash_password(user_data["password"]),
         "role": role,
         "membership_status": "unpaid",
         "joined_at": datetime.utcnow(),
@@ -104,6 +191,8 @@ async def update_user(user_id: str, update_data: dict):
     )
     
     if result.modified_count > 0:
+        if set(update_data) & set(CLAIM_FIELDS):
+            await auth_versions.record_change([user_id])
         return await get_user_by_id(user_id)
     return None
 
@@ -116,6 +205,16 @@ async def update_membership_status(user_id: str, membership_status: str):
         {"_id": ObjectId(user_id)},
         {"$set": {"membership_status": membership_status}}
     )
+    await auth_versions.record_change([user_id])
+
+
+async def upgrade_password_hash(user_id, old_hash: str, new_hash: str) -> bool:
+    """Store a new password hash unless the password changed meanwhile"""
+    db = get_database()
+    if db is None:
+        return False
+    result = await db.users.update_one({"_id": user_id, "password_hash": old_hash}, {"$set": {"password_hash": new_hash}})
+    return result.modified_count > 0
 
 
 async def create_payment_record(payment_data: dict):
@@ -134,6 +233,8 @@ async def create_payment_record(payment_data: dict):
         "raw": payment_data.get("raw", {}),
         "created_at": datetime.utcnow()
     }
+    if payment_data.get("idempotency_key"):
+        payment_doc["idempotency_key"] = payment_data["idempotency_key"]
     result = await db.payments.insert_one(payment_doc)
     payment_doc["_id"] = result.inserted_id
     return payment_doc
@@ -178,6 +279,7 @@ async def create_event(event_data: dict, created_by: str):
         "created_at": datetime.utcnow()
     }
     result = await db.events.insert_one(event_doc)
+    await change_counters.bump("events")
     event_doc["_id"] = result.inserted_id
     return event_doc
 
@@ -215,6 +317,7 @@ async def register_for_event(event_id: str, user_id: str, payment_status: str =
             }
         }}
     )
+    await change_counters.bump("events")
     return ticket_id
 
 
@@ -226,6 +329,7 @@ async def approve_event(event_id: str):
         {"_id": ObjectId(event_id)},
         {"$set": {"approved": True}}
     )
+    await change_counters.bump("events")
 
 
 async def create_job(job_data: dict, created_by: str):
@@ -245,6 +349,7 @@ async def create_job(job_data: dict, created_by: str):
         "created_at": datetime.utcnow()
     }
     result = await db.jobs.insert_one(job_doc)
+    await change_counters.bump("jobs")
     job_doc["_id"] = result.inserted_id
     return job_doc
 
@@ -273,24 +378,149 @@ async def approve_job(job_id: str):
         {"_id": ObjectId(job_id)},
         {"$set": {"approved": True}}
     )
+    await change_counters.bump("jobs")
+
+
+UPGRADE_JOB_ID = "student_to_alumni_upgrade"
+
+
+def _alumni_welcome_email(student: dict) -> tuple:
+    return (
+        student.get("email"),
+        "Welcome to Alumni Network",
+        f"""
+        <p>Congratulations {student.get('name')}!</p>
+        <p>You have been automatically upgraded to Alumni status.</p>
+        <p>Access exclusive alumni features, jobs, and events.</p>
+        """,
+        "You have been upgraded to Alumni. Login to explore alumni features."
+    )
+
 
+async def _upgrade_student_batch(db, students: list, run_id: str, now: datetime) -> int:
+    """Upgrade one batch with set-based writes; safe to repeat for the same batch"""
+    ids = [s["_id"] for s in students]
+    user_ids = [str(i) for i in ids]
 
-async def upgrade_students_to_alumni():
+    await db.users.update_many(
+        {"_id": {"$in": ids}, "role": "student"},
+        {"$set": {"role": "alumni", "upgraded_to_alumni_at": now}}
+    )
+    await auth_versions.record_change(ids)
+
+    # On a resumed batch some of these may already exist
+    logged = set(await db.upgrade_logs.distinct("user_id", {"run_id": run_id, "user_id": {"$in": user_ids}}))
+    notified = set(await db.notifications.distinct("user_id", {"upgrade_run_id": run_id, "user_id": {"$in": user_ids}}))
+
+    logs = [{
+        "run_id": run_id,
+        "user_id": str(s["_id"]),
+        "user_name": s.get("name"),
+        "email": s.get("email"),
+        "passout_year": s.get("passout_year"),
+        "upgraded_at": now
+    } for s in students if str(s["_id"]) not in logged]
+    notifications = [{
+        "user_id": str(s["_id"]),
+        "title": "Alumni Status",
+        "message": "You've been upgraded to Alumni!",
+        "notification_type": "system",
+        "upgrade_run_id": run_id,
+        "created_at": now,
+        "read": False
+    } for s in students if str(s["_id"]) not in notified]
+
+    if logs:
+        await db.upgrade_logs.insert_many(logs, ordered=False)
+    if notifications:
+        await db.notifications.insert_many(notifications, ordered=False)
+
+    # Email goes out in the background over a single SMTP session per batch
+    send_bulk_email_in_background([_alumni_welcome_email(s) for s in students if str(s["_id"]) not in logged])
+    return len(logs)
+
+
+async def _save_upgrade_checkpoint(db, fields: dict, fencing_token: Optional[int] = None, upsert: bool = False):
+    """Write the checkpoint; with a fencing token, refuse if a newer leader has written since"""
+    query: dict = {"_id": UPGRADE_JOB_ID}
+    if fencing_token is not None:
+        query["$or"] = [{"fencing_token": {"$lte": fencing_token}}, {"fencing_token": {"$exists": False}}]
+        fields = dict(fields, fencing_token=fencing_token)
+    try:
+        result = await db.job_checkpoints.update_one(query, {"$set": fields}, upsert=upsert)
+    except DuplicateKeyError:
+        result = None
+    if result is None or (result.matched_count == 0 and result.upserted_id is None):
+        raise RuntimeError("Student upgrade run fenced off by a newer scheduler leader")
+
+
+async def upgrade_students_to_alumni(batch_size: Optional[int] = None, fencing_token: Optional[int] = None) -> int:
+    """Upgrade graduated students to alumni in _id-ordered batches.
+
+    Progress is checkpointed in ``job_checkpoints`` after every batch, so a run
+    that crashes resumes after the last completed batch (and finishes the
+    in-flight one) instead of starting over. Scheduled runs pass the leader
+    lease's fencing token so a deposed leader stops at its next checkpoint.
+    """
     db = get_database()
     if db is None:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
-    current_year = datetime.now().year
-    
-    result = await db.users.update_many(
-        {
-            "role": "student",
-            "passout_year": {"$lte": current_year}
-        },
-        {
-            "$set": {
-                "role": "alumni",
-                "upgraded_to_alumni_at": datetime.utcnow()
-            }
-        }
+
+    batch_size = batch_size or settings.UPGRADE_BATCH_SIZE
+    projection = {"name": 1, "email": 1, "passout_year": 1}
+    checkpoint = await db.job_checkpoints.find_one({"_id": UPGRADE_JOB_ID})
+
+    if checkpoint and checkpoint.get("status") == "running":
+        run_id = checkpoint["run_id"]
+        last_id = checkpoint.get("last_id")
+        print(f"↻ Resuming student upgrade run {run_id} after {last_id}")
+        # Check the fence before redoing the interrupted batch
+        await _save_upgrade_checkpoint(db, {"resumed_at": datetime.utcnow()}, fencing_token)
+        if checkpoint.get("pending_ids"):
+            pending = await db.users.find({"_id": {"$in": checkpoint["pending_ids"]}}, projection).to_list(None)
+            await _upgrade_student_batch(db, pending, run_id, datetime.utcnow())
+        # The interrupted batch may have logged some users before the crash
+        upgraded_count = await db.upgrade_logs.count_documents({"run_id": run_id})
+    else:
+        run_id = str(ObjectId())
+        last_id = None
+        upgraded_count = 0
+        await _save_upgrade_checkpoint(
+            db,
+            {"run_id": run_id, "status": "running", "last_id": None, "pending_ids": [],
+             "upgraded": 0, "started_at": datetime.utcnow()},
+            fencing_token,
+            upsert=True
+        )
+
+    # upgraded_to_alumni_at is stored as null for students created at signup
+    query = {
+        "role": "student",
+        "passout_year": {"$lte": datetime.now().year},
+        "upgraded_to_alumni_at": None
+    }
+
+    while True:
+        batch_query = dict(query, _id={"$gt": last_id}) if last_id else query
+        students = await db.users.find(batch_query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not students:
+            break
+
+        ids = [s["_id"] for s in students]
+        await _save_upgrade_checkpoint(db, {"pending_ids": ids}, fencing_token)
+
+        upgraded_count += await _upgrade_student_batch(db, students, run_id, datetime.utcnow())
+        last_id = ids[-1]
+
+        await _save_upgrade_checkpoint(
+            db,
+            {"last_id": last_id, "pending_ids": [], "upgraded": upgraded_count, "updated_at": datetime.utcnow()},
+            fencing_token
+        )
+
+    await _save_upgrade_checkpoint(
+        db,
+        {"status": "completed", "pending_ids": [], "upgraded": upgraded_count, "finished_at": datetime.utcnow()},
+        fencing_token
     )
-    return result.modified_count
+    return upgraded_count
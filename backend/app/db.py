@@ -9,14 +9,60 @@ db: Optional[AsyncIOMotorDatabase] = None
 async def connect_to_mongo():
     global client, db
     try:
-        client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+        client = AsyncIOMotorClient(
+            settings.MONGO_URI,
+            serverSelectionTimeoutMS=5000,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE
+        )
         db = client[settings.DATABASE_NAME]
         
         await db.users.create_index("email", unique=True)
         await db.users.create_index("registration_number", unique=True)
+        await db.users.create_index([("role", 1), ("_id", 1)])
         await db.student_master.create_index("registration_number", unique=True)
         await db.payments.create_index("order_id")
         await db.payments.create_index("user_id")
+        await db.donations.create_index("order_id")
+        # One pending order per idempotency key
+        for collection in (db.payments, db.donations):
+            await collection.create_index(
+                "idempotency_key",
+                unique=True,
+                partialFilterExpression={"status": "created", "idempotency_key": {"$type": "string"}}
+            )
+        await db.reconciliation_items.create_index([("report_id", 1), ("outcome", 1)])
+        await db.upgrade_logs.create_index([("run_id", 1), ("user_id", 1)])
+        await db.login_counters.create_index("expires_at", expireAfterSeconds=0)
+        await db.token_blacklist.create_index("jti", unique=True, partialFilterExpression={"jti": {"$type": "string"}})
+        await db.token_blacklist.create_index("expires_at", expireAfterSeconds=0)
+        await db.token_blacklist.create_index("created_at")
+        await db.auth_changes.create_index("expires_at", expireAfterSeconds=0)
+        await db.auth_changes.create_index("changed_at")
+        # Public listings and content lookups read on every landing page
+        await db.events.create_index([("approved", 1), ("created_at", -1)])
+        await db.jobs.create_index([("approved", 1), ("created_at", -1)])
+        await db.content.create_index([("type", 1), ("name", 1)])
+        await db.job_runs.create_index([("job_id", 1), ("started_at", -1)])
+        # Audit log browsing: newest first, optionally narrowed by action/actor/resource
+        await db.audit_logs.create_index([("timestamp", -1), ("_id", -1)])
+        await db.audit_logs.create_index([("action", 1), ("timestamp", -1), ("_id", -1)])
+        await db.audit_logs.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+        await db.audit_logs.create_index([("resource", 1), ("timestamp", -1), ("_id", -1)])
+        await db.audit_hourly.create_index([("hour", 1), ("action", 1)])
+        await db.discussion_posts.create_index([("locked", 1), ("last_activity_at", 1)])
+        await db.payments.create_index([("status", 1), ("created_at", 1)])
+        await db.donations.create_index([("status", 1), ("created_at", 1)])
+        await db.refresh_tokens.create_index([("user_id", 1), ("created_at", 1)])
+        await db.refresh_tokens.create_index("token_hash", unique=True)
+        await db.refresh_tokens.create_index("previous_hash", sparse=True)
+        await db.refresh_tokens.create_index("expires_at", expireAfterSeconds=0)
+        await db.webhook_logs.create_index("event_id", unique=True)
+        await db.webhook_logs.create_index([("status", 1), ("next_attempt_at", 1)])
+        await db.webhook_logs.create_index([("order_id", 1), ("received_at", 1)])
+        # TTLs and archiver time indexes for the retention policies
+        from .retention import ensure_retention_indexes
+        await ensure_retention_indexes(db)
         
         print(f"Connected to MongoDB: {settings.DATABASE_NAME}")
     except Exception as e:
@@ -2,16 +2,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .core.security import decode_token
 from .db import get_database
+from .token_revocation import token_revocations
+from .auth_claims import CLAIM_FIELDS, auth_versions
 from bson import ObjectId
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
-    payload = decode_token(token)
+def decode_credentials(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode a bearer token and reject it if revoked (in-memory check, no DB)"""
+    payload = decode_token(credentials.credentials)
     
     if payload is None:
         raise HTTPException(
@@ -19,17 +19,23 @@ async def get_current_user(
             detail="Invalid or expired token"
         )
     
-    user_id = payload.get("sub")
-    if user_id is None:
+    # Refresh tokens share the secret; they are only valid at /auth/refresh
+    if payload.get("type") != "access":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload"
+            detail="Invalid token type"
         )
     
-    # Handle admin user (stored in environment, not in database)
-    if user_id == "admin":
-        return payload
+    if token_revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
     
+    return payload
+
+
+async def _load_user(user_id: str) -> dict:
     db = get_database()
     if db is None:
         raise HTTPException(
@@ -54,29 +60,63 @@ async def get_current_user(
     return user
 
 
-async def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
-    payload = decode_token(token)
-    
-    if payload is None:
+def _subject(payload: dict) -> str:
+    user_id = payload.get("sub")
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
+            detail="Invalid token payload"
         )
+    return user_id
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    payload = decode_credentials(credentials)
+    user_id = _subject(payload)
     
-    role = payload.get("role")
-    if role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
+    # Handle admin user (stored in environment, not in database)
+    if user_id == "admin":
+        return payload
     
-    return payload
+    return await _load_user(user_id)
 
 
-async def get_alumni_user(user: dict = Depends(get_current_user)):
+async def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Like get_current_user but authorizes from token claims without a DB read.
+
+    Returns {"_id": <str>, role, membership_status, department, name,
+    "claims_only": True}. Tokens issued before the user's last role/membership/
+    department change (or without claims) fall back to the user document.
+    Use load_user() when the handler needs the full document.
+    """
+    payload = decode_credentials(credentials)
+    user_id = _subject(payload)
+    
+    if user_id == "admin":
+        return payload
+    
+    version = payload.get("ver")
+    if version is None or auth_versions.is_stale(user_id, version):
+        return await _load_user(user_id)
+    
+    claims = {"_id": user_id, "claims_only": True}
+    for field in CLAIM_FIELDS:
+        claims[field] = payload.get(field)
+    return claims
+
+
+async def load_user(user: dict) -> dict:
+    """Full user document for a get_current_claims result"""
+    if user.get("claims_only"):
+        return await _load_user(user["_id"])
+    return user
+
+
+def _require_alumni(user: dict) -> dict:
     if user.get("role") not in ["alumni", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -85,7 +125,7 @@ async def get_alumni_user(user: dict = Depends(get_current_user)):
     return user
 
 
-async def get_active_member(user: dict = Depends(get_current_user)):
+def _require_active_member(user: dict) -> dict:
     is_faculty = user.get("role") == "faculty"
     if not is_faculty and user.get("membership_status") != "active" and user.get("role") != "admin":
         raise HTTPException(
@@ -95,7 +135,7 @@ async def get_active_member(user: dict = Depends(get_current_user)):
     return user
 
 
-async def get_alumni_with_membership(user: dict = Depends(get_current_user)):
+def _require_alumni_with_membership(user: dict) -> dict:
     role = user.get("role")
     if role == "admin" or role == "faculty":
         return user
@@ -115,10 +155,59 @@ async def get_alumni_with_membership(user: dict = Depends(get_current_user)):
     return user
 
 
-async def get_faculty_user(user: dict = Depends(get_current_user)):
+def _require_faculty(user: dict) -> dict:
     if user.get("role") != "faculty":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Faculty access required"
         )
     return user
+
+
+async def get_current_admin(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    payload = decode_credentials(credentials)
+    
+    role = payload.get("role")
+    if role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return payload
+
+
+async def get_alumni_user(user: dict = Depends(get_current_user)):
+    return _require_alumni(user)
+
+
+async def get_active_member(user: dict = Depends(get_current_user)):
+    return _require_active_member(user)
+
+
+async def get_alumni_with_membership(user: dict = Depends(get_current_user)):
+    return _require_alumni_with_membership(user)
+
+
+async def get_faculty_user(user: dict = Depends(get_current_user)):
+    return _require_faculty(user)
+
+
+# Claims-only variants: same checks, no users lookup for fresh tokens
+
+async def get_alumni_claims(user: dict = Depends(get_current_claims)):
+    return _require_alumni(user)
+
+
+async def get_active_member_claims(user: dict = Depends(get_current_claims)):
+    return _require_active_member(user)
+
+
+async def get_alumni_with_membership_claims(user: dict = Depends(get_current_claims)):
+    return _require_alumni_with_membership(user)
+
+
+async def get_faculty_claims(user: dict = Depends(get_current_claims)):
+    return _require_faculty(user)
@@ -0,0 +1,128 @@
+"""Mongo-backed leader lease so scheduled jobs run on exactly one instance"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .core.settings import settings
+from .db import get_database
+from .monitoring import leader_lease_owned, leader_lease_transitions
+
+
+def default_instance_id() -> str:
+    return settings.INSTANCE_ID or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderLease:
+    """A TTL lease document in ``leader_leases`` renewed by a heartbeat task.
+
+    Every takeover increments ``fencing_token``; work started under a lease can
+    pass the token along so writes from a deposed leader are rejected.
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[int] = None, instance_id: Optional[str] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds or settings.SCHEDULER_LEASE_TTL_SECONDS
+        self.instance_id = instance_id or default_instance_id()
+        self.fencing_token: Optional[int] = None
+        self._expires_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        # Trust the lease only until its local expiry; a stalled heartbeat means we step down
+        return self._expires_at is not None and datetime.utcnow() < self._expires_at
+
+    async def try_acquire(self) -> bool:
+        """Renew our lease or take over an expired one; returns leadership"""
+        db = get_database()
+        if db is None:
+            self._set_lost()
+            return False
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        try:
+            lease = await db.leader_leases.find_one_and_update(
+                {"_id": self.name, "holder": self.instance_id, "fencing_token": self.fencing_token},
+                {"$set": {"expires_at": expires_at, "renewed_at": now}},
+                return_document=ReturnDocument.AFTER
+            ) if self.fencing_token is not None else None
+
+            if lease is None:
+                lease = await db.leader_leases.find_one_and_update(
+                    {"_id": self.name, "expires_at": {"$lt": now}},
+                    {
+                        "$set": {"holder": self.instance_id, "expires_at": expires_at, "acquired_at": now, "renewed_at": now},
+                        "$inc": {"fencing_token": 1}
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+        except DuplicateKeyError:
+            # The lease exists and is held by someone else
+            lease = None
+        except Exception as e:
+            print(f"⚠️ Lease '{self.name}' heartbeat failed: {str(e)}")
+            return self.is_leader
+
+        if lease is None:
+            self._set_lost()
+            return False
+
+        if self.fencing_token != lease["fencing_token"]:
+            print(f"👑 {self.instance_id} acquired lease '{self.name}' (token {lease['fencing_token']})")
+            leader_lease_transitions.labels(lease=self.name, transition="acquired").inc()
+        self.fencing_token = lease["fencing_token"]
+        # Leave a margin so we stop acting before anyone else can take over
+        self._expires_at = now + timedelta(seconds=self.ttl_seconds * 0.8)
+        leader_lease_owned.labels(lease=self.name).set(1)
+        return True
+
+    async def release(self):
+        if self.fencing_token is None:
+            return
+        db = get_database()
+        if db is not None:
+            try:
+                await db.leader_leases.update_one(
+                    {"_id": self.name, "holder": self.instance_id, "fencing_token": self.fencing_token},
+                    {"$set": {"expires_at": datetime.utcnow()}}
+                )
+            except Exception as e:
+                print(f"⚠️ Could not release lease '{self.name}': {str(e)}")
+        self._set_lost()
+
+    def _set_lost(self):
+        if self.fencing_token is not None:
+            print(f"⚠️ {self.instance_id} lost lease '{self.name}'")
+            leader_lease_transitions.labels(lease=self.name, transition="lost").inc()
+        self.fencing_token = None
+        self._expires_at = None
+        leader_lease_owned.labels(lease=self.name).set(0)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.release()
+
+    async def _heartbeat(self):
+        while True:
+            await self.try_acquire()
+            await asyncio.sleep(self.ttl_seconds / 3)
+
+
+scheduler_lease = LeaderLease("scheduler")
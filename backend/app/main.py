@@ -1,21 +1,33 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
 import os
 from .db import connect_to_mongo, close_mongo_connection
 from .scheduler import start_scheduler, stop_scheduler
+from .audit import start_audit_writer, stop_audit_writer
+from .token_revocation import token_revocations
+from .auth_claims import auth_versions
+from .change_counters import change_counters
+from .warmup import warmup_state, start_warmup, stop_warmup
+from .responses import ORJSONResponse
 from .monitoring import init_sentry, request_count, request_duration
 from .security_middleware import setup_security_middleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from .services.payment_gateway import close_payment_gateway
+from .services.webhook_processor import start_webhook_consumer, stop_webhook_consumer
+from .rate_limiter import RateLimitMiddleware, create_storage
+from .routes.rate_limiting import route_policies
+from .core.settings import settings
+from .core.password_policy import calibrate_password_policy
+import asyncio
 import time
 
 # Import route modules - with fallback for missing modules
 import importlib
 import sys
 
-limiter = Limiter(key_func=get_remote_address)
+rate_limit_storage = create_storage()
 
 
 def safe_import(module_name):
@@ -31,7 +43,7 @@ def safe_import(module_name):
 core_routes = [
     'auth', 'payments', 'webhooks', 'events', 'jobs', 'admin', 'notifications',
     'alumni', 'applications', 'analytics', 'announcements', 'donations',
-    'donations_admin', 'profile', 'faculty', 'content'
+    'donations_admin', 'profile', 'faculty', 'content', 'landing'
 ]
 
 # Faculty routes (may or may not exist)
@@ -59,10 +71,25 @@ async def lifespan(app: FastAPI):
     await connect_to_mongo()
     print("✅ Connected to MongoDB")
     init_sentry()
+    await asyncio.to_thread(calibrate_password_policy)
+    start_audit_writer()
+    token_revocations.start()
+    auth_versions.start()
+    change_counters.start()
     start_scheduler()
+    start_webhook_consumer()
+    start_warmup()
     yield
     # Shutdown
-    stop_scheduler()
+    await stop_warmup()
+    await stop_webhook_consumer()
+    await stop_scheduler()
+    await stop_audit_writer()
+    await token_revocations.stop()
+    await auth_versions.stop()
+    await change_counters.stop()
+    await close_payment_gateway()
+    await rate_limit_storage.close()
     await close_mongo_connection()
     print("✅ Disconnected from MongoDB")
 
@@ -72,15 +99,21 @@ app = FastAPI(
     description="API for the Alumni Portal",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None if os.getenv("ENVIRONMENT") == "production" else "/api/docs",
     redoc_url=None if os.getenv("ENVIRONMENT") == "production" else "/api/redoc")
 
+# Rate limiting (added first so CORS headers still wrap 429 responses)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        storage=rate_limit_storage,
+        route_policies=route_policies()
+    )
+
 # Setup security middleware (CORS, headers, etc.)
 setup_security_middleware(app)
 
-# Rate limiting
-app.state.limiter = limiter
-
 
 # Request tracking middleware
 @app.middleware("http")
@@ -122,6 +155,12 @@ async def api_health():
     return {"status": "ok"}
 
 
+@app.get("/api/ready")
+async def api_ready():
+    """Readiness: 200 only once warm-up has finished (health is liveness only)"""
+    return JSONResponse(jsonable_encoder(warmup_state.report()), status_code=200 if warmup_state.ready else 503)
+
+
 # Mount static files and serve frontend
 static_dir = os.path.join(os.path.dirname(__file__), "../../frontend/dist")
 if os.path.exists(static_dir):
@@ -0,0 +1,168 @@
+"""Maintenance sweeps run by the scheduler in bounded, off-peak chunks"""
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .audit import hour_bucket, rebuild_hourly_counts
+from .core.settings import settings
+from .db import get_database
+from .retention import archive_aged_documents
+from .security_utils import cleanup_old_refresh_tokens, expired_refresh_tokens
+
+
+class JobContext:
+    """Per-run limits handed to a job: batch size, time budget and fencing token"""
+
+    def __init__(self, batch_size: int, time_budget_seconds: Optional[float] = None, fencing_token: Optional[int] = None):
+        self.batch_size = batch_size
+        self.fencing_token = fencing_token
+        self.rows = 0
+        self.budget_exhausted = False
+        self._deadline = time.monotonic() + time_budget_seconds if time_budget_seconds else None
+
+    def has_time(self) -> bool:
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.budget_exhausted = True
+            return False
+        return True
+
+
+async def update_in_batches(collection, query: dict, update: dict, ctx: JobContext) -> int:
+    """Apply ``update`` to documents matching ``query`` batch_size ids at a time.
+
+    ``update`` must make documents stop matching ``query``, otherwise the sweep
+    would revisit them. Stops early when the time budget runs out.
+    """
+    total = 0
+    while ctx.has_time():
+        ids = [d["_id"] for d in await collection.find(query, {"_id": 1}).limit(ctx.batch_size).to_list(ctx.batch_size)]
+        if not ids:
+            break
+        result = await collection.update_many(dict(query, _id={"$in": ids}), update)
+        total += result.modified_count
+        if len(ids) < ctx.batch_size:
+            break
+    ctx.rows += total
+    return total
+
+
+async def delete_in_batches(collection, query: dict, ctx: JobContext) -> int:
+    total = 0
+    while ctx.has_time():
+        ids = [d["_id"] for d in await collection.find(query, {"_id": 1}).limit(ctx.batch_size).to_list(ctx.batch_size)]
+        if not ids:
+            break
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        total += result.deleted_count
+        if len(ids) < ctx.batch_size:
+            break
+    ctx.rows += total
+    return total
+
+
+def inactive_posts_query(days: int) -> dict:
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return {
+        "locked": {"$exists": False},
+        "$or": [
+            {"last_activity_at": {"$lt": cutoff}},
+            # Posts from before last_activity_at was tracked
+            {"last_activity_at": {"$exists": False}, "created_at": {"$lt": cutoff}}
+        ]
+    }
+
+
+async def lock_inactive_posts(ctx: JobContext, days: Optional[int] = None) -> int:
+    """Lock discussion posts with no activity for ``days`` days"""
+    db = get_database()
+    if db is None:
+        return 0
+    return await update_in_batches(
+        db.discussion_posts,
+        inactive_posts_query(days or settings.DISCUSSION_INACTIVE_DAYS),
+        {"$set": {"locked": True, "locked_at": datetime.utcnow(), "locked_reason": "Inactivity"}},
+        ctx
+    )
+
+
+async def expire_stale_orders(ctx: JobContext) -> int:
+    """Mark checkout orders never paid within STALE_ORDER_HOURS as expired"""
+    db = get_database()
+    if db is None:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(hours=settings.STALE_ORDER_HOURS)
+    update = {"$set": {"status": "expired", "expired_at": datetime.utcnow()}, "$unset": {"idempotency_key": ""}}
+    expired = 0
+    for collection in (db.payments, db.donations):
+        expired += await update_in_batches(collection, {"status": "created", "created_at": {"$lt": cutoff}}, update, ctx)
+    return expired
+
+
+async def cleanup_tokens(ctx: JobContext) -> int:
+    """Drop expired refresh tokens and trim users over MAX_REFRESH_TOKENS_PER_USER
+    with the same rules the login path applies"""
+    db = get_database()
+    if db is None:
+        return 0
+
+    removed = await delete_in_batches(db.refresh_tokens, expired_refresh_tokens(), ctx)
+
+    over_cap = db.refresh_tokens.aggregate([
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": settings.MAX_REFRESH_TOKENS_PER_USER}}},
+        {"$limit": ctx.batch_size}
+    ])
+    async for row in over_cap:
+        if not ctx.has_time():
+            break
+        trimmed = await cleanup_old_refresh_tokens(row["_id"], keep=settings.MAX_REFRESH_TOKENS_PER_USER)
+        removed += trimmed
+        ctx.rows += trimmed
+    return removed
+
+
+async def rollup_payments(ctx: JobContext) -> int:
+    """Refresh per-day payment/donation totals by status for the last ROLLUP_DAYS days"""
+    db = get_database()
+    if db is None:
+        return 0
+
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=settings.ROLLUP_DAYS)
+    days: dict = {}
+    for source, collection in (("payments", db.payments), ("donations", db.donations)):
+        pipeline = [
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$group": {
+                "_id": {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}, "status": "$status"},
+                "count": {"$sum": 1},
+                "amount": {"$sum": "$amount"}
+            }}
+        ]
+        async for row in collection.aggregate(pipeline):
+            day = days.setdefault(row["_id"]["day"], {}).setdefault(source, {})
+            day[row["_id"]["status"] or "unknown"] = {"count": row["count"], "amount": row["amount"]}
+
+    now = datetime.utcnow()
+    for day, totals in days.items():
+        await db.payment_daily_rollups.update_one(
+            {"_id": day},
+            {"$set": {"totals": totals, "updated_at": now}},
+            upsert=True
+        )
+    ctx.rows += len(days)
+    return len(days)
+
+
+async def rollup_audit(ctx: JobContext) -> int:
+    """Rebuild the last AUDIT_ROLLUP_HOURS complete hours of audit_hourly from audit_logs"""
+    since = hour_bucket(datetime.utcnow()) - timedelta(hours=settings.AUDIT_ROLLUP_HOURS)
+    rebuilt = await rebuild_hourly_counts(since)
+    ctx.rows += rebuilt
+    return rebuilt
+
+
+async def archive_logs(ctx: JobContext) -> int:
+    """Move aged log documents to the archive tier (see app.retention)"""
+    before = ctx.rows
+    await archive_aged_documents(ctx)
+    return ctx.rows - before
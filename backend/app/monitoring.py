@@ -9,6 +9,21 @@ request_duration = Histogram('alumni_portal_request_duration_seconds', 'Request
 active_users = Gauge('alumni_portal_active_users', 'Active users')
 payment_total = Counter('alumni_portal_payments_total', 'Total payments', ['status'])
 event_registrations = Counter('alumni_portal_event_registrations', 'Event registrations')
+gateway_request_duration = Histogram('alumni_portal_gateway_request_duration_seconds', 'Payment gateway call duration', ['operation', 'outcome'])
+webhook_events_total = Counter('alumni_portal_webhook_events_total', 'Webhook events by pipeline outcome', ['outcome'])
+order_idempotency_hits = Counter('alumni_portal_order_idempotency_hits_total', 'Checkout requests answered with an existing order', ['collection', 'source'])
+leader_lease_owned = Gauge('alumni_portal_leader_lease_owned', 'Whether this instance holds the lease (1/0)', ['lease'])
+leader_lease_transitions = Counter('alumni_portal_leader_lease_transitions_total', 'Lease acquisitions and losses', ['lease', 'transition'])
+scheduled_job_duration = Histogram('alumni_portal_scheduled_job_duration_seconds', 'Scheduled job run time', ['job', 'outcome'], buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600))
+scheduled_job_rows = Counter('alumni_portal_scheduled_job_rows_total', 'Rows touched by scheduled jobs', ['job'])
+scheduled_job_last_success = Gauge('alumni_portal_scheduled_job_last_success_timestamp', 'Unix time of the last successful run', ['job'])
+audit_queue_depth = Gauge('alumni_portal_audit_queue_depth', 'Audit events waiting to be written')
+audit_flush_duration = Histogram('alumni_portal_audit_flush_duration_seconds', 'Audit batch insert time', buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5))
+audit_events_total = Counter('alumni_portal_audit_events_total', 'Audit events by outcome', ['outcome'])
+login_lockout_checks = Counter('alumni_portal_login_lockout_total', 'Login lockout checks and lock events', ['outcome'])
+rate_limit_decisions = Counter('alumni_portal_rate_limit_total', 'Rate limit decisions', ['policy', 'outcome'])
+gateway_circuit_state = Gauge('alumni_portal_gateway_circuit_state', 'Payment gateway circuit state (0=closed, 1=half-open, 2=open)')
+single_flight_requests = Counter('alumni_portal_single_flight_requests_total', 'Coalesced reads: leader ran the query, shared joined one in flight', ['route', 'role'])
 
 def init_sentry():
     """Initialize Sentry error tracking"""
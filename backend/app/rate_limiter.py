@@ -0,0 +1,214 @@
+"""Rate limiting ASGI layer (GCRA) with pluggable storage
+
+Policies are looked up per (method, path) from ``routes.rate_limiting`` and
+enforced per client IP with the generic cell rate algorithm: each key stores a
+single "theoretical arrival time", so a check is one dictionary lookup in
+memory or one round trip (a Lua script) against a shared Redis-compatible
+store. Set RATE_LIMIT_STORAGE_URL to ``redis://...`` to share limits across
+workers; otherwise limits are per process.
+
+Behind a reverse proxy the socket peer is the proxy, so list its addresses in
+RATE_LIMIT_TRUSTED_PROXIES; the client is then the nearest untrusted address
+in X-Forwarded-For. Forwarded headers from any other peer are ignored.
+"""
+import ipaddress
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .core.settings import settings
+from .monitoring import rate_limit_decisions
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    name: str
+    limit: int
+    period: float
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+
+def parse_rate(name: str, rate: str) -> RatePolicy:
+    """'5/minute' -> RatePolicy(limit=5, period=60)"""
+    count, _, unit = rate.partition("/")
+    return RatePolicy(name, int(count), PERIODS[unit.strip().rstrip("s")])
+
+
+class MemoryStorage:
+    """Per-process GCRA state; evicts expired keys once max_keys is reached"""
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MEMORY_MAX_KEYS
+        self._tat: dict = {}
+
+    async def hit(self, key: str, policy: RatePolicy) -> tuple:
+        """Returns (allowed, remaining, retry_after_seconds)"""
+        now = time.monotonic()
+        interval = policy.emission_interval
+        tat = max(self._tat.get(key, now), now)
+        allow_at = tat + interval - policy.period
+        if allow_at > now:
+            return False, 0, allow_at - now
+
+        if key not in self._tat and len(self._tat) >= self.max_keys:
+            self._evict(now)
+        self._tat[key] = tat + interval
+        remaining = int((policy.period - (tat + interval - now)) / interval)
+        return True, remaining, 0.0
+
+    def _evict(self, now: float):
+        for stale in [k for k, tat in self._tat.items() if tat <= now]:
+            del self._tat[stale]
+        # Still full: every key is active, drop the oldest inserted
+        while len(self._tat) >= self.max_keys:
+            self._tat.pop(next(iter(self._tat)))
+
+    async def close(self):
+        pass
+
+
+# KEYS[1] = key; ARGV = emission interval (ms), period (ms). Uses the server clock
+# so every worker agrees on time.
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local allow_at = tat + interval - period
+if allow_at > now then
+    return {0, 0, allow_at - now}
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), 0}
+"""
+
+
+class RedisStorage:
+    """GCRA state in Redis (or any server speaking its protocol and Lua)"""
+
+    def __init__(self, url: str = None, client=None, prefix: str = "ratelimit:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, policy: RatePolicy) -> tuple:
+        allowed, remaining, retry_ms = await self._script(
+            keys=[self.prefix + key],
+            args=[int(policy.emission_interval * 1000), int(policy.period * 1000)]
+        )
+        return bool(allowed), int(remaining), retry_ms / 1000
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_storage(url: Optional[str] = None):
+    url = settings.RATE_LIMIT_STORAGE_URL if url is None else url
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisStorage(url)
+        except ImportError:
+            print("⚠️ redis package not installed, using in-memory rate limits")
+    return MemoryStorage()
+
+
+def parse_trusted_proxies(value: str) -> tuple:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope, trusted_proxies: tuple = ()) -> str:
+    """The address to rate limit: the peer, or the client it forwarded for if it is a trusted proxy"""
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not trusted_proxies or not _is_trusted(peer, trusted_proxies):
+        return peer
+    forwarded = [value.decode("latin-1") for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"]
+    hops = [hop.strip() for hop in ",".join(forwarded).split(",") if hop.strip()]
+    # Only the right-most entries were appended by our proxies; anything left of them is client-supplied
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted_proxies):
+            return hop
+    return hops[0] if hops else peer
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware: unmatched routes pass through with one dict lookup"""
+
+    def __init__(self, app, storage=None, route_policies: Optional[dict] = None, trusted_proxies: Optional[str] = None):
+        self.app = app
+        self.storage = storage or MemoryStorage()
+        self.route_policies = route_policies or {}
+        self.trusted_proxies = parse_trusted_proxies(
+            settings.RATE_LIMIT_TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+        self._counters: dict = {}
+
+    def _count(self, policy: RatePolicy, outcome: str):
+        # Resolving labelled children is a large share of the per-request cost; do it once
+        counter = self._counters.get((policy.name, outcome))
+        if counter is None:
+            counter = self._counters[(policy.name, outcome)] = rate_limit_decisions.labels(policy=policy.name, outcome=outcome)
+        counter.inc()
+
+    def policy_for(self, method: str, path: str) -> Optional[RatePolicy]:
+        return self.route_policies.get((method, path))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        policy = self.policy_for(scope["method"], scope["path"].rstrip("/") or "/")
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        key = f"{policy.name}:{client_ip(scope, self.trusted_proxies)}"
+        try:
+            allowed, remaining, retry_after = await self.storage.hit(key, policy)
+        except Exception as e:
+            # Fail open: a storage outage must not take logins down with it
+            print(f"⚠️ Rate limit storage error: {str(e)}")
+            self._count(policy, "error")
+            return await self.app(scope, receive, send)
+
+        if not allowed:
+            self._count(policy, "limited")
+            retry = max(math.ceil(retry_after), 1)
+            body = json.dumps({"detail": "Too many requests. Please try again later.", "retry_after": retry}).encode()
+            await send({"type": "http.response.start", "status": 429, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry).encode()),
+                (b"x-ratelimit-limit", str(policy.limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self._count(policy, "allowed")
+        headers = [(b"x-ratelimit-limit", str(policy.limit).encode()), (b"x-ratelimit-remaining", str(remaining).encode())]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,83 @@
+"""JSON responses encoded with orjson, and precompiled list serializers
+
+``ORJSONResponse`` is the app's default response class: orjson encodes
+datetimes natively and ``_default`` covers ObjectId, Decimal and Pydantic
+models. FastAPI still runs ``jsonable_encoder`` (and ``response_model``
+validation) on values a handler returns, so hot list endpoints return a
+response directly instead:
+
+- ``ModelSerializer(Model).response(rows)`` dumps a list through a
+  ``TypeAdapter`` built once at import (pydantic-core, straight to bytes).
+  Rows are dicts from our own mappers, so by default they are not validated
+  again; pass ``trusted=False`` for input from elsewhere.
+- ``json_response(content)`` encodes plain dicts/lists directly.
+
+Without orjson installed everything falls back to the stdlib encoder.
+"""
+from decimal import Decimal
+from typing import Any, Iterable
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    class ORJSONResponse(JSONResponse):
+        media_type = "application/json"
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    class ORJSONResponse(JSONResponse):
+        def render(self, content: Any) -> bytes:
+            return super().render(jsonable_encoder(content, custom_encoder={ObjectId: str}))
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Encode without FastAPI's jsonable_encoder pass"""
+    return ORJSONResponse(content, status_code=status_code)
+
+
+class ModelSerializer:
+    """list[Model] -> JSON bytes through TypeAdapters compiled once.
+
+    Trusted dict rows are dumped through a TypedDict mirror of the model, so
+    no model instance is built per row; model instances use the model schema.
+    """
+
+    def __init__(self, model: type):
+        self.model = model
+        self.adapter = TypeAdapter(list[model])
+        row = TypedDict(f"{model.__name__}Row", {name: f.annotation for name, f in model.model_fields.items()}, total=False)
+        self.row_adapter = TypeAdapter(list[row])
+
+    def dump(self, rows: Iterable, trusted: bool = True) -> bytes:
+        rows = list(rows)
+        if not trusted:
+            return self.adapter.dump_json(self.adapter.validate_python(rows))
+        if rows and isinstance(rows[0], self.model):
+            return self.adapter.dump_json(rows, warnings=False)
+        return self.row_adapter.dump_json(rows, warnings=False)
+
+    def response(self, rows: Iterable, trusted: bool = True) -> Response:
+        return Response(self.dump(rows, trusted), media_type="application/json")
@@ -0,0 +1,251 @@
+"""Retention tiers for high-volume log collections
+
+Each collection has a policy: ``ttl`` collections hold disposable data and are
+expired by a TTL index; ``archive`` collections are moved out of the working set
+in batches by ``archive_aged_documents`` into ``<collection>_archive`` or,
+with ARCHIVE_BACKEND=file and ARCHIVE_DIR set to a persistent volume, into
+gzip-compressed NDJSON files partitioned by day
+(ARCHIVE_DIR/<collection>/<YYYY>/<MM>/<YYYY-MM-DD>.ndjson.gz). The file
+backend is refused without an explicit ARCHIVE_DIR: a relative path on an
+instance disk would lose the archive on redeploy.
+
+Documents are written to the archive before they are deleted, so a crash
+between the two can archive a batch twice; it is never lost.
+"""
+import asyncio
+import gzip
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import json_util
+from pymongo.errors import OperationFailure
+
+from .core.settings import settings
+from .db import get_database
+
+TTL = "ttl"
+ARCHIVE = "archive"
+
+
+@dataclass
+class RetentionPolicy:
+    collection: str
+    time_field: str
+    mode: str
+    days: int
+    # Only documents matching this filter are ever archived (e.g. finished webhooks)
+    archive_filter: dict = field(default_factory=dict)
+
+
+POLICIES = {p.collection: p for p in (
+    RetentionPolicy("audit_logs", "timestamp", ARCHIVE, settings.AUDIT_LOG_RETENTION_DAYS),
+    RetentionPolicy("notifications", "created_at", TTL, settings.NOTIFICATION_TTL_DAYS),
+    RetentionPolicy("webhook_logs", "received_at", ARCHIVE, settings.WEBHOOK_LOG_RETENTION_DAYS,
+                    archive_filter={"status": {"$in": ["processed", "failed"]}}),
+    RetentionPolicy("upgrade_logs", "upgraded_at", ARCHIVE, settings.UPGRADE_LOG_RETENTION_DAYS),
+    RetentionPolicy("moderation_logs", "timestamp", ARCHIVE, settings.MODERATION_LOG_RETENTION_DAYS),
+    RetentionPolicy("email_logs", "created_at", ARCHIVE, settings.EMAIL_LOG_RETENTION_DAYS),
+)}
+
+
+def archive_backend() -> str:
+    if settings.ARCHIVE_BACKEND == "file":
+        if settings.ARCHIVE_DIR:
+            return "file"
+        print("⚠️ ARCHIVE_BACKEND=file needs ARCHIVE_DIR on a persistent volume, archiving to collections")
+    return "collection"
+
+
+async def ensure_retention_indexes(db):
+    """TTL indexes for disposable collections, time indexes for the archiver and archive queries"""
+    use_collections = archive_backend() == "collection"
+    for policy in POLICIES.values():
+        collection = db[policy.collection]
+        try:
+            if policy.mode == TTL:
+                seconds = policy.days * 86400
+                try:
+                    await collection.create_index(policy.time_field, expireAfterSeconds=seconds)
+                except OperationFailure:
+                    # Index exists with another expiry: change it in place
+                    await db.command("collMod", policy.collection,
+                                     index={"keyPattern": {policy.time_field: 1}, "expireAfterSeconds": seconds})
+            else:
+                await collection.create_index(policy.time_field)
+                if use_collections:
+                    await db[f"{policy.collection}_archive"].create_index(policy.time_field)
+        except Exception as e:
+            print(f"⚠️ Could not create retention index on {policy.collection}: {str(e)}")
+
+
+def partition_path(collection: str, day: str) -> str:
+    if day == "undated":
+        return os.path.join(settings.ARCHIVE_DIR, collection, "undated.ndjson.gz")
+    return os.path.join(settings.ARCHIVE_DIR, collection, day[:4], day[5:7], f"{day}.ndjson.gz")
+
+
+def _append_partitions(collection: str, partitions: dict) -> int:
+    """Append each day's documents as a new gzip member; returns bytes written"""
+    written = 0
+    for day, lines in partitions.items():
+        path = partition_path(collection, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        before = os.path.getsize(path) if os.path.exists(path) else 0
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        written += os.path.getsize(path) - before
+    return written
+
+
+async def _archive_batch(db, policy: RetentionPolicy, docs: list) -> int:
+    if archive_backend() == "collection":
+        await db[f"{policy.collection}_archive"].insert_many(docs, ordered=False)
+        return 0
+
+    partitions = defaultdict(list)
+    for doc in docs:
+        ts = doc.get(policy.time_field)
+        day = ts.strftime("%Y-%m-%d") if isinstance(ts, datetime) else "undated"
+        partitions[day].append(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n")
+    return await asyncio.to_thread(_append_partitions, policy.collection, partitions)
+
+
+async def collection_storage(db, name: str) -> dict:
+    try:
+        stats = await db.command("collStats", name)
+    except OperationFailure:
+        return {"count": 0, "size": 0, "storage_size": 0, "index_size": 0, "free_storage_size": 0}
+    return {
+        "count": stats.get("count", 0),
+        "size": stats.get("size", 0),
+        "storage_size": stats.get("storageSize", 0),
+        "index_size": stats.get("totalIndexSize", 0),
+        "free_storage_size": stats.get("freeStorageSize", 0)
+    }
+
+
+async def archive_aged_documents(ctx, collections: Optional[list] = None) -> dict:
+    """Move documents older than their policy's retention out of each archive collection.
+
+    Returns a per-collection report (documents moved, archive bytes written and
+    collStats before/after) which is also stored in retention_reports.
+    """
+    db = get_database()
+    if db is None:
+        return {}
+
+    report = {}
+    for policy in POLICIES.values():
+        if policy.mode != ARCHIVE or (collections and policy.collection not in collections):
+            continue
+        collection = db[policy.collection]
+        cutoff = datetime.utcnow() - timedelta(days=policy.days)
+        query = dict(policy.archive_filter, **{policy.time_field: {"$lt": cutoff}})
+        before = await collection_storage(db, policy.collection)
+        moved = written = 0
+
+        while ctx.has_time():
+            docs = await collection.find(query).sort(policy.time_field, 1).limit(ctx.batch_size).to_list(ctx.batch_size)
+            if not docs:
+                break
+            written += await _archive_batch(db, policy, docs)
+            result = await collection.delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+            moved += result.deleted_count
+            if len(docs) < ctx.batch_size:
+                break
+
+        ctx.rows += moved
+        after = await collection_storage(db, policy.collection)
+        report[policy.collection] = {
+            "cutoff": cutoff,
+            "archived": moved,
+            "archive_bytes": written,
+            "before": before,
+            "after": after,
+            # WiredTiger keeps freed pages for reuse; they show up as free_storage_size until compact
+            "reclaimable_bytes": after["free_storage_size"],
+            "data_bytes_removed": max(before["size"] - after["size"], 0)
+        }
+
+    if report:
+        await db.retention_reports.insert_one({"created_at": datetime.utcnow(), "collections": report})
+    return report
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def _read_partition(path: str, time_field: str, since: datetime, until: datetime, query: dict, limit: int) -> list:
+    docs = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            doc = json_util.loads(line)
+            ts = doc.get(time_field)
+            if isinstance(ts, datetime):
+                ts = ts.replace(tzinfo=None)
+                doc[time_field] = ts
+                if ts < since or ts >= until:
+                    continue
+            if any(doc.get(k) != v for k, v in query.items()):
+                continue
+            docs.append(doc)
+            if len(docs) >= limit:
+                break
+    return docs
+
+
+async def query_archive(collection: str, since: datetime, until: datetime, query: Optional[dict] = None, limit: int = 1000) -> list:
+    """Archived documents of ``collection`` with since <= time field < until, oldest first.
+
+    ``query`` applies exact-match filters on top-level fields.
+    """
+    policy = POLICIES[collection]
+    query = query or {}
+    since, until = _naive_utc(since), _naive_utc(until)
+
+    if archive_backend() == "collection":
+        db = get_database()
+        if db is None:
+            return []
+        mongo_query = dict(query, **{policy.time_field: {"$gte": since, "$lt": until}})
+        return await db[f"{collection}_archive"].find(mongo_query).sort(policy.time_field, 1).limit(limit).to_list(limit)
+
+    results = []
+    day = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < until and len(results) < limit:
+        path = partition_path(collection, day.strftime("%Y-%m-%d"))
+        if os.path.exists(path):
+            results.extend(await asyncio.to_thread(_read_partition, path, policy.time_field, since, until, query, limit - len(results)))
+        day += timedelta(days=1)
+    results.sort(key=lambda d: d.get(policy.time_field) or datetime.min)
+    return results[:limit]
+
+
+async def storage_report() -> dict:
+    """Current size of every collection under a retention policy and its archive"""
+    db = get_database()
+    if db is None:
+        return {}
+    report = {}
+    for policy in POLICIES.values():
+        entry = {"mode": policy.mode, "days": policy.days, "live": await collection_storage(db, policy.collection)}
+        if policy.mode == ARCHIVE:
+            if archive_backend() == "collection":
+                entry["archive"] = await collection_storage(db, f"{policy.collection}_archive")
+            else:
+                entry["archive"] = {"bytes": await asyncio.to_thread(_directory_size, os.path.join(settings.ARCHIVE_DIR, policy.collection))}
+        report[policy.collection] = entry
+    return report
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
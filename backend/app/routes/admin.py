@@ -1,26 +1,40 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, Response
+from typing import List, Optional
 from ..models import AdminLoginRequest, TokenResponse, UserResponse, EventResponse, JobResponse
 from ..core.settings import settings
-from ..core.security import verify_password, create_access_token
+from ..core.security import verify_admin_password, hash_password, create_access_token
 from ..deps import get_current_admin
+from ..security_utils import check_login_attempts, record_login_attempt
+from .auth import start_session
 from ..crud import (
     get_events, get_jobs, approve_event, approve_job,
-    upgrade_students_to_alumni
+    upgrade_students_to_alumni, student_master_lookup
 )
 from ..db import get_database
+from ..scheduler import JOBS, run_job
+from ..retention import POLICIES, ARCHIVE, storage_report, query_archive
+from ..auth_claims import auth_versions
+from ..change_counters import change_counters
+from ..content_cache import content_cache
+from ..responses import json_response
 from datetime import datetime
 import csv
 import json
+from bson import json_util
 import io
-import pandas as pd
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
 @router.post("/login")
-async def admin_login(request: AdminLoginRequest):
+async def admin_login(request: AdminLoginRequest, req: Request, response: Response):
+    client_ip = req.client.host if req.client else None
+    allowed, message = await check_login_attempts(request.email)
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=message)
+    
     if request.email != settings.ADMIN_EMAIL:
+        await record_login_attempt(request.email, False, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin credentials"
@@ -32,13 +46,16 @@ async def admin_login(request: AdminLoginRequest):
             detail="Admin account not configured"
         )
     
-    if not verify_password(request.password, settings.ADMIN_PASSWORD_HASH):
+    if not await verify_admin_password(request.password):
+        await record_login_attempt(request.email, False, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin credentials"
         )
     
+    await record_login_attempt(request.email, True, client_ip)
     token = create_access_token(data={"sub": "admin", "role": "admin", "email": request.email})
+    await start_session(response, "admin", req)
     
     return {
         "access_token": token,
@@ -253,7 +270,7 @@ async def list_users(admin: dict = Depends(get_current_admin)):
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
     users = await db.users.find({}).sort("joined_at", -1).to_list(length=500)
     
-    return [{
+    return json_response([{
         "id": str(u["_id"]),
         "name": u.get("name", ""),
         "email": u.get("email", ""),
@@ -263,14 +280,13 @@ async def list_users(admin: dict = Depends(get_current_admin)):
         "role": u.get("role", ""),
         "membership_status": u.get("membership_status", "unpaid"),
         "joined_at": u.get("joined_at")
-    } for u in users]
+    } for u in users])
 
 
 @router.post("/users")
 async def add_user(data: dict, admin: dict = Depends(get_current_admin)):
     """Add a new alumni or next year passout student"""
     from bson import ObjectId
-    from ..core.security import get_password_hash
     
     db = get_database()
     if db is None:
@@ -300,7 +316,7 @@ async def add_user(data: dict, admin: dict = Depends(get_current_admin)):
         "phone": data.get("phone", ""),
         "dob": data.get("dob"),
         "role": data["role"],  # "alumni" or "student"
-        "password_hash": get_password_hash(temp_password),
+        "password_hash": await hash_password(temp_password),
         "membership_status": "unpaid",
         "joined_at": datetime.utcnow(),
         "status": "approved"
@@ -326,7 +342,6 @@ async def add_user(data: dict, admin: dict = Depends(get_current_admin)):
 async def update_user(user_id: str, data: dict, admin: dict = Depends(get_current_admin)):
     """Update an existing alumni or student - regenerates temp password"""
     from bson import ObjectId
-    from ..core.security import get_password_hash
     
     db = get_database()
     if db is None:
@@ -353,7 +368,7 @@ async def update_user(user_id: str, data: dict, admin: dict = Depends(get_curren
         "passout_year": int(data.get("passout_year", existing_user.get("passout_year"))),
         "phone": data.get("phone", existing_user.get("phone", "")),
         "dob": data.get("dob", existing_user.get("dob")),
-        "password_hash": get_password_hash(temp_password),
+        "password_hash": await hash_password(temp_password),
         "role": data.get("role", existing_user.get("role"))
     }
     
@@ -361,6 +376,7 @@ async def update_user(user_id: str, data: dict, admin: dict = Depends(get_curren
         {"_id": user_obj_id},
         {"$set": update_data}
     )
+    await auth_versions.record_change([user_obj_id])
     
     return {
         "success": True,
@@ -405,6 +421,69 @@ async def run_upgrade_students(admin: dict = Depends(get_current_admin)):
     }
 
 
+@router.get("/cron/jobs")
+async def list_scheduled_jobs(admin: dict = Depends(get_current_admin)):
+    """Registered background jobs with their limits and last recorded run"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
+
+    jobs = []
+    for job in JOBS.values():
+        last_run = await db.job_runs.find_one({"job_id": job.id}, {"_id": 0}, sort=[("started_at", -1)])
+        jobs.append({
+            "id": job.id,
+            "name": job.name,
+            "schedule": str(job.trigger),
+            "batch_size": job.batch_size,
+            "time_budget_seconds": job.time_budget_seconds,
+            "last_run": last_run
+        })
+    return jobs
+
+
+@router.get("/cron/runs")
+async def list_job_runs(job_id: Optional[str] = None, limit: int = 50, admin: dict = Depends(get_current_admin)):
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
+
+    query = {"job_id": job_id} if job_id else {}
+    limit = min(max(limit, 1), 500)
+    return await db.job_runs.find(query, {"_id": 0}).sort("started_at", -1).limit(limit).to_list(limit)
+
+
+@router.post("/cron/jobs/{job_id}/run")
+async def trigger_job(job_id: str, admin: dict = Depends(get_current_admin)):
+    """Run a registered job now, outside its schedule"""
+    if job_id not in JOBS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return await run_job(job_id, force=True)
+
+
+@router.get("/retention")
+async def retention_status(admin: dict = Depends(get_current_admin)):
+    """Live and archived size per retained collection, plus the last archive run"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
+
+    last_run = await db.retention_reports.find_one({}, {"_id": 0}, sort=[("created_at", -1)])
+    return {"collections": await storage_report(), "last_archive_run": last_run}
+
+
+@router.get("/retention/archive/{collection}")
+async def read_archive(collection: str, since: datetime, until: datetime, limit: int = 100, admin: dict = Depends(get_current_admin)):
+    """Browse archived documents of a collection for a time range"""
+    if POLICIES.get(collection) is None or POLICIES[collection].mode != ARCHIVE:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No archive for this collection")
+    if until <= since:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="until must be after since")
+
+    docs = await query_archive(collection, since, until, limit=min(max(limit, 1), 1000))
+    return json.loads(json_util.dumps(docs, json_options=json_util.RELAXED_JSON_OPTIONS))
+
+
 @router.post("/uploadstudentdata")
 async def upload_student_data(file: UploadFile = File(...), overwrite: bool = True, admin: dict = Depends(get_current_admin)):
     """Upload student master data from CSV/XLSX/JSON file"""
@@ -430,6 +509,8 @@ async def upload_student_data(file: UploadFile = File(...), overwrite: bool = Tr
             reader = csv.DictReader(io.StringIO(text_content))
             records = list(reader)
         elif file_ext in {'.xlsx', '.xls'}:
+            # pandas adds ~0.4s to startup; only Excel uploads need it
+            import pandas as pd
             df = pd.read_excel(io.BytesIO(content))
             records = df.to_dict('records')
         elif file_ext == '.json':
@@ -480,6 +561,8 @@ async def upload_student_data(file: UploadFile = File(...), overwrite: bool = Tr
         
         if overwrite:
             await db.student_master.delete_many({})
+            student_master_lookup.clear()
+            await change_counters.bump("student_master")
         
         imported_count = 0
         for record in valid_records:
@@ -490,8 +573,14 @@ async def upload_student_data(file: UploadFile = File(...), overwrite: bool = Tr
                 duplicate_count += 1
             else:
                 await db.student_master.insert_one(record)
+                student_master_lookup.add(record)
                 imported_count += 1
         
+        if imported_count:
+            await change_counters.bump("student_master")
+        if overwrite:
+            await student_master_lookup.load()
+        
         return {
             "status": "success",
             "records_imported": imported_count,
@@ -534,6 +623,7 @@ async def delete_alumni(alumni_id: str, admin: dict = Depends(get_current_admin)
     result = await db.users.delete_one({"_id": ObjectId(alumni_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Alumni not found")
+    await auth_versions.record_change([alumni_id])
     return {"success": True, "message": "Alumni deleted successfully"}
 
 
@@ -575,6 +665,7 @@ async def reject_registration(reg_id: str, admin: dict = Depends(get_current_adm
     result = await db.users.delete_one({"_id": ObjectId(reg_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Registration not found")
+    await auth_versions.record_change([reg_id])
     return {"success": True, "message": "Registration rejected"}
 
 
@@ -621,6 +712,7 @@ async def create_event(event: dict, admin: dict = Depends(get_current_admin)):
         "attendees": []
     }
     result = await db.events.insert_one(event_doc)
+    await change_counters.bump("events")
     return {"success": True, "id": str(result.inserted_id)}
 
 
@@ -633,6 +725,7 @@ async def delete_event(event_id: str, admin: dict = Depends(get_current_admin)):
     result = await db.events.delete_one({"_id": ObjectId(event_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
+    await change_counters.bump("events")
     return {"success": True, "message": "Event deleted"}
 
 
@@ -646,6 +739,7 @@ async def update_event(event_id: str, event_data: dict, admin: dict = Depends(ge
     result = await db.events.update_one({"_id": ObjectId(event_id)}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
+    await change_counters.bump("events")
     return {"success": True, "message": "Event updated"}
 
 
@@ -675,6 +769,7 @@ async def delete_job(job_id: str, admin: dict = Depends(get_current_admin)):
     result = await db.jobs.delete_one({"_id": ObjectId(job_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Job not found")
+    await change_counters.bump("jobs")
     return {"success": True, "message": "Job deleted"}
 
 
@@ -703,6 +798,7 @@ async def create_announcement(announcement: dict, admin: dict = Depends(get_curr
         "created_at": datetime.utcnow()
     }
     result = await db.announcements.insert_one(ann_doc)
+    await change_counters.bump("announcements")
     return {"success": True, "id": str(result.inserted_id)}
 
 
@@ -715,15 +811,13 @@ async def delete_announcement(ann_id: str, admin: dict = Depends(get_current_adm
     result = await db.announcements.delete_one({"_id": ObjectId(ann_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Announcement not found")
+    await change_counters.bump("announcements")
     return {"success": True, "message": "Announcement deleted"}
 
 
 @router.get("/homepage-content")
 async def get_homepage_content(admin: dict = Depends(get_current_admin)):
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
-    content = await db.settings.find_one({"type": "homepage"})
+    content = await content_cache.get("settings", "homepage")
     if not content:
         return {
             "hero_title": "Welcome to Alumni Portal",
@@ -761,6 +855,7 @@ async def update_homepage_content(content: dict, admin: dict = Depends(get_curre
         },
         upsert=True
     )
+    await content_cache.refresh("settings")
     return {"success": True, "message": "Homepage content updated"}
 
 
@@ -808,12 +903,8 @@ async def delete_gallery_item(item_id: str, admin: dict = Depends(get_current_ad
 
 @router.get("/content/sections/{section_name}")
 async def get_content_section(section_name: str):
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
-
     try:
-        section = await db.content_sections.find_one({"section_name": section_name})
+        section = await content_cache.get("content_sections", section_name)
         if not section:
             if section_name == "donationimpact":
                 return {
@@ -846,6 +937,7 @@ async def save_content_section(data: dict, admin: dict = Depends(get_current_adm
             {"$set": {**section_data, "updated_at": datetime.utcnow()}},
             upsert=True
         )
+        await content_cache.refresh("content_sections")
         return {"success": True, "message": f"{section_name} saved successfully"}
     except Exception as e:
         print(f"Error saving section: {str(e)}")
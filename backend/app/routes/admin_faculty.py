@@ -5,7 +5,7 @@ from pydantic import BaseModel, EmailStr
 from bson import ObjectId
 from ..db import get_database
 from ..deps import get_current_admin
-from ..core.security import get_password_hash, create_access_token
+from ..core.security import hash_password, create_access_token
 from ..models import UserResponse
 
 router = APIRouter(prefix="/admin/faculty", tags=["faculty-admin"])
@@ -52,7 +52,7 @@ async def create_faculty(
         "department": request.department,
         "phone": request.phone or "",
         "registration_number": "",
-        "password_hash": get_password_hash(temp_password),
+        "password_hash": await hash_password(temp_password),
         "role": "faculty",
         "created_at": datetime.utcnow(),
         "is_blocked": False
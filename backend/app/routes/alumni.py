@@ -2,9 +2,33 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional
 from ..models import AlumniDirectoryResponse
 from ..db import get_database
-from ..deps import get_current_user
+from ..deps import get_current_claims
+from ..responses import ModelSerializer
+from ..single_flight import auth_scope, single_flight
 
 router = APIRouter(prefix="/alumni", tags=["alumni"])
+directory_list = ModelSerializer(AlumniDirectoryResponse)
+
+
+def directory_fields(a: dict) -> dict:
+    return dict(
+        id=str(a["_id"]),
+        name=a["name"],
+        department=a["department"],
+        passout_year=a["passout_year"],
+        current_company=a.get("current_company"),
+        current_position=a.get("current_position"),
+        email=a["email"],
+        profile_photo_url=a.get("profile_photo_url"),
+        location=a.get("location"),
+        gender=a.get("gender"),
+        professional=a.get("professional", {
+            "workplace": a.get("current_company"),
+            "designation": a.get("current_position"),
+            "industry": a.get("industry"),
+            "skills": a.get("skills", [])
+        })
+    )
 
 
 @router.get("/directory", response_model=list[AlumniDirectoryResponse])
@@ -14,7 +38,7 @@ async def get_alumni_directory(
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_claims)
 ):
     """Get alumni directory with filters"""
     db = get_database()
@@ -87,34 +111,10 @@ async def get_alumni_directory(
 
     alumni = await db.users.find(query).skip(skip).limit(limit).to_list(None)
 
-    return [
-        AlumniDirectoryResponse(
-            id=str(a["_id"]),
-            name=a["name"],
-            department=a["department"],
-            passout_year=a["passout_year"],
-            current_company=a.get("current_company"),
-            current_position=a.get("current_position"),
-            email=a["email"],
-            profile_photo_url=a.get("profile_photo_url"),
-            location=a.get("location"),
-            gender=a.get("gender"),
-            professional=a.get("professional", {
-                "workplace": a.get("current_company"),
-                "designation": a.get("current_position"),
-                "industry": a.get("industry"),
-                "skills": a.get("skills", [])
-            })
-        )
-        for a in alumni
-    ]
+    return directory_list.response(directory_fields(a) for a in alumni)
 
 
-@router.get("/stats")
-async def get_alumni_stats(
-    current_user = Depends(get_current_user)
-):
-    """Get alumni statistics"""
+async def alumni_stats() -> dict:
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
@@ -132,3 +132,11 @@ async def get_alumni_stats(
         "active_members": active_members,
         "by_department": {item["_id"]: item["count"] for item in by_department}
     }
+
+
+@router.get("/stats")
+async def get_alumni_stats(
+    current_user = Depends(get_current_claims)
+):
+    """Get alumni statistics"""
+    return await single_flight.do("GET /alumni/stats", alumni_stats, scope=auth_scope(current_user))
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from ..db import get_database
+from ..change_counters import conditional_get
 
 router = APIRouter(prefix="/announcements", tags=["Announcements"])
 
 
-@router.get("")
-async def get_announcements():
+async def latest_announcements() -> list:
     db = get_database()
     if db is None:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
@@ -17,3 +17,8 @@ async def get_announcements():
         "content": a["content"],
         "created_at": a["created_at"]
     } for a in announcements]
+
+
+@router.get("")
+async def get_announcements(cache: dict = Depends(conditional_get("announcements"))):
+    return await latest_announcements()
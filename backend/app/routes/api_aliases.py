@@ -1,12 +1,12 @@
 """API Aliases - backward compatibility routes mapping frontend calls to faculty routes"""
 from fastapi import APIRouter, Depends, HTTPException
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 from ..db import get_database
 
 router = APIRouter(tags=["aliases"])
 
 @router.get("/api/newsletter")
-async def get_newsletter_alias(current_user: dict = Depends(get_faculty_user)):
+async def get_newsletter_alias(current_user: dict = Depends(get_faculty_claims)):
     """Alias: /api/newsletter -> /api/faculty/newsletters"""
     db = get_database()
     if db is None:
@@ -37,7 +37,7 @@ async def get_newsletter_alias(current_user: dict = Depends(get_faculty_user)):
 @router.post("/api/newsletter")
 async def create_newsletter_alias(
     request: dict,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: POST /api/newsletter -> /api/faculty/newsletters"""
     from datetime import datetime
@@ -72,7 +72,7 @@ async def create_newsletter_alias(
 @router.delete("/api/newsletter/{newsletter_id}")
 async def delete_newsletter_alias(
     newsletter_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: DELETE /api/newsletter/{id} -> /api/faculty/newsletters/{id}"""
     from bson import ObjectId
@@ -97,7 +97,7 @@ async def delete_newsletter_alias(
     return {"message": "Newsletter deleted successfully"}
 
 @router.get("/api/achievements")
-async def get_achievements_alias(current_user: dict = Depends(get_faculty_user)):
+async def get_achievements_alias(current_user: dict = Depends(get_faculty_claims)):
     """Alias: /api/achievements -> /api/faculty/achievements"""
     db = get_database()
     if db is None:
@@ -127,7 +127,7 @@ async def get_achievements_alias(current_user: dict = Depends(get_faculty_user))
 @router.post("/api/achievements")
 async def create_achievements_alias(
     request: dict,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: POST /api/achievements -> /api/faculty/achievements"""
     from datetime import datetime
@@ -160,7 +160,7 @@ async def create_achievements_alias(
 @router.delete("/api/achievements/{achievement_id}")
 async def delete_achievements_alias(
     achievement_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: DELETE /api/achievements/{id} -> /api/faculty/achievements/{id}"""
     from bson import ObjectId
@@ -185,7 +185,7 @@ async def delete_achievements_alias(
     return {"message": "Achievement deleted successfully"}
 
 @router.get("/api/gallery")
-async def get_gallery_alias(current_user: dict = Depends(get_faculty_user)):
+async def get_gallery_alias(current_user: dict = Depends(get_faculty_claims)):
     """Alias: /api/gallery -> /api/faculty/gallery"""
     db = get_database()
     if db is None:
@@ -215,7 +215,7 @@ async def get_gallery_alias(current_user: dict = Depends(get_faculty_user)):
 @router.post("/api/gallery")
 async def create_gallery_alias(
     request: dict,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: POST /api/gallery -> /api/faculty/gallery"""
     from datetime import datetime
@@ -248,7 +248,7 @@ async def create_gallery_alias(
 @router.delete("/api/gallery/{gallery_id}")
 async def delete_gallery_alias(
     gallery_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Alias: DELETE /api/gallery/{id} -> /api/faculty/gallery/{id}"""
     from bson import ObjectId
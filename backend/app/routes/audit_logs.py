@@ -1,37 +1,59 @@
 """Admin and security audit logging"""
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from ..core.settings import settings
 from ..db import get_database
 from ..deps import get_current_user
+from .. import audit
 
 router = APIRouter(prefix="/admin/audit", tags=["audit-logs"])
 
 async def log_audit_event(action: str, resource: str, user_id: str, details: dict = None):
-    """Log an audit event"""
-    db = get_database()
-    if db is None:
-        return
-    
+    """Log an audit event (queued through the shared buffered writer)"""
+    await audit.log_audit_event(action, user_id=user_id, resource=resource, details=details)
+
+def encode_cursor(log: dict) -> str:
+    return f"{log['timestamp'].isoformat()}_{log['_id']}"
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Query for entries strictly after the cursor in (timestamp desc, _id desc) order"""
     try:
-        await db.audit_logs.insert_one({
-            "action": action,
-            "resource": resource,
-            "user_id": user_id,
-            "details": details or {},
-            "timestamp": datetime.utcnow(),
-            "ip_address": None  # Would be captured from request context in real impl
-        })
-    except Exception as e:
-        print(f"⚠️ Error logging audit event: {str(e)}")
+        ts, oid = cursor.rsplit("_", 1)
+        ts, oid = datetime.fromisoformat(ts), ObjectId(oid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [{"timestamp": {"$lt": ts}}, {"timestamp": ts, "_id": {"$lt": oid}}]}
+
+
+def time_range(since: Optional[datetime], until: Optional[datetime]) -> dict:
+    bounds = {}
+    if since:
+        bounds["$gte"] = since
+    if until:
+        bounds["$lt"] = until
+    return bounds
+
 
 @router.get("/logs")
 async def get_audit_logs(
+    response: Response,
     action: str = None,
     resource: str = None,
+    user_id: str = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get audit logs (admin only)"""
+    """Get audit logs (admin only), newest first.
+
+    Pages are keyed on (timestamp, _id): pass the X-Next-Cursor header of one
+    response as ``cursor`` to fetch the next page.
+    """
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
@@ -39,32 +61,52 @@ async def get_audit_logs(
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    limit = min(max(limit, 1), settings.AUDIT_PAGE_MAX)
+    query = {}
+    if action:
+        query["action"] = action
+    if resource:
+        query["resource"] = resource
+    if user_id:
+        query["user_id"] = user_id
+    if since or until:
+        query["timestamp"] = time_range(since, until)
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor)]}
+    
     try:
-        query = {}
-        if action:
-            query["action"] = action
-        if resource:
-            query["resource"] = resource
-        
-        logs = await db.audit_logs.find(query).sort("timestamp", -1).limit(limit).to_list(None)
-        
-        return [
-            {
-                "id": str(log["_id"]),
-                "action": log.get("action"),
-                "resource": log.get("resource"),
-                "user_id": log.get("user_id"),
-                "timestamp": log.get("timestamp"),
-                "details": log.get("details")
-            }
-            for log in logs
-        ]
+        logs = await db.audit_logs.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit).to_list(limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching audit logs: {str(e)}")
+    
+    if len(logs) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1])
+    
+    return [
+        {
+            "id": str(log["_id"]),
+            "action": log.get("action"),
+            "resource": log.get("resource"),
+            "user_id": log.get("user_id"),
+            "timestamp": log.get("timestamp"),
+            "details": log.get("details")
+        }
+        for log in logs
+    ]
 
 @router.get("/logs/summary")
-async def audit_summary(current_user: dict = Depends(get_current_user)):
-    """Get audit log summary"""
+async def audit_summary(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    user_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get audit log summary.
+
+    Without ``user_id`` this reads the per-action hourly rollups, so ``since``
+    and ``until`` are applied at hour granularity; per-actor summaries run on
+    audit_logs through the (user_id, timestamp) index.
+    """
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
@@ -73,18 +115,58 @@ async def audit_summary(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        total_logs = await db.audit_logs.count_documents({})
+        if user_id:
+            match = {"user_id": user_id}
+            if since or until:
+                match["timestamp"] = time_range(since, until)
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": {"$ifNull": ["$action", "unknown"]},
+                    "count": {"$sum": 1},
+                    "failed": {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$status", "success"]}, "success"]}, 0, 1]}},
+                    "last_seen": {"$max": "$timestamp"}
+                }}
+            ]
+            rows = await db.audit_logs.aggregate(pipeline).to_list(None)
+        else:
+            match = {}
+            if since or until:
+                match["hour"] = time_range(audit.hour_bucket(since) if since else None, until)
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": "$action",
+                    "count": {"$sum": "$count"},
+                    "failed": {"$sum": "$failed"},
+                    "last_seen": {"$max": "$hour"}
+                }}
+            ]
+            rows = await db.audit_hourly.aggregate(pipeline).to_list(None)
         
-        actions = {}
-        logs = await db.audit_logs.find({}).to_list(None)
-        for log in logs:
-            action = log.get("action", "unknown")
-            actions[action] = actions.get(action, 0) + 1
+        if user_id or since or until:
+            total_logs = sum(row["count"] for row in rows)
+        else:
+            total_logs = await db.audit_logs.estimated_document_count()
         
+        rows.sort(key=lambda row: row["last_seen"], reverse=True)
         return {
             "total_logs": total_logs,
-            "actions": actions,
-            "recent_actions": list(actions.keys())[-10:]
+            "actions": {row["_id"]: row["count"] for row in rows},
+            "failed": {row["_id"]: row["failed"] for row in rows if row["failed"]},
+            "recent_actions": [row["_id"] for row in rows[:10]]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
+
+@router.post("/logs/summary/rebuild")
+async def rebuild_audit_summary(since: datetime, until: Optional[datetime] = None, current_user: dict = Depends(get_current_user)):
+    """Backfill or repair the hourly rollups for a time range"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    try:
+        buckets = await audit.rebuild_hourly_counts(since, until)
+        return {"message": f"Rebuilt {buckets} hourly buckets", "buckets": buckets}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding summary: {str(e)}")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from datetime import datetime
 from pydantic import BaseModel
 from ..models import (
@@ -8,15 +8,43 @@ from ..models import (
 )
 from ..crud import (
     get_student_master_record, check_user_exists, create_user,
-    get_user_by_email, update_user
+    get_user_by_email, update_user, upgrade_password_hash
 )
-from ..core.security import verify_password, create_access_token
-from ..deps import get_current_user
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ..core.security import verify_password, verify_and_rehash, verify_admin_password, hash_password, create_access_token
+from ..auth_claims import CLAIM_FIELDS, user_claims
+from ..deps import get_current_user, decode_credentials, security
+from fastapi.security import HTTPAuthorizationCredentials
+from ..token_revocation import token_revocations
+from ..security_utils import (
+    check_login_attempts, record_login_attempt,
+    issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_user_refresh_tokens,
+    RefreshTokenReused
+)
+import asyncio
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-limiter = Limiter(key_func=get_remote_address)
+
+
+def set_refresh_cookie(response: Response, token: str):
+    from ..core.settings import settings
+    response.set_cookie(
+        settings.REFRESH_COOKIE_NAME,
+        token,
+        max_age=settings.JWT_REFRESH_EXPIRATION_DAYS * 86400,
+        httponly=True,
+        secure=settings.ENVIRONMENT == "production",
+        samesite=settings.REFRESH_COOKIE_SAMESITE,
+        path="/api/auth"
+    )
+
+
+async def start_session(response: Response, user_id: str, req: Request):
+    """Issue a refresh token in an httpOnly cookie; login still succeeds if this fails"""
+    try:
+        token = await issue_refresh_token(user_id, req.client.host if req.client else None, req.headers.get("user-agent"))
+        set_refresh_cookie(response, token)
+    except Exception as e:
+        print(f"⚠️ Could not start refresh session: {str(e)}")
 
 
 def user_to_response(user: dict) -> UserResponse:
@@ -89,8 +117,7 @@ async def verify_registration(request: VerifyRegistrationRequest):
 
 
 @router.post("/signup", response_model=TokenResponse)
-@limiter.limit("3/minute")
-async def signup(request: SignupRequest, req: Request):
+async def signup(request: SignupRequest, req: Request, response: Response):
     current_year = datetime.now().year
     
     if request.passout_year > current_year + 1:
@@ -145,7 +172,8 @@ async def signup(request: SignupRequest, req: Request):
     """
     await send_email(user["email"], "Welcome to Alumni Portal 🎓", welcome_html)
     
-    token = create_access_token(data={"sub": str(user["_id"]), "role": user["role"]})
+    token = create_access_token(data=user_claims(user))
+    await start_session(response, str(user["_id"]), req)
     
     return TokenResponse(
         access_token=token,
@@ -154,9 +182,14 @@ async def signup(request: SignupRequest, req: Request):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, req: Request, response: Response):
     from ..core.settings import settings
     
+    client_ip = req.client.host if req.client else None
+    allowed, message = await check_login_attempts(request.email)
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=message)
+    
     # Check if this is admin login
     if request.email == settings.ADMIN_EMAIL:
         if not settings.ADMIN_PASSWORD_HASH:
@@ -165,13 +198,16 @@ async def login(request: LoginRequest):
                 detail="Admin account not configured"
             )
         
-        if not verify_password(request.password, settings.ADMIN_PASSWORD_HASH):
+        if not await verify_admin_password(request.password):
+            await record_login_attempt(request.email, False, client_ip)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
+        await record_login_attempt(request.email, True, client_ip)
         token = create_access_token(data={"sub": "admin", "role": "admin", "email": request.email, "_id": "admin"})
+        await start_session(response, "admin", req)
         
         from datetime import date
         return TokenResponse(
@@ -195,18 +231,25 @@ async def login(request: LoginRequest):
     user = await get_user_by_email(request.email)
     
     if not user:
+        await record_login_attempt(request.email, False, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    if not verify_password(request.password, user["password_hash"]):
+    valid, new_hash = await verify_and_rehash(request.password, user["password_hash"])
+    if not valid:
+        await record_login_attempt(request.email, False, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    token = create_access_token(data={"sub": str(user["_id"]), "role": user["role"]})
+    if new_hash:
+        await upgrade_password_hash(user["_id"], user["password_hash"], new_hash)
+    await record_login_attempt(request.email, True, client_ip)
+    token = create_access_token(data=user_claims(user))
+    await start_session(response, str(user["_id"]), req)
     
     return TokenResponse(
         access_token=token,
@@ -227,23 +270,40 @@ class ChangePasswordRequest(BaseModel):
 @router.post("/change-password")
 async def change_password(
     request: ChangePasswordRequest,
-    user: dict = Depends(get_current_user)
+    req: Request,
+    response: Response,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Change user password"""
-    if not verify_password(request.old_password, user["password_hash"]):
+    """Change user password; every other session is signed out"""
+    user = await get_current_user(credentials)
+    if not await asyncio.to_thread(verify_password, request.old_password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
-    from ..core.security import get_password_hash as hash_pwd
-    new_hash = hash_pwd(request.new_password)
-    updated = await update_user(str(user["_id"]), {"password_hash": new_hash})
-    
-    if not updated:
+    new_hash = await hash_password(request.new_password)
+    user_id = str(user["_id"])
+    # update_user refuses password_hash; compare-and-set against the hash just verified
+    if not await upgrade_password_hash(user["_id"], user["password_hash"], new_hash):
         raise HTTPException(status_code=500, detail="Failed to update password")
     
-    return {"message": "Password changed successfully"}
+    # A stolen refresh cookie must not outlive the old password
+    try:
+        await revoke_user_refresh_tokens(user_id)
+    except RuntimeError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    payload = decode_credentials(credentials)
+    if payload.get("jti") is not None:
+        await token_revocations.revoke(payload["jti"], datetime.utcfromtimestamp(payload["exp"]), user_id=user_id)
+    
+    # The caller stays signed in on a fresh session
+    await start_session(response, user_id, req)
+    return {
+        "message": "Password changed successfully",
+        "access_token": create_access_token(data=user_claims(user)),
+        "token_type": "bearer"
+    }
 
 
 @router.patch("/me", response_model=UserResponse)
@@ -269,20 +329,58 @@ async def update_current_user(
     return user_to_response(updated_user)
 
 
-@router.post("/logout")
-async def logout(user: dict = Depends(get_current_user)):
-    """Logout user - invalidates JWT by blacklisting"""
+@router.post("/refresh")
+async def refresh(req: Request, response: Response):
+    """Exchange the refresh cookie for a new access token, rotating the refresh token"""
+    from ..core.settings import settings
+    from bson import ObjectId
     from ..db import get_database
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
+    
+    refresh_token = req.cookies.get(settings.REFRESH_COOKIE_NAME)
+    if not refresh_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token missing")
+    
+    try:
+        user_id, new_refresh_token = await rotate_refresh_token(refresh_token)
+    except RefreshTokenReused:
+        response.delete_cookie(settings.REFRESH_COOKIE_NAME, path="/api/auth")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked, please log in again")
+    except RuntimeError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
+    
+    if user_id == "admin":
+        claims = {"sub": "admin", "role": "admin", "email": settings.ADMIN_EMAIL, "_id": "admin"}
+    else:
+        db = get_database()
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"auth_version": 1, **{f: 1 for f in CLAIM_FIELDS}})
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        claims = user_claims(user)
+    
+    if new_refresh_token:
+        set_refresh_cookie(response, new_refresh_token)
+    return {"access_token": create_access_token(data=claims), "token_type": "bearer"}
+
+
+@router.post("/logout")
+async def logout(req: Request, response: Response, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Logout user - revokes the presented access token and ends the refresh session"""
+    from ..core.settings import settings
+    payload = decode_credentials(credentials)
     
     try:
-        # Add token to blacklist (can be verified on protected endpoints)
-        await db.token_blacklist.insert_one({
-            "user_id": str(user["_id"]),
-            "created_at": datetime.utcnow()
-        })
+        refresh_token = req.cookies.get(settings.REFRESH_COOKIE_NAME)
+        if refresh_token:
+            await revoke_refresh_token(refresh_token)
+        response.delete_cookie(settings.REFRESH_COOKIE_NAME, path="/api/auth")
+        
+        jti = payload.get("jti")
+        # Tokens issued before they carried a jti simply run out
+        if jti is not None:
+            await token_revocations.revoke(jti, datetime.utcfromtimestamp(payload["exp"]), user_id=payload.get("sub"))
         return {"message": "Logged out successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
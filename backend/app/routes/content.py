@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
 from typing import Optional, List
 from ..deps import get_current_user
 from ..db import get_database
+from ..change_counters import change_counters, conditional_get
+from ..content_cache import content_cache
 from bson import ObjectId
 import base64
 
@@ -23,30 +25,30 @@ async def update_homepage_content(request: dict, user: dict = Depends(get_curren
             {"$set": {"type": "homepage", **request}},
             upsert=True
         )
+        await content_cache.refresh("content")
         return {"success": True, "message": "Homepage content updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+async def homepage_content() -> dict:
+    content = await content_cache.get("content", ("homepage", None))
+    if not content:
+        return {
+            "title": "Alumni Portal",
+            "subtitle": "Connect, Grow, and Give Back",
+            "description": "Join our vibrant community of alumni making an impact",
+            "cta_text": "Get Started",
+            "hero_image": None
+        }
+    content.pop("_id", None)
+    content.pop("type", None)
+    return content
+
 @router.get("/homepage")
-async def get_homepage_content():
+async def get_homepage_content(cache: dict = Depends(conditional_get("homepage", "content"))):
     """Get homepage content"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
     try:
-        content = await db.content.find_one({"type": "homepage"})
-        if not content:
-            return {
-                "title": "Alumni Portal",
-                "subtitle": "Connect, Grow, and Give Back",
-                "description": "Join our vibrant community of alumni making an impact",
-                "cta_text": "Get Started",
-                "hero_image": None
-            }
-        content.pop("_id", None)
-        content.pop("type", None)
-        return content
+        return await homepage_content()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -87,22 +89,54 @@ async def set_featured_jobs(request: dict, user: dict = Depends(get_current_user
             {"$set": {"type": "featured_jobs", "job_ids": request.get("job_ids", []), "title": request.get("title", "Featured Opportunities")}},
             upsert=True
         )
+        await content_cache.refresh("content")
         return {"success": True, "message": "Featured jobs updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+# Card fields for the featured carousels
+JOB_CARD = {"title": 1, "company": 1, "location": 1, "job_type": 1, "salary_range": 1,
+            "department": 1, "application_link": 1, "created_at": 1}
+EVENT_CARD = {"title": 1, "department": 1, "event_date": 1, "location": 1, "event_type": 1,
+              "is_paid": 1, "fee_amount": 1, "image": 1}
+
+# collection -> (change counter version, configured ids, cards)
+_featured_cards: dict = {}
+
+async def featured_cards(collection: str, ids: list, projection: dict) -> list:
+    """Approved items for the configured ids in configured order, cached until the ids or the collection change"""
+    key = tuple(str(i) for i in ids)
+    version = change_counters.version(collection)
+    cached = _featured_cards.get(collection)
+    if cached is not None and cached[0] == version and cached[1] == key:
+        return cached[2]
+
+    object_ids = [ObjectId(i) for i in key if ObjectId.is_valid(i)]
+    docs = []
+    if object_ids:
+        db = get_database()
+        if db is None:
+            raise HTTPException(status_code=500, detail="Database unavailable")
+        docs = await db[collection].find({"_id": {"$in": object_ids}, "approved": True}, projection).to_list(len(object_ids))
+    by_id = {str(d.pop("_id")): d for d in docs}
+    cards = [{"id": i, **by_id[i]} for i in key if i in by_id]
+    _featured_cards[collection] = (version, key, cards)
+    return cards
+
+async def featured_jobs() -> dict:
+    content = await content_cache.get("content", ("featured_jobs", None)) or {}
+    job_ids = content.get("job_ids", [])
+    return {
+        "job_ids": job_ids,
+        "title": content.get("title", "Featured Opportunities"),
+        "jobs": await featured_cards("jobs", job_ids, JOB_CARD)
+    }
+
 @router.get("/jobs-featured")
-async def get_featured_jobs():
-    """Get featured jobs"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
+async def get_featured_jobs(cache: dict = Depends(conditional_get("featured-jobs", "content", "jobs"))):
+    """Get featured jobs as cards"""
     try:
-        content = await db.content.find_one({"type": "featured_jobs"})
-        if not content:
-            return {"job_ids": [], "title": "Featured Opportunities"}
-        return {"job_ids": content.get("job_ids", []), "title": content.get("title", "Featured Opportunities")}
+        return await featured_jobs()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -122,22 +156,25 @@ async def set_featured_events(request: dict, user: dict = Depends(get_current_us
             {"$set": {"type": "featured_events", "event_ids": request.get("event_ids", []), "title": request.get("title", "Upcoming Events")}},
             upsert=True
         )
+        await content_cache.refresh("content")
         return {"success": True, "message": "Featured events updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+async def featured_events() -> dict:
+    content = await content_cache.get("content", ("featured_events", None)) or {}
+    event_ids = content.get("event_ids", [])
+    return {
+        "event_ids": event_ids,
+        "title": content.get("title", "Upcoming Events"),
+        "events": await featured_cards("events", event_ids, EVENT_CARD)
+    }
+
 @router.get("/events-featured")
-async def get_featured_events():
-    """Get featured events"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
+async def get_featured_events(cache: dict = Depends(conditional_get("featured-events", "content", "events"))):
+    """Get featured events as cards"""
     try:
-        content = await db.content.find_one({"type": "featured_events"})
-        if not content:
-            return {"event_ids": [], "title": "Upcoming Events"}
-        return {"event_ids": content.get("event_ids", []), "title": content.get("title", "Upcoming Events")}
+        return await featured_events()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -161,6 +198,7 @@ async def manage_sections(request: dict, user: dict = Depends(get_current_user))
             {"$set": {"type": "section", "name": section_name, **data_to_store}},
             upsert=True
         )
+        await content_cache.refresh("content")
         return {"success": True, "message": f"Section '{section_name}' updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -168,12 +206,8 @@ async def manage_sections(request: dict, user: dict = Depends(get_current_user))
 @router.get("/sections/{section_name}")
 async def get_section(section_name: str):
     """Get section content"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
     try:
-        section = await db.content.find_one({"type": "section", "name": section_name.lower()})
+        section = await content_cache.get("content", ("section", section_name.lower()))
         if not section:
             return {}
         # Only remove internal fields, keep all content fields
@@ -201,42 +235,38 @@ async def update_gallery_images(request: dict, user: dict = Depends(get_current_
             {"$set": {"type": "gallery", "images": gallery_images}},
             upsert=True
         )
+        await content_cache.refresh("content")
         return {"success": True, "message": "Gallery images updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+async def gallery_images() -> dict:
+    content = await content_cache.get("content", ("gallery", None))
+    if not content:
+        # Return default images if none configured
+        return {
+            "images": [
+                "https://images.unsplash.com/photo-1552664730-d307ca884978?w=800&h=400&fit=crop",
+                "https://images.unsplash.com/photo-1517457373614-b7152f800fd1?w=800&h=400&fit=crop",
+                "https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=400&fit=crop",
+                "https://images.unsplash.com/photo-1552664730-d307ca884978?w=800&h=400&fit=crop"
+            ]
+        }
+    return {"images": content.get("images", [])}
+
 @router.get("/gallery")
-async def get_gallery_images():
+async def get_gallery_images(cache: dict = Depends(conditional_get("gallery", "content"))):
     """Get carousel/gallery images for landing page"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
     try:
-        content = await db.content.find_one({"type": "gallery"})
-        if not content:
-            # Return default images if none configured
-            return {
-                "images": [
-                    "https://images.unsplash.com/photo-1552664730-d307ca884978?w=800&h=400&fit=crop",
-                    "https://images.unsplash.com/photo-1517457373614-b7152f800fd1?w=800&h=400&fit=crop",
-                    "https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=400&fit=crop",
-                    "https://images.unsplash.com/photo-1552664730-d307ca884978?w=800&h=400&fit=crop"
-                ]
-            }
-        return {"images": content.get("images", [])}
+        return await gallery_images()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/all")
 async def get_all_content():
     """Get all managed content"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
-    
     try:
-        content = await db.content.find({}).to_list(None)
+        content = await content_cache.values("content")
         return content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -4,7 +4,7 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/notices", tags=["department-notices"])
 
@@ -15,7 +15,7 @@ class NoticeCreate(BaseModel):
     file_url: Optional[str] = None
 
 @router.get("")
-async def get_notices(current_user: dict = Depends(get_faculty_user)):
+async def get_notices(current_user: dict = Depends(get_faculty_claims)):
     """Get all department notices"""
     db = get_database()
     if db is None:
@@ -43,7 +43,7 @@ async def get_notices(current_user: dict = Depends(get_faculty_user)):
     ]
 
 @router.post("")
-async def create_notice(request: NoticeCreate, current_user: dict = Depends(get_faculty_user)):
+async def create_notice(request: NoticeCreate, current_user: dict = Depends(get_faculty_claims)):
     """Create new department notice"""
     db = get_database()
     if db is None:
@@ -75,7 +75,7 @@ async def create_notice(request: NoticeCreate, current_user: dict = Depends(get_
 async def update_notice(
     notice_id: str,
     request: NoticeCreate,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Update department notice"""
     db = get_database()
@@ -106,7 +106,7 @@ async def update_notice(
     return {"message": "Notice updated successfully"}
 
 @router.delete("/{notice_id}")
-async def delete_notice(notice_id: str, current_user: dict = Depends(get_faculty_user)):
+async def delete_notice(notice_id: str, current_user: dict = Depends(get_faculty_claims)):
     """Delete department notice"""
     db = get_database()
     if db is None:
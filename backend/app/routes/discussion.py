@@ -4,7 +4,7 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_current_user
+from ..deps import get_current_claims
 
 router = APIRouter(prefix="/discussion", tags=["discussion"])
 
@@ -16,7 +16,7 @@ class ReplyCreate(BaseModel):
     content: str
 
 @router.get("/department")
-async def get_department_discussion(current_user: dict = Depends(get_current_user)):
+async def get_department_discussion(current_user: dict = Depends(get_current_claims)):
     """Get discussion posts for user's department"""
     db = get_database()
     if db is None:
@@ -50,7 +50,7 @@ async def get_department_discussion(current_user: dict = Depends(get_current_use
     return result
 
 @router.post("")
-async def create_post(request: PostCreate, current_user: dict = Depends(get_current_user)):
+async def create_post(request: PostCreate, current_user: dict = Depends(get_current_claims)):
     """Create discussion post (student/alumni)"""
     db = get_database()
     if db is None:
@@ -72,6 +72,7 @@ async def create_post(request: PostCreate, current_user: dict = Depends(get_curr
         "author_role": current_user.get("role"),
         "status": "approved",
         "created_at": datetime.utcnow(),
+        "last_activity_at": datetime.utcnow(),
         "replies_count": 0
     }
     
@@ -85,7 +86,7 @@ async def create_post(request: PostCreate, current_user: dict = Depends(get_curr
 async def reply_to_post(
     post_id: str,
     request: ReplyCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_claims)
 ):
     """Reply to discussion post"""
     db = get_database()
@@ -113,13 +114,13 @@ async def reply_to_post(
     await db.discussion_replies.insert_one(reply_doc)
     await db.discussion_posts.update_one(
         {"_id": obj_id},
-        {"$inc": {"replies_count": 1}}
+        {"$inc": {"replies_count": 1}, "$set": {"last_activity_at": datetime.utcnow()}}
     )
     
     return {"message": "Reply posted successfully"}
 
 @router.get("/{post_id}/replies")
-async def get_post_replies(post_id: str, current_user: dict = Depends(get_current_user)):
+async def get_post_replies(post_id: str, current_user: dict = Depends(get_current_claims)):
     """Get replies to a post"""
     db = get_database()
     if db is None:
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
 from ..deps import get_current_user
+from ..maintenance import JobContext, lock_inactive_posts
 
 router = APIRouter(prefix="/discussion/moderation", tags=["discussion-moderation"])
 
@@ -180,25 +181,12 @@ async def auto_lock_inactive_posts(days: int = 30, current_user: dict = Depends(
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        result = await db.discussion_posts.update_many(
-            {
-                "created_at": {"$lt": cutoff_date},
-                "locked": {"$exists": False}
-            },
-            {
-                "$set": {
-                    "locked": True,
-                    "locked_at": datetime.utcnow(),
-                    "locked_reason": "Inactivity"
-                }
-            }
-        )
+        # Same sweep the scheduler runs nightly, in bounded batches
+        locked_count = await lock_inactive_posts(JobContext(batch_size=500), days=days)
         
         return {
-            "message": f"Locked {result.modified_count} inactive posts",
-            "locked_count": result.modified_count
+            "message": f"Locked {locked_count} inactive posts",
+            "locked_count": locked_count
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error locking posts: {str(e)}")
@@ -1,31 +1,29 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Header
+from typing import List, Optional
 from ..models import CreateOrderRequest, CreateOrderResponse, VerifyPaymentRequest
 from ..deps import get_current_user
 from ..core.settings import settings
 from ..db import get_database
+from ..services.payment_gateway import get_payment_gateway, GatewayBadRequest, GatewayUnavailable
+from ..services.order_idempotency import donation_orders, resolve_idempotency_key, IdempotencyKeyReused
 from bson import ObjectId
-import razorpay
-import hmac
-import hashlib
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
 router = APIRouter(prefix="/donations", tags=["Donations"])
 
 
-def get_razorpay_client():
-    if not settings.RZP_KEY_ID or not settings.RZP_KEY_SECRET:
-        return None
-    return razorpay.Client(auth=(settings.RZP_KEY_ID, settings.RZP_KEY_SECRET))
-
-
 @router.post("/create-order", response_model=CreateOrderResponse)
-async def create_donation_order(request: CreateOrderRequest, user: dict = Depends(get_current_user)):
+async def create_donation_order(
+    request: CreateOrderRequest,
+    user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """Create a Razorpay order for donation"""
     try:
-        client = get_razorpay_client()
+        gateway = get_payment_gateway()
         
-        if not client:
+        if not gateway:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Payment service not configured"
@@ -45,45 +43,74 @@ async def create_donation_order(request: CreateOrderRequest, user: dict = Depend
                 detail="User ID not found"
             )
         
-        order_data = {
-            "amount": amount,
-            "currency": "INR",
-            "receipt": f"don_{user_id[-8:]}_{int(datetime.utcnow().timestamp()) % 10000}",
-            "notes": {
-                "purpose": "donation",
-                "user_id": user_id,
-                "donation_purpose": request.metadata.get("donation_purpose", "general") if request.metadata else "general"
-            }
-        }
-        
-        order = client.order.create(data=order_data)
-        
         db = get_database()
         if db is None:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
         
-        try:
-            await db.donations.insert_one({
+        donation_purpose = request.metadata.get("donation_purpose", "general") if request.metadata else "general"
+        
+        async def create_upstream_order():
+            order_data = {
+                "amount": amount,
+                "currency": "INR",
+                "receipt": f"don_{user_id[-8:]}_{int(datetime.utcnow().timestamp()) % 10000}",
+                "notes": {
+                    "purpose": "donation",
+                    "user_id": user_id,
+                    "donation_purpose": donation_purpose
+                }
+            }
+            
+            order = await gateway.create_order(order_data)
+            record = {
                 "user_id": ObjectId(user_id),
                 "order_id": order["id"],
                 "amount": amount,
-                "donation_purpose": request.metadata.get("donation_purpose", "general") if request.metadata else "general",
+                "currency": order["currency"],
+                "donation_purpose": donation_purpose,
                 "status": "created",
+                "idempotency_key": key,
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
-            })
-        except Exception as db_error:
-            print(f"⚠️ Warning: Could not save donation record: {str(db_error)}")
+            }
+            
+            try:
+                await db.donations.insert_one(record)
+            except DuplicateKeyError:
+                raise
+            except Exception as db_error:
+                print(f"⚠️ Warning: Could not save donation record: {str(db_error)}")
+            return record
+        
+        key = resolve_idempotency_key(user_id, "donation", amount, idempotency_key, extra=donation_purpose)
+        order, _ = await donation_orders.get_or_create(key, create_upstream_order, amount)
         
         return CreateOrderResponse(
-            order_id=order["id"],
+            order_id=order["order_id"],
             amount=order["amount"],
-            currency=order["currency"],
+            currency=order.get("currency", "INR"),
             key_id=settings.RZP_KEY_ID
         )
         
     except HTTPException:
         raise
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except GatewayBadRequest as e:
+        print(f"❌ Razorpay BadRequest: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid donation request: {str(e)}"
+        )
+    except GatewayUnavailable as e:
+        print(f"❌ Razorpay unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment service temporarily unavailable. Please try again."
+        )
     except Exception as e:
         print(f"❌ Error creating donation order: {str(e)}")
         raise HTTPException(
@@ -96,9 +123,9 @@ async def create_donation_order(request: CreateOrderRequest, user: dict = Depend
 async def verify_donation(request: VerifyPaymentRequest, user: dict = Depends(get_current_user)):
     """Verify donation payment"""
     try:
-        client = get_razorpay_client()
+        gateway = get_payment_gateway()
         
-        if not client:
+        if not gateway:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Payment service not configured"
@@ -106,16 +133,11 @@ async def verify_donation(request: VerifyPaymentRequest, user: dict = Depends(ge
         
         user_id = str(user.get('_id', ''))
         
-        expected_signature = request.razorpay_signature
-        data_to_verify = f"{request.razorpay_order_id}|{request.razorpay_payment_id}"
-        
-        computed_signature = hmac.new(
-            settings.RZP_KEY_SECRET.encode(),
-            data_to_verify.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        if computed_signature != expected_signature:
+        if not gateway.verify_payment_signature(
+            request.razorpay_order_id,
+            request.razorpay_payment_id,
+            request.razorpay_signature
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid payment signature"
@@ -149,6 +171,7 @@ async def verify_donation(request: VerifyPaymentRequest, user: dict = Depends(ge
                 }
             }
         )
+        donation_orders.invalidate(donation.get("idempotency_key"))
         
         return {
             "success": True,
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from ..deps import get_current_admin
 from ..db import get_database
+from ..change_counters import conditional_get
+from ..content_cache import content_cache
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -11,28 +13,28 @@ class DonationStats(BaseModel):
     scholarships_awarded: int
     events_organized: int
 
+async def donation_stats() -> dict:
+    stats = await content_cache.get("donation_stats", "main")
+    
+    if not stats:
+        default_stats = {
+            "total_donated": 5000000,
+            "scholarships_awarded": 500,
+            "events_organized": 100
+        }
+        return default_stats
+    
+    return {
+        "total_donated": stats.get("total_donated", 5000000),
+        "scholarships_awarded": stats.get("scholarships_awarded", 500),
+        "events_organized": stats.get("events_organized", 100)
+    }
+
 @router.get("")
-async def get_donation_stats():
+async def get_donation_stats(cache: dict = Depends(conditional_get("donation-stats", "donation_stats"))):
     """Get donation impact stats - public endpoint"""
     try:
-        db = get_database()
-        if db is None:
-            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection unavailable")
-        stats = await db.donation_stats.find_one({"_id": "main"})
-        
-        if not stats:
-            default_stats = {
-                "total_donated": 5000000,
-                "scholarships_awarded": 500,
-                "events_organized": 100
-            }
-            return default_stats
-        
-        return {
-            "total_donated": stats.get("total_donated", 5000000),
-            "scholarships_awarded": stats.get("scholarships_awarded", 500),
-            "events_organized": stats.get("events_organized", 100)
-        }
+        return await donation_stats()
     except Exception as e:
         print(f"❌ Error fetching stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch stats")
@@ -56,6 +58,7 @@ async def update_donation_stats(stats: DonationStats, admin: dict = Depends(get_
             },
             upsert=True
         )
+        await content_cache.refresh("donation_stats")
         return {"success": True, "message": "Stats updated successfully"}
     except Exception as e:
         print(f"❌ Error updating stats: {str(e)}")
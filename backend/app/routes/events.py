@@ -1,17 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from ..models import EventCreate, EventResponse
 from ..crud import (
     create_event, get_events, get_event_by_id, register_for_event,
     get_user_by_id
 )
-from ..deps import get_current_user, get_alumni_with_membership, get_active_member
+from ..deps import get_current_claims, get_alumni_with_membership_claims, get_active_member_claims
+from ..responses import ModelSerializer
+from ..change_counters import change_counters, conditional_get
+from ..single_flight import single_flight
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
 
-def event_to_response(event: dict) -> EventResponse:
-    return EventResponse(
+event_list = ModelSerializer(EventResponse)
+
+
+def event_fields(event: dict) -> dict:
+    return dict(
         id=str(event["_id"]),
         title=event["title"],
         department=event.get("department", "All"),
@@ -29,28 +35,39 @@ def event_to_response(event: dict) -> EventResponse:
     )
 
 
-@router.get("", response_model=List[EventResponse])
-async def list_events():
-    # Public endpoint - show approved events to everyone
+def event_to_response(event: dict) -> EventResponse:
+    return EventResponse(**event_fields(event))
+
+
+async def approved_event_list() -> bytes:
     events = await get_events(approved_only=True)
-    return [event_to_response(e) for e in events]
+    return event_list.dump(event_fields(e) for e in events)
+
+
+@router.get("", response_model=List[EventResponse])
+async def list_events(cache: dict = Depends(conditional_get("events"))):
+    # Public endpoint - show approved events to everyone. The counter version
+    # keys the flight so a read started before a write never answers for the new ETag
+    body = await single_flight.do("GET /events", approved_event_list,
+                                  params={"v": change_counters.version("events")})
+    return Response(body, media_type="application/json", headers=cache)
 
 
 @router.get("/all", response_model=List[EventResponse])
-async def list_all_events(user: dict = Depends(get_current_user)):
+async def list_all_events(user: dict = Depends(get_current_claims)):
     if user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     events = await get_events(approved_only=False)
-    return [event_to_response(e) for e in events]
+    return event_list.response(event_fields(e) for e in events)
 
 
 @router.post("", response_model=EventResponse)
 async def create_new_event(
     request: EventCreate,
-    user: dict = Depends(get_alumni_with_membership)
+    user: dict = Depends(get_alumni_with_membership_claims)
 ):
     event = await create_event(request.model_dump(), str(user["_id"]))
     
@@ -91,7 +108,7 @@ async def create_new_event(
 
 
 @router.get("/{event_id}", response_model=EventResponse)
-async def get_event(event_id: str, user: dict = Depends(get_current_user)):
+async def get_event(event_id: str, user: dict = Depends(get_current_claims)):
     event = await get_event_by_id(event_id)
     
     if not event:
@@ -112,7 +129,7 @@ async def get_event(event_id: str, user: dict = Depends(get_current_user)):
 @router.post("/{event_id}/register")
 async def register_event(
     event_id: str,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_claims)
 ):
     event = await get_event_by_id(event_id)
     
@@ -163,7 +180,7 @@ async def register_event(
 @router.post("/{event_id}/complete-registration")
 async def complete_paid_registration(
     event_id: str,
-    user: dict = Depends(get_active_member)
+    user: dict = Depends(get_active_member_claims)
 ):
     event = await get_event_by_id(event_id)
     
@@ -4,11 +4,11 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_current_user
+from ..deps import get_current_claims
 
 router = APIRouter(prefix="/faculty", tags=["faculty"])
 
-async def get_faculty_user_verified(current_user: dict = Depends(get_current_user)):
+async def get_faculty_user_verified(current_user: dict = Depends(get_current_claims)):
     """Verify current authenticated user is faculty"""
     if current_user.get("role") != "faculty":
         raise HTTPException(status_code=403, detail="Faculty access required")
@@ -2,12 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime, timedelta
 from typing import List
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/activity", tags=["faculty-activity"])
 
 @router.get("/feed")
-async def get_department_activity_feed(current_user: dict = Depends(get_faculty_user)):
+async def get_department_activity_feed(current_user: dict = Depends(get_faculty_claims)):
     """Get department activity feed"""
     db = get_database()
     if db is None:
@@ -79,7 +79,7 @@ async def get_department_activity_feed(current_user: dict = Depends(get_faculty_
     return activities[:50]
 
 @router.get("/stats")
-async def get_department_stats(current_user: dict = Depends(get_faculty_user)):
+async def get_department_stats(current_user: dict = Depends(get_faculty_claims)):
     """Get department statistics"""
     db = get_database()
     if db is None:
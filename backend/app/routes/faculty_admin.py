@@ -5,7 +5,8 @@ from pydantic import BaseModel, EmailStr
 from bson import ObjectId
 from ..db import get_database
 from ..deps import get_current_admin
-from ..core.security import get_password_hash, create_access_token
+from ..auth_claims import auth_versions
+from ..core.security import hash_password, create_access_token
 from ..models import UserResponse
 
 router = APIRouter(prefix="/admin/faculty", tags=["faculty-admin"])
@@ -67,7 +68,7 @@ async def create_faculty(
         "department": request.department,
         "phone": request.phone or "",
         "registration_number": request.registration_number,
-        "password_hash": get_password_hash(temp_password),
+        "password_hash": await hash_password(temp_password),
         "role": "faculty",
         "created_at": datetime.utcnow(),
         "is_blocked": False
@@ -160,6 +161,7 @@ async def update_faculty(
     
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update faculty")
+    await auth_versions.record_change([faculty_id])
     
     return {
         "id": faculty_id,
@@ -192,5 +194,6 @@ async def delete_faculty(
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=500, detail="Failed to delete faculty")
+    await auth_versions.record_change([faculty_id])
     
     return {"message": "Faculty deleted successfully", "faculty_id": faculty_id}
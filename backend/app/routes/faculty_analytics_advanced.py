@@ -1,12 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from datetime import datetime, timedelta
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/analytics", tags=["faculty-analytics-advanced"])
 
 @router.get("/events")
-async def get_event_analytics(current_user: dict = Depends(get_faculty_user)):
+async def get_event_analytics(current_user: dict = Depends(get_faculty_claims)):
     """Event participation statistics"""
     db = get_database()
     if db is None:
@@ -40,7 +40,7 @@ async def get_event_analytics(current_user: dict = Depends(get_faculty_user)):
     }
 
 @router.get("/jobs")
-async def get_job_analytics(current_user: dict = Depends(get_faculty_user)):
+async def get_job_analytics(current_user: dict = Depends(get_faculty_claims)):
     """Job application statistics"""
     db = get_database()
     if db is None:
@@ -72,7 +72,7 @@ async def get_job_analytics(current_user: dict = Depends(get_faculty_user)):
     }
 
 @router.get("/newsletters")
-async def get_newsletter_analytics(current_user: dict = Depends(get_faculty_user)):
+async def get_newsletter_analytics(current_user: dict = Depends(get_faculty_claims)):
     """Newsletter statistics"""
     db = get_database()
     if db is None:
@@ -96,7 +96,7 @@ async def get_newsletter_analytics(current_user: dict = Depends(get_faculty_user
     }
 
 @router.get("/achievements")
-async def get_achievement_analytics(current_user: dict = Depends(get_faculty_user)):
+async def get_achievement_analytics(current_user: dict = Depends(get_faculty_claims)):
     """Achievement statistics"""
     db = get_database()
     if db is None:
@@ -116,7 +116,7 @@ async def get_achievement_analytics(current_user: dict = Depends(get_faculty_use
     }
 
 @router.get("/engagement")
-async def get_engagement_analytics(current_user: dict = Depends(get_faculty_user)):
+async def get_engagement_analytics(current_user: dict = Depends(get_faculty_claims)):
     """Overall engagement metrics"""
     db = get_database()
     if db is None:
@@ -4,7 +4,8 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
+from ..change_counters import change_counters
 
 router = APIRouter(prefix="/faculty/announcements", tags=["faculty-announcements"])
 
@@ -15,7 +16,7 @@ class AnnouncementCreate(BaseModel):
     target_audience: str = "all"  # students, alumni, all
 
 @router.get("")
-async def get_faculty_announcements(current_user: dict = Depends(get_faculty_user)):
+async def get_faculty_announcements(current_user: dict = Depends(get_faculty_claims)):
     """Get announcements for faculty's department"""
     db = get_database()
     if db is None:
@@ -46,7 +47,7 @@ async def get_faculty_announcements(current_user: dict = Depends(get_faculty_use
 @router.post("")
 async def create_faculty_announcement(
     request: AnnouncementCreate,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Create announcement for department"""
     db = get_database()
@@ -70,6 +71,7 @@ async def create_faculty_announcement(
     }
     
     result = await db.announcements.insert_one(announcement_doc)
+    await change_counters.bump("announcements")
     
     return {
         "id": str(result.inserted_id),
@@ -79,7 +81,7 @@ async def create_faculty_announcement(
 @router.delete("/{announcement_id}")
 async def delete_announcement(
     announcement_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Delete faculty announcement"""
     db = get_database()
@@ -100,4 +102,5 @@ async def delete_announcement(
         raise HTTPException(status_code=403, detail="Not authorized to delete this announcement")
     
     await db.announcements.delete_one({"_id": obj_id})
+    await change_counters.bump("announcements")
     return {"message": "Announcement deleted successfully"}
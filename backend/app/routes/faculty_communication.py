@@ -4,7 +4,7 @@ from typing import Optional, List
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/communication", tags=["faculty-communication"])
 
@@ -15,7 +15,7 @@ class BulkEmailRequest(BaseModel):
     passout_years: Optional[List[int]] = None
 
 @router.post("/sendemail")
-async def send_bulk_email(request: BulkEmailRequest, current_user: dict = Depends(get_faculty_user)):
+async def send_bulk_email(request: BulkEmailRequest, current_user: dict = Depends(get_faculty_claims)):
     """Send bulk email to department users"""
     db = get_database()
     if db is None:
@@ -62,7 +62,7 @@ async def send_bulk_email(request: BulkEmailRequest, current_user: dict = Depend
     }
 
 @router.get("/email-logs")
-async def get_email_logs(current_user: dict = Depends(get_faculty_user)):
+async def get_email_logs(current_user: dict = Depends(get_faculty_claims)):
     """Get email sending history"""
     db = get_database()
     if db is None:
@@ -89,7 +89,7 @@ async def get_email_logs(current_user: dict = Depends(get_faculty_user)):
     ]
 
 @router.get("/discussion")
-async def get_discussion(current_user: dict = Depends(get_faculty_user)):
+async def get_discussion(current_user: dict = Depends(get_faculty_claims)):
     """Get discussion posts for moderation"""
     db = get_database()
     if db is None:
@@ -117,7 +117,7 @@ async def get_discussion(current_user: dict = Depends(get_faculty_user)):
     ]
 
 @router.put("/discussion/{post_id}/approve")
-async def approve_post(post_id: str, current_user: dict = Depends(get_faculty_user)):
+async def approve_post(post_id: str, current_user: dict = Depends(get_faculty_claims)):
     """Approve discussion post"""
     db = get_database()
     if db is None:
@@ -139,7 +139,7 @@ async def approve_post(post_id: str, current_user: dict = Depends(get_faculty_us
     return {"message": "Post approved"}
 
 @router.delete("/discussion/{post_id}")
-async def delete_post(post_id: str, current_user: dict = Depends(get_faculty_user)):
+async def delete_post(post_id: str, current_user: dict = Depends(get_faculty_claims)):
     """Delete inappropriate discussion post"""
     db = get_database()
     if db is None:
@@ -4,14 +4,15 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
+from ..auth_claims import auth_versions
 
 router = APIRouter(prefix="/faculty", tags=["faculty"])
 
 
 @router.get("/dashboard")
 async def get_faculty_dashboard(
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Get faculty dashboard stats"""
     db = get_database()
@@ -47,7 +48,7 @@ async def get_faculty_dashboard(
 @router.get("/events")
 async def get_faculty_events(
     status_filter: Optional[str] = None,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Get events for faculty's department"""
     db = get_database()
@@ -94,7 +95,7 @@ class AlumniUpdateRequest(BaseModel):
 @router.get("/alumni")
 async def get_faculty_alumni(
     department: Optional[str] = None,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Get alumni for faculty's department"""
     db = get_database()
@@ -126,7 +127,7 @@ async def get_faculty_alumni(
 @router.post("/alumni")
 async def create_faculty_alumni(
     request: AlumniCreateRequest,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Add new alumni to department"""
     db = get_database()
@@ -164,7 +165,7 @@ async def create_faculty_alumni(
 async def update_faculty_alumni(
     alumni_id: str,
     request: AlumniUpdateRequest,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Edit alumni details"""
     db = get_database()
@@ -202,13 +203,15 @@ async def update_faculty_alumni(
         update_data["location"] = request.location
     
     await db.users.update_one({"_id": ObjectId(alumni_id)}, {"$set": update_data})
+    if "name" in update_data:
+        await auth_versions.record_change([alumni_id])
     return {"message": "Alumni updated successfully"}
 
 
 @router.delete("/alumni/{alumni_id}")
 async def delete_faculty_alumni(
     alumni_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Delete alumni"""
     db = get_database()
@@ -228,13 +231,14 @@ async def delete_faculty_alumni(
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     await db.users.delete_one({"_id": ObjectId(alumni_id)})
+    await auth_versions.record_change([alumni_id])
     return {"message": "Alumni deleted successfully"}
 
 
 @router.post("/alumni/{alumni_id}/approve")
 async def approve_faculty_alumni(
     alumni_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Approve pending alumni registration"""
     db = get_database()
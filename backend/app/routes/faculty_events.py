@@ -4,7 +4,8 @@ from datetime import datetime
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
+from ..change_counters import change_counters
 
 router = APIRouter(prefix="/faculty/events", tags=["faculty-events"])
 
@@ -31,7 +32,7 @@ class EventUpdateRequest(BaseModel):
 @router.get("")
 async def list_faculty_events(
     status_filter: Optional[str] = None,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """List events for faculty's department"""
     db = get_database()
@@ -67,7 +68,7 @@ async def list_faculty_events(
 @router.post("")
 async def create_faculty_event(
     request: EventCreateRequest,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Create event (faculty for their department)"""
     db = get_database()
@@ -95,6 +96,7 @@ async def create_faculty_event(
     }
     
     result = await db.events.insert_one(event)
+    await change_counters.bump("events")
     
     return {
         "id": str(result.inserted_id),
@@ -106,7 +108,7 @@ async def create_faculty_event(
 async def update_faculty_event(
     event_id: str,
     request: EventUpdateRequest,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Update event (faculty can only update own events in pending status)"""
     db = get_database()
@@ -141,6 +143,7 @@ async def update_faculty_event(
         update_data["event_type"] = request.event_type
     
     await db.events.update_one({"_id": ObjectId(event_id)}, {"$set": update_data})
+    await change_counters.bump("events")
     
     return {"message": "Event updated"}
 
@@ -148,7 +151,7 @@ async def update_faculty_event(
 @router.post("/{event_id}/approve")
 async def approve_event(
     event_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Faculty approves event in their department"""
     db = get_database()
@@ -175,6 +178,7 @@ async def approve_event(
         {"_id": ObjectId(event_id)},
         {"$set": {"status": "approved", "approved": True}}
     )
+    await change_counters.bump("events")
     
     return {"message": "Event approved"}
 
@@ -182,7 +186,7 @@ async def approve_event(
 @router.post("/{event_id}/reject")
 async def reject_event(
     event_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Faculty rejects event in their department"""
     db = get_database()
@@ -204,6 +208,7 @@ async def reject_event(
         {"_id": ObjectId(event_id)},
         {"$set": {"status": "rejected"}}
     )
+    await change_counters.bump("events")
     
     return {"message": "Event rejected"}
 
@@ -211,7 +216,7 @@ async def reject_event(
 @router.delete("/{event_id}")
 async def delete_event(
     event_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Delete event (only if created by faculty)"""
     db = get_database()
@@ -231,5 +236,6 @@ async def delete_event(
         raise HTTPException(status_code=403, detail="Can only delete events you created")
     
     await db.events.delete_one({"_id": ObjectId(event_id)})
+    await change_counters.bump("events")
     
     return {"message": "Event deleted"}
@@ -5,7 +5,7 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/gallery", tags=["faculty-gallery"])
 
@@ -22,7 +22,7 @@ class GalleryUpdate(BaseModel):
     category: Optional[str] = None
 
 @router.get("")
-async def get_faculty_gallery(current_user: dict = Depends(get_faculty_user)):
+async def get_faculty_gallery(current_user: dict = Depends(get_faculty_claims)):
     """Get gallery items for faculty's department"""
     db = get_database()
     if db is None:
@@ -52,7 +52,7 @@ async def get_faculty_gallery(current_user: dict = Depends(get_faculty_user)):
 @router.post("")
 async def create_gallery_item(
     request: GalleryCreate,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Create gallery item for department"""
     db = get_database()
@@ -84,7 +84,7 @@ async def create_gallery_item(
 async def update_gallery_item(
     gallery_id: str,
     request: GalleryUpdate,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Update gallery item"""
     db = get_database()
@@ -119,7 +119,7 @@ async def update_gallery_item(
 @router.delete("/{gallery_id}")
 async def delete_gallery_item(
     gallery_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Delete gallery item"""
     db = get_database()
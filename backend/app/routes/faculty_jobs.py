@@ -4,7 +4,8 @@ from datetime import datetime
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
+from ..change_counters import change_counters
 
 router = APIRouter(prefix="/faculty/jobs", tags=["faculty-jobs"])
 
@@ -21,7 +22,7 @@ class JobCreateRequest(BaseModel):
 @router.get("")
 async def list_faculty_jobs(
     status_filter: Optional[str] = None,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """List jobs for faculty's department"""
     db = get_database()
@@ -57,7 +58,7 @@ async def list_faculty_jobs(
 @router.post("")
 async def create_faculty_job(
     request: JobCreateRequest,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Create job for faculty's department"""
     db = get_database()
@@ -83,6 +84,7 @@ async def create_faculty_job(
     }
     
     result = await db.jobs.insert_one(job)
+    await change_counters.bump("jobs")
     
     return {
         "id": str(result.inserted_id),
@@ -93,7 +95,7 @@ async def create_faculty_job(
 @router.post("/{job_id}/approve")
 async def approve_job(
     job_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Faculty approves job in their department"""
     db = get_database()
@@ -115,6 +117,7 @@ async def approve_job(
         {"_id": ObjectId(job_id)},
         {"$set": {"status": "approved", "approved": True}}
     )
+    await change_counters.bump("jobs")
     
     return {"message": "Job approved"}
 
@@ -122,7 +125,7 @@ async def approve_job(
 @router.post("/{job_id}/reject")
 async def reject_job(
     job_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Faculty rejects job in their department"""
     db = get_database()
@@ -144,5 +147,6 @@ async def reject_job(
         {"_id": ObjectId(job_id)},
         {"$set": {"status": "rejected"}}
     )
+    await change_counters.bump("jobs")
     
     return {"message": "Job rejected"}
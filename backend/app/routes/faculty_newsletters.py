@@ -4,7 +4,7 @@ from typing import Optional
 from pydantic import BaseModel
 from bson import ObjectId
 from ..db import get_database
-from ..deps import get_faculty_user
+from ..deps import get_faculty_claims
 
 router = APIRouter(prefix="/faculty/newsletters", tags=["faculty-newsletters"])
 
@@ -15,7 +15,7 @@ class NewsletterCreate(BaseModel):
     semester: Optional[str] = None
 
 @router.get("")
-async def get_faculty_newsletters(current_user: dict = Depends(get_faculty_user)):
+async def get_faculty_newsletters(current_user: dict = Depends(get_faculty_claims)):
     """Get newsletters for faculty's department"""
     db = get_database()
     if db is None:
@@ -46,7 +46,7 @@ async def get_faculty_newsletters(current_user: dict = Depends(get_faculty_user)
 @router.post("")
 async def create_faculty_newsletter(
     request: NewsletterCreate,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Create newsletter for department"""
     db = get_database()
@@ -79,7 +79,7 @@ async def create_faculty_newsletter(
 @router.delete("/{newsletter_id}")
 async def delete_newsletter(
     newsletter_id: str,
-    current_user: dict = Depends(get_faculty_user)
+    current_user: dict = Depends(get_faculty_claims)
 ):
     """Delete faculty newsletter"""
     db = get_database()
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from ..models import JobCreate, JobResponse
 from ..crud import create_job, get_jobs, get_job_by_id, get_user_by_id
-from ..deps import get_current_user, get_alumni_with_membership
+from ..deps import get_current_claims, get_alumni_with_membership_claims
+from ..responses import ModelSerializer
+from ..change_counters import change_counters
+from ..single_flight import auth_scope, single_flight
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
+job_list = ModelSerializer(JobResponse)
 
 
 async def job_to_response(job: dict) -> JobResponse:
@@ -27,27 +31,33 @@ async def job_to_response(job: dict) -> JobResponse:
     )
 
 
-@router.get("", response_model=List[JobResponse])
-async def list_jobs(user: dict = Depends(get_current_user)):
+async def approved_job_list() -> bytes:
     jobs = await get_jobs(approved_only=True)
-    return [await job_to_response(j) for j in jobs]
+    return job_list.dump([await job_to_response(j) for j in jobs])
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(user: dict = Depends(get_current_claims)):
+    body = await single_flight.do("GET /jobs", approved_job_list,
+                                  params={"v": change_counters.version("jobs")}, scope=auth_scope(user))
+    return Response(body, media_type="application/json")
 
 
 @router.get("/all", response_model=List[JobResponse])
-async def list_all_jobs(user: dict = Depends(get_current_user)):
+async def list_all_jobs(user: dict = Depends(get_current_claims)):
     if user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     jobs = await get_jobs(approved_only=False)
-    return [await job_to_response(j) for j in jobs]
+    return job_list.response([await job_to_response(j) for j in jobs])
 
 
 @router.post("", response_model=JobResponse)
 async def create_new_job(
     request: JobCreate,
-    user: dict = Depends(get_alumni_with_membership)
+    user: dict = Depends(get_alumni_with_membership_claims)
 ):
     if user.get("role") == "student":
         raise HTTPException(
@@ -90,7 +100,7 @@ async def create_new_job(
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_single_job(job_id: str, user: dict = Depends(get_current_user)):
+async def get_single_job(job_id: str, user: dict = Depends(get_current_claims)):
     job = await get_job_by_id(job_id)
     
     if not job:
@@ -109,7 +119,7 @@ async def get_single_job(job_id: str, user: dict = Depends(get_current_user)):
 
 
 @router.get("/my/postings", response_model=List[JobResponse])
-async def get_my_jobs(user: dict = Depends(get_current_user)):
+async def get_my_jobs(user: dict = Depends(get_current_claims)):
     from ..db import get_database
     from bson import ObjectId
     
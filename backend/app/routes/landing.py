@@ -0,0 +1,84 @@
+"""Landing page bundle
+
+Everything the public landing page renders (homepage hero, gallery, featured
+events and jobs, announcements, donation stats) in one response, assembled
+concurrently. The encoded payload is kept for LANDING_CACHE_SECONDS and only
+while the ETag (built from the change counters of the collections it reads)
+is unchanged, so an edit shows up on the next request.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from ..change_counters import conditional_get
+from ..core.settings import settings
+from ..responses import json_response
+from .announcements import latest_announcements
+from .content import featured_events, featured_jobs, gallery_images, homepage_content
+from .donations_admin import donation_stats
+
+router = APIRouter(prefix="/landing", tags=["Landing"])
+
+LANDING_COLLECTIONS = ("content", "announcements", "donation_stats", "events", "jobs")
+
+
+async def build_landing() -> dict:
+    homepage, gallery, events, jobs, announcements, stats = await asyncio.gather(
+        homepage_content(),
+        gallery_images(),
+        featured_events(),
+        featured_jobs(),
+        latest_announcements(),
+        donation_stats()
+    )
+    return {
+        "homepage": homepage,
+        "gallery": gallery,
+        "featured_events": events,
+        "featured_jobs": jobs,
+        "announcements": announcements,
+        "donation_stats": stats
+    }
+
+
+class LandingCache:
+    """The last encoded payload, valid for one ETag until it expires"""
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.body: Optional[bytes] = None
+        self.expires_at = 0.0
+        self.builds = 0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, etag: str) -> bool:
+        return self.body is not None and self.etag == etag and time.monotonic() < self.expires_at
+
+    async def get(self, etag: str) -> bytes:
+        if self._fresh(etag):
+            return self.body
+        # One rebuild at a time; concurrent requests wait for it
+        async with self._lock:
+            if not self._fresh(etag):
+                self.body = json_response(await build_landing()).body
+                self.etag = etag
+                self.expires_at = time.monotonic() + settings.LANDING_CACHE_SECONDS
+                self.builds += 1
+            return self.body
+
+
+landing_cache = LandingCache()
+
+
+@router.get("")
+async def get_landing(cache: dict = Depends(conditional_get("landing", *LANDING_COLLECTIONS))):
+    """Public landing page data in one round trip"""
+    try:
+        body = await landing_cache.get(cache["ETag"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    return Response(body, media_type="application/json", headers=cache)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime
 from ..models import NotificationResponse, Notification
 from ..db import get_database
-from ..deps import get_current_user
+from ..deps import get_current_claims
 from bson import ObjectId
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -13,7 +13,7 @@ async def get_notifications(
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_claims)
 ):
     """Get user notifications"""
     db = get_database()
@@ -42,7 +42,7 @@ async def get_notifications(
 @router.put("/{notification_id}/read")
 async def mark_as_read(
     notification_id: str,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_claims)
 ):
     """Mark notification as read"""
     db = get_database()
@@ -65,7 +65,7 @@ async def mark_as_read(
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_claims)
 ):
     """Get count of unread notifications"""
     db = get_database()
@@ -1,29 +1,30 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Header
 from ..models import CreateOrderRequest, CreateOrderResponse, VerifyPaymentRequest
 from ..crud import create_payment_record, update_payment_status, update_membership_status, get_payment_by_order_id
 from ..deps import get_current_user
 from ..core.settings import settings
 from ..db import get_database
+from ..services.payment_gateway import get_payment_gateway, GatewayBadRequest, GatewayUnavailable
+from ..services.order_idempotency import payment_orders, resolve_idempotency_key, IdempotencyKeyReused
 from bson import ObjectId
 from datetime import datetime
-import razorpay
-import hmac
-import hashlib
+from pymongo.errors import DuplicateKeyError
+from typing import Optional
+import json
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
-def get_razorpay_client():
-    if not settings.RZP_KEY_ID or not settings.RZP_KEY_SECRET:
-        return None
-    return razorpay.Client(auth=(settings.RZP_KEY_ID, settings.RZP_KEY_SECRET))
-
 
 @router.post("/create-order", response_model=CreateOrderResponse)
-async def create_order(request: CreateOrderRequest, user: dict = Depends(get_current_user)):
+async def create_order(
+    request: CreateOrderRequest,
+    user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     try:
-        client = get_razorpay_client()
+        gateway = get_payment_gateway()
         
-        if not client:
+        if not gateway:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Payment service not configured. Please set Razorpay credentials."
@@ -46,47 +47,71 @@ async def create_order(request: CreateOrderRequest, user: dict = Depends(get_cur
                 detail="User ID not found in token"
             )
         
-        order_data = {
-            "amount": amount,
-            "currency": "INR",
-            "receipt": f"{request.purpose}_{user_id}",
-            "notes": {
-                "purpose": request.purpose,
-                "user_id": user_id,
-                **(request.metadata or {})
+        async def create_upstream_order():
+            order_data = {
+                "amount": amount,
+                "currency": "INR",
+                "receipt": f"{request.purpose}_{user_id}",
+                "notes": {
+                    "purpose": request.purpose,
+                    "user_id": user_id,
+                    **(request.metadata or {})
+                }
             }
-        }
-        
-        order = client.order.create(data=order_data)
-        
-        try:
-            await create_payment_record({
+            
+            order = await gateway.create_order(order_data)
+            record = {
                 "user_id": user_id,
                 "order_id": order["id"],
-                "amount": amount,
+                "amount": order["amount"],
+                "currency": order["currency"],
                 "purpose": request.purpose,
                 "status": "created",
                 "metadata": request.metadata or {},
-                "raw": order
-            })
-        except Exception as db_error:
-            print(f"⚠️ Warning: Could not save payment record to database: {str(db_error)}")
+                "raw": order,
+                "idempotency_key": key
+            }
+            
+            try:
+                await create_payment_record(record)
+            except DuplicateKeyError:
+                raise
+            except Exception as db_error:
+                print(f"⚠️ Warning: Could not save payment record to database: {str(db_error)}")
+            return record
+        
+        key = resolve_idempotency_key(
+            user_id, request.purpose, amount, idempotency_key,
+            extra=json.dumps(request.metadata or {}, sort_keys=True, default=str)
+        )
+        order, _ = await payment_orders.get_or_create(key, create_upstream_order, amount)
         
         return CreateOrderResponse(
-            order_id=order["id"],
+            order_id=order["order_id"],
             amount=order["amount"],
-            currency=order["currency"],
+            currency=order.get("currency", "INR"),
             key_id=settings.RZP_KEY_ID
         )
         
     except HTTPException:
         raise
-    except razorpay.errors.BadRequestError as e:
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except GatewayBadRequest as e:
         print(f"❌ Razorpay BadRequest: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid payment request: {str(e)}"
         )
+    except GatewayUnavailable as e:
+        print(f"❌ Razorpay unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment service temporarily unavailable. Please try again."
+        )
     except Exception as e:
         error_msg = str(e)
         print(f"❌ Payment Error: {type(e).__name__}: {error_msg}")
@@ -98,9 +123,9 @@ async def create_order(request: CreateOrderRequest, user: dict = Depends(get_cur
 
 @router.post("/verify")
 async def verify_payment(request: VerifyPaymentRequest, user: dict = Depends(get_current_user)):
-    client = get_razorpay_client()
+    gateway = get_payment_gateway()
     
-    if not client:
+    if not gateway:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Payment service not configured"
@@ -132,7 +157,21 @@ async def verify_payment(request: VerifyPaymentRequest, user: dict = Depends(get
             'razorpay_signature': request.razorpay_signature
         }
         
-        client.utility.verify_payment_signature(params_dict)
+        if not gateway.verify_payment_signature(
+            request.razorpay_order_id,
+            request.razorpay_payment_id,
+            request.razorpay_signature
+        ):
+            print(f"❌ Signature verification failed for order {request.razorpay_order_id}")
+            await update_payment_status(
+                order_id=request.razorpay_order_id,
+                payment_id=request.razorpay_payment_id,
+                status_value="failed"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment verification failed. Invalid signature."
+            )
         
         await update_payment_status(
             order_id=request.razorpay_order_id,
@@ -140,6 +179,7 @@ async def verify_payment(request: VerifyPaymentRequest, user: dict = Depends(get
             status_value="captured",
             raw=params_dict
         )
+        payment_orders.invalidate(payment_record.get("idempotency_key"))
         
         if request.purpose == "membership":
             if payment_record["amount"] >= settings.MEMBERSHIP_AMOUNT:
@@ -172,17 +212,6 @@ async def verify_payment(request: VerifyPaymentRequest, user: dict = Depends(get
             "payment_id": request.razorpay_payment_id
         }
         
-    except razorpay.errors.SignatureVerificationError as e:
-        print(f"❌ Signature verification failed: {str(e)}")
-        await update_payment_status(
-            order_id=request.razorpay_order_id,
-            payment_id=request.razorpay_payment_id,
-            status_value="failed"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Payment verification failed. Invalid signature."
-        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1,8 +1,13 @@
 """Payment reconciliation and webhook retry handler"""
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, BackgroundTasks
 from datetime import datetime, timedelta
+from typing import Optional
+import shutil
+import tempfile
 from ..db import get_database
 from ..deps import get_current_user
+from ..services.webhook_processor import requeue_webhook, STATUS_PROCESSED
+from ..services.reconciliation import create_report, run_settlement_reconciliation, OUTCOMES
 
 router = APIRouter(prefix="/admin/payments", tags=["payment-reconciliation"])
 
@@ -17,46 +22,34 @@ async def reconcile_payments(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        # Get failed webhooks
-        failed_webhooks = await db.webhook_logs.find({
-            "status": "failed"
-        }).to_list(None)
+        # Counts only - never pull whole collections into memory
+        failed_webhooks_count = await db.webhook_logs.count_documents({"status": "failed"})
         
-        # Get pending verifications
-        pending = await db.payments.find({
+        pending_count = await db.payments.count_documents({
             "status": "created",
             "created_at": {"$lt": datetime.utcnow() - timedelta(hours=1)}
-        }).to_list(None)
+        })
         
-        # Get mismatched records
-        mismatched = await db.payment_logs.find({
-            "status": "mismatch"
-        }).to_list(None)
+        mismatched_count = await db.payment_logs.count_documents({"status": "mismatch"})
+        
+        # Replay dead-lettered webhooks
+        failed_webhooks = await db.webhook_logs.find(
+            {"status": "failed", "replay_count": {"$not": {"$gte": 3}}},
+            {"_id": 1, "replay_count": 1}
+        ).limit(5).to_list(5)  # Retry up to 5 at a time
         
-        # Retry failed webhooks
         retried_count = 0
-        for webhook in failed_webhooks[:5]:  # Retry up to 5 at a time
+        for webhook in failed_webhooks:
             try:
-                retry_count = webhook.get("retry_count", 0)
-                if retry_count < 3:
-                    await db.webhook_logs.update_one(
-                        {"_id": webhook["_id"]},
-                        {
-                            "$set": {
-                                "status": "retrying",
-                                "retry_count": retry_count + 1,
-                                "last_retry": datetime.utcnow()
-                            }
-                        }
-                    )
+                if webhook.get("replay_count", 0) < 3 and await requeue_webhook(str(webhook["_id"])):
                     retried_count += 1
             except Exception as e:
                 print(f"⚠️ Error retrying webhook: {str(e)}")
         
         return {
-            "failed_webhooks_count": len(failed_webhooks),
-            "pending_verifications_count": len(pending),
-            "mismatched_records_count": len(mismatched),
+            "failed_webhooks_count": failed_webhooks_count,
+            "pending_verifications_count": pending_count,
+            "mismatched_records_count": mismatched_count,
             "retried_webhooks_count": retried_count,
             "status": "reconciliation_complete"
         }
@@ -75,23 +68,19 @@ async def retry_webhook(webhook_id: str, current_user: dict = Depends(get_curren
     
     try:
         from bson import ObjectId
-        webhook = await db.webhook_logs.find_one({"_id": ObjectId(webhook_id)})
+        webhook = await db.webhook_logs.find_one({"_id": ObjectId(webhook_id)}, {"status": 1})
         
         if not webhook:
             raise HTTPException(status_code=404, detail="Webhook not found")
         
-        await db.webhook_logs.update_one(
-            {"_id": ObjectId(webhook_id)},
-            {
-                "$set": {
-                    "status": "retrying",
-                    "retry_count": webhook.get("retry_count", 0) + 1,
-                    "last_retry": datetime.utcnow()
-                }
-            }
-        )
+        if webhook.get("status") == STATUS_PROCESSED:
+            raise HTTPException(status_code=409, detail="Webhook already processed")
+        
+        await requeue_webhook(webhook_id)
         
         return {"message": "Webhook queued for retry"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrying webhook: {str(e)}")
 
@@ -106,15 +95,20 @@ async def payment_dashboard(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        total_payments = await db.payments.count_documents({})
-        successful = await db.payments.count_documents({"status": "verified"})
-        failed = await db.payments.count_documents({"status": "failed"})
-        pending = await db.payments.count_documents({"status": "created"})
+        # One pass grouped by status instead of four counts plus a full scan
+        by_status = {}
+        async for row in db.payments.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}, "amount": {"$sum": "$amount"}}}
+        ]):
+            by_status[row["_id"]] = row
         
-        total_amount = 0
-        successful_payments = await db.payments.find({"status": "verified"}).to_list(None)
-        for p in successful_payments:
-            total_amount += p.get("amount", 0)
+        total_payments = sum(row["count"] for row in by_status.values())
+        # Verified checkouts are stored as "captured"; "verified" is kept for older records
+        successful_rows = [by_status[s] for s in ("captured", "verified") if s in by_status]
+        successful = sum(row["count"] for row in successful_rows)
+        total_amount = sum(row["amount"] for row in successful_rows)
+        failed = by_status.get("failed", {}).get("count", 0)
+        pending = by_status.get("created", {}).get("count", 0)
         
         return {
             "total_payments": total_payments,
@@ -126,3 +120,98 @@ async def payment_dashboard(current_user: dict = Depends(get_current_user)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard: {str(e)}")
+
+@router.post("/settlements/reconcile")
+async def reconcile_settlement_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    amount_unit: str = "rupees",
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Upload a gateway settlement CSV and reconcile it in the background"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database unavailable")
+    
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if amount_unit not in ("rupees", "paise"):
+        raise HTTPException(status_code=400, detail="amount_unit must be 'rupees' or 'paise'")
+    
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Settlement file must be a CSV")
+    
+    try:
+        # Spool to disk so the job can stream it after the request ends
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as tmp:
+            shutil.copyfileobj(file.file, tmp, length=1024 * 1024)
+            csv_path = tmp.name
+        
+        report_id = await create_report(
+            file.filename, amount_unit, period_start, period_end, str(current_user.get("_id"))
+        )
+        background_tasks.add_task(
+            run_settlement_reconciliation, report_id, csv_path, amount_unit, period_start, period_end
+        )
+        
+        return {"report_id": str(report_id), "status": "running"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting reconciliation: {str(e)}")
+
+@router.get("/settlements/reports/{report_id}")
+async def get_settlement_report(report_id: str, current_user: dict = Depends(get_current_user)):
+    """Get a settlement reconciliation report summary"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database unavailable")
+    
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    try:
+        from bson import ObjectId
+        report = await db.reconciliation_reports.find_one({"_id": ObjectId(report_id)})
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        
+        report["id"] = str(report.pop("_id"))
+        return report
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching report: {str(e)}")
+
+@router.get("/settlements/reports/{report_id}/items")
+async def get_settlement_report_items(
+    report_id: str,
+    outcome: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user)
+):
+    """List unmatched records from a settlement reconciliation report"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database unavailable")
+    
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if outcome and outcome not in OUTCOMES:
+        raise HTTPException(status_code=400, detail=f"outcome must be one of: {', '.join(OUTCOMES)}")
+    
+    try:
+        from bson import ObjectId
+        query = {"report_id": ObjectId(report_id)}
+        if outcome:
+            query["outcome"] = outcome
+        
+        items = await db.reconciliation_items.find(query, {"report_id": 0}).sort("_id", 1).skip(skip).limit(min(limit, 500)).to_list(None)
+        for item in items:
+            item["id"] = str(item.pop("_id"))
+        return items
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching report items: {str(e)}")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
 from typing import List, Optional
 from ..deps import get_current_user
 from ..db import get_database
+from ..auth_claims import auth_versions
 from ..models import UserUpdateRequest, Achievement, ProfileResponse
 from bson import ObjectId
 from datetime import datetime
@@ -111,6 +112,8 @@ async def update_profile(request: dict, user: dict = Depends(get_current_user)):
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        if "name" in update_data:
+            await auth_versions.record_change([user_id])
         
         updated_profile = await db.users.find_one({"_id": ObjectId(user_id)})
         if not updated_profile:
@@ -1,10 +1,8 @@
-"""Rate limiting for authentication endpoints"""
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi import Request
+"""Rate limiting policies for authentication endpoints
 
-limiter = Limiter(key_func=get_remote_address)
+Enforced for the whole app by ``app.rate_limiter.RateLimitMiddleware``.
+"""
+from ..rate_limiter import parse_rate
 
 # Rate limit configurations
 LOGIN_LIMIT = "5/minute"
@@ -12,11 +10,14 @@ SIGNUP_LIMIT = "3/minute"
 PASSWORD_RESET_LIMIT = "3/minute"
 GENERAL_LIMIT = "30/minute"
 
-def create_rate_limit_error_handler(app):
-    """Create custom rate limit error handler"""
-    @app.exception_handler(RateLimitExceeded)
-    async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-        return {
-            "detail": "Too many requests. Please try again later.",
-            "retry_after": exc.detail
-        }
+# (method, full path) -> (policy name, limit); login endpoints share one bucket per client
+ROUTE_LIMITS = {
+    ("POST", "/api/auth/login"): ("login", LOGIN_LIMIT),
+    ("POST", "/api/admin/login"): ("login", LOGIN_LIMIT),
+    ("POST", "/api/auth/signup"): ("signup", SIGNUP_LIMIT),
+    ("POST", "/api/auth/change-password"): ("password_reset", PASSWORD_RESET_LIMIT),
+}
+
+
+def route_policies() -> dict:
+    return {route: parse_rate(name, rate) for route, (name, rate) in ROUTE_LIMITS.items()}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, status, Request, Header
-from ..crud import update_payment_status, update_membership_status, get_payment_by_order_id
+from ..services.webhook_processor import ingest_webhook, webhook_event_id
 from ..core.settings import settings
 import hmac
 import hashlib
@@ -24,8 +24,10 @@ def verify_webhook_signature(body: bytes, signature: str, secret: str) -> bool:
 @router.post("/razorpay")
 async def razorpay_webhook(
     request: Request,
-    x_razorpay_signature: str = Header(None, alias="X-Razorpay-Signature")
+    x_razorpay_signature: str = Header(None, alias="X-Razorpay-Signature"),
+    x_razorpay_event_id: str = Header(None, alias="X-Razorpay-Event-Id")
 ):
+    """Verify, persist and acknowledge; processing happens in the webhook consumer"""
     if not x_razorpay_signature:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,41 +44,19 @@ async def razorpay_webhook(
     
     try:
         payload = json.loads(body)
-        event = payload.get("event")
-        
-        if event == "payment.captured":
-            payment_entity = payload.get("payload", {}).get("payment", {}).get("entity", {})
-            order_id = payment_entity.get("order_id")
-            payment_id = payment_entity.get("id")
-            
-            if order_id:
-                await update_payment_status(order_id, payment_id, "captured", payment_entity)
-                
-                payment = await get_payment_by_order_id(order_id)
-                if payment and payment.get("purpose") == "membership":
-                    await update_membership_status(str(payment["user_id"]), "active")
-        
-        elif event == "payment.failed":
-            payment_entity = payload.get("payload", {}).get("payment", {}).get("entity", {})
-            order_id = payment_entity.get("order_id")
-            payment_id = payment_entity.get("id")
-            
-            if order_id:
-                await update_payment_status(order_id, payment_id, "failed", payment_entity)
-        
-        elif event == "refund.processed":
-            refund_entity = payload.get("payload", {}).get("refund", {}).get("entity", {})
-            payment_id = refund_entity.get("payment_id")
-        
-        return {"status": "ok"}
-        
     except json.JSONDecodeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid JSON payload"
         )
+    
+    try:
+        created = await ingest_webhook(webhook_event_id(body, x_razorpay_event_id), payload)
     except Exception as e:
+        # Non-2xx makes the gateway redeliver later
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Webhook processing error: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Webhook could not be stored: {str(e)}"
         )
+    
+    return {"status": "ok" if created else "duplicate"}
@@ -1,101 +1,142 @@
-"""Background scheduler for automatic student to alumni upgrade"""
+"""Background scheduler: student to alumni upgrade and maintenance sweeps
+
+Jobs are declared with ``register_job`` (schedule, batch size, time budget).
+Every instance runs APScheduler, but jobs only execute on the instance holding
+the ``scheduler`` leader lease, so multi-worker/multi-node deployments run
+each job once. Every run is recorded in ``job_runs`` and exported as metrics.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
+from .core.settings import settings
 from .db import get_database
-from .services.email_service import send_email
+from .crud import upgrade_students_to_alumni
+from .leader_election import scheduler_lease
+from .maintenance import JobContext, lock_inactive_posts, expire_stale_orders, cleanup_tokens, rollup_payments, rollup_audit, archive_logs
+from .monitoring import scheduled_job_duration, scheduled_job_rows, scheduled_job_last_success
 
 scheduler = AsyncIOScheduler()
 
-async def student_to_alumni_upgrade():
-    """Run daily at midnight to upgrade 4th year students to alumni"""
-    db = get_database()
-    if db is None:
-        print("⚠️ Database unavailable for student upgrade")
-        return
-    
-    current_year = datetime.now().year
-    
+
+@dataclass
+class ScheduledJob:
+    id: str
+    name: str
+    func: Callable[[JobContext], Awaitable[Optional[int]]]
+    trigger: CronTrigger
+    batch_size: int = 1000
+    time_budget_seconds: Optional[float] = None
+
+
+JOBS: dict = {}
+
+
+def register_job(id: str, name: str, trigger: CronTrigger, func: Callable, batch_size: int = 1000, time_budget_seconds: Optional[float] = None):
+    JOBS[id] = ScheduledJob(id, name, func, trigger, batch_size, time_budget_seconds)
+
+
+async def run_job(job_id: str, force: bool = False) -> Optional[dict]:
+    """Run a registered job and record it in job_runs.
+
+    Scheduled runs require the leader lease and carry its fencing token;
+    ``force`` (manual runs from the admin API) skips the lease check.
+    """
+    job = JOBS[job_id]
+    fencing_token = None
+    if not force:
+        if not await scheduler_lease.try_acquire():
+            return None
+        fencing_token = scheduler_lease.fencing_token
+
+    ctx = JobContext(job.batch_size, job.time_budget_seconds, fencing_token)
+    started_at = datetime.utcnow()
+    start = time.perf_counter()
+    status = "success"
+    error = None
     try:
-        # Find students with passout year <= current year
-        students_to_upgrade = await db.users.find({
-            "role": "student",
-            "passout_year": {"$lte": current_year},
-            "upgraded_to_alumni_at": {"$exists": False}
-        }).to_list(None)
-        
-        upgraded_count = 0
-        for student in students_to_upgrade:
-            try:
-                # Update student to alumni
-                await db.users.update_one(
-                    {"_id": student["_id"]},
-                    {
-                        "$set": {
-                            "role": "alumni",
-                            "upgraded_to_alumni_at": datetime.utcnow()
-                        }
-                    }
-                )
-                
-                # Log the upgrade
-                await db.upgrade_logs.insert_one({
-                    "user_id": str(student["_id"]),
-                    "user_name": student.get("name"),
-                    "email": student.get("email"),
-                    "passout_year": student.get("passout_year"),
-                    "upgraded_at": datetime.utcnow()
-                })
-                
-                # Send notification email
-                try:
-                    await send_email(
-                        to_email=student.get("email"),
-                        subject="Welcome to Alumni Network",
-                        html_body=f"""
-                        <p>Congratulations {student.get('name')}!</p>
-                        <p>You have been automatically upgraded to Alumni status.</p>
-                        <p>Access exclusive alumni features, jobs, and events.</p>
-                        """,
-                        text_body=f"You have been upgraded to Alumni. Login to explore alumni features."
-                    )
-                except Exception as e:
-                    print(f"⚠️ Email failed for {student.get('email')}: {str(e)}")
-                
-                # In-app notification
-                await db.notifications.insert_one({
-                    "user_id": str(student["_id"]),
-                    "title": "Alumni Status",
-                    "message": "You've been upgraded to Alumni!",
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
-                
-                upgraded_count += 1
-            except Exception as e:
-                print(f"⚠️ Error upgrading student {student.get('email')}: {str(e)}")
-        
-        print(f"✅ Upgraded {upgraded_count} students to alumni")
-        
+        rows = await job.func(ctx)
+        if rows is not None and not ctx.rows:
+            ctx.rows = rows
     except Exception as e:
-        print(f"❌ Error in student upgrade job: {str(e)}")
+        status = "error"
+        error = str(e)
+        print(f"❌ Error in scheduled job {job_id}: {error}")
+
+    duration = time.perf_counter() - start
+    scheduled_job_duration.labels(job=job_id, outcome=status).observe(duration)
+    scheduled_job_rows.labels(job=job_id).inc(ctx.rows)
+    if status == "success":
+        scheduled_job_last_success.labels(job=job_id).set(time.time())
+
+    run = {
+        "job_id": job_id,
+        "status": status,
+        "error": error,
+        "rows": ctx.rows,
+        "budget_exhausted": ctx.budget_exhausted,
+        "started_at": started_at,
+        "finished_at": datetime.utcnow(),
+        "duration_seconds": round(duration, 3),
+        "instance": scheduler_lease.instance_id,
+        "fencing_token": fencing_token,
+        "manual": force
+    }
+    db = get_database()
+    if db is not None:
+        try:
+            await db.job_runs.insert_one(dict(run))
+        except Exception as e:
+            print(f"⚠️ Could not record job run for {job_id}: {str(e)}")
+
+    print(f"✅ Job {job_id}: {status}, {ctx.rows} rows in {duration:.1f}s" + (" (time budget reached)" if ctx.budget_exhausted else ""))
+    return run
+
+
+async def student_to_alumni_upgrade(ctx: JobContext) -> int:
+    """Run daily at midnight to upgrade 4th year students to alumni"""
+    # On failure the checkpoint stays "running" so the next run resumes from it
+    return await upgrade_students_to_alumni(batch_size=ctx.batch_size, fencing_token=ctx.fencing_token)
+
+
+# Heavy sweeps run off-peak, in bounded chunks
+register_job('student_to_alumni_upgrade', 'Daily student to alumni upgrade',
+             CronTrigger(hour=0, minute=0), student_to_alumni_upgrade, batch_size=1000)
+register_job('lock_inactive_posts', 'Lock inactive discussion posts',
+             CronTrigger(hour=2, minute=0), lock_inactive_posts, batch_size=500, time_budget_seconds=300)
+register_job('expire_stale_orders', 'Expire unpaid checkout orders',
+             CronTrigger(minute=15), expire_stale_orders, batch_size=500, time_budget_seconds=120)
+register_job('cleanup_tokens', 'Remove expired and surplus refresh tokens',
+             CronTrigger(hour=3, minute=0), cleanup_tokens, batch_size=1000, time_budget_seconds=300)
+register_job('rollup_payments', 'Daily payment and donation rollups',
+             CronTrigger(hour=1, minute=30), rollup_payments, time_budget_seconds=300)
+register_job('rollup_audit', 'Repair hourly audit log rollups',
+             CronTrigger(minute=5), rollup_audit)
+register_job('archive_logs', 'Archive aged log collections',
+             CronTrigger(hour=4, minute=0), archive_logs, batch_size=settings.ARCHIVE_BATCH_SIZE, time_budget_seconds=1800)
+
 
 def start_scheduler():
     """Start background scheduler"""
     if not scheduler.running:
-        # Run daily at midnight
-        scheduler.add_job(
-            student_to_alumni_upgrade,
-            CronTrigger(hour=0, minute=0),
-            id='student_to_alumni_upgrade',
-            name='Daily student to alumni upgrade',
-            replace_existing=True
-        )
+        for job in JOBS.values():
+            scheduler.add_job(
+                run_job,
+                job.trigger,
+                args=[job.id],
+                id=job.id,
+                name=job.name,
+                replace_existing=True
+            )
         scheduler.start()
+        scheduler_lease.start()
         print("✅ Background scheduler started")
 
-def stop_scheduler():
-    """Stop background scheduler"""
+async def stop_scheduler():
+    """Stop background scheduler and hand the lease to another instance"""
+    await scheduler_lease.stop()
     if scheduler.running:
         scheduler.shutdown()
         print("✅ Background scheduler stopped")
@@ -4,6 +4,7 @@ from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from .core.settings import settings
+from .compression import CompressionMiddleware
 import json
 
 
@@ -84,3 +85,7 @@ def setup_security_middleware(app):
 
     # Add security headers (runs first in chain, after CORS already set headers)
     app.add_middleware(SecurityHeadersMiddleware)
+
+    # Added last so it wraps the middleware above and compresses the final body
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
@@ -1,50 +1,163 @@
 """Security utilities: brute force protection, token management"""
+import asyncio
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
+from pymongo import ReturnDocument
+from .audit import log_audit_event
 from .db import get_database
 from .core.settings import settings
+from .core.security import create_refresh_token, decode_token
+from .monitoring import login_lockout_checks
+
+
+def _lockout_window_seconds() -> int:
+    return settings.LOCKOUT_DURATION_MINUTES * 60
+
+
+def _bucket_seconds() -> int:
+    return max(_lockout_window_seconds() // settings.LOCKOUT_BUCKETS, 1)
+
+
+def _recent_failures(buckets: list, now: float) -> int:
+    oldest = int((now - _lockout_window_seconds()) // _bucket_seconds())
+    return sum(b["n"] for b in buckets if b["t"] > oldest)
+
+
+class LockoutCache:
+    """Hot-key cache of failure buckets per email.
+
+    A locked email is answered from memory until its buckets age out of the
+    window, so a credential-stuffing burst against it costs no database reads,
+    writes or password hashing. Unlocked entries are trusted for
+    LOCKOUT_CACHE_SECONDS only, since other workers may be recording failures.
+    """
+
+    def __init__(self):
+        self._entries: dict = {}
+
+    def get(self, email: str) -> Optional[list]:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        buckets, fetched_at = entry
+        if _recent_failures(buckets, time.time()) >= settings.MAX_LOGIN_ATTEMPTS:
+            return buckets
+        if time.monotonic() - fetched_at < settings.LOCKOUT_CACHE_SECONDS:
+            return buckets
+        del self._entries[email]
+        return None
+
+    def put(self, email: str, buckets: list):
+        if email not in self._entries and len(self._entries) >= settings.LOCKOUT_CACHE_SIZE:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[email] = (buckets, time.monotonic())
+
+    def discard(self, email: str):
+        self._entries.pop(email, None)
+
+
+lockout_cache = LockoutCache()
+
+
+def _normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def _lockout_message(failures: int) -> str:
+    return f"Account locked due to {failures} failed attempts. Try again in {settings.LOCKOUT_DURATION_MINUTES} minutes"
 
 
 async def check_login_attempts(email: str) -> tuple[bool, str]:
-    """Check if user is locked out due to failed login attempts"""
-    db = get_database()
-    if db is None:
-        return True, "Database unavailable"
-    
-    try:
-        # Get recent failed attempts
-        cutoff_time = datetime.utcnow() - timedelta(minutes=settings.LOCKOUT_DURATION_MINUTES)
-        
-        failed_attempts = await db.login_attempts.count_documents({
-            "email": email,
-            "success": False,
-            "timestamp": {"$gte": cutoff_time}
-        })
-        
-        if failed_attempts >= settings.MAX_LOGIN_ATTEMPTS:
-            return False, f"Account locked due to {failed_attempts} failed attempts. Try again in {settings.LOCKOUT_DURATION_MINUTES} minutes"
-        
-        return True, ""
-    except Exception as e:
-        print(f"⚠️ Error checking login attempts: {str(e)}")
-        return True, ""
+    """Check if user is locked out due to failed login attempts.
 
+    Failures live in one ``login_counters`` document per email as time buckets
+    (LOCKOUT_BUCKETS per LOCKOUT_DURATION_MINUTES window); the sum of buckets
+    inside the window is the sliding failure count.
+    """
+    email = _normalize_email(email)
+    buckets = lockout_cache.get(email)
+    if buckets is None:
+        db = get_database()
+        if db is None:
+            return True, "Database unavailable"
+        try:
+            doc = await db.login_counters.find_one({"_id": email}, {"buckets": 1})
+        except Exception as e:
+            print(f"⚠️ Error checking login attempts: {str(e)}")
+            return True, ""
+        buckets = doc.get("buckets", []) if doc else []
+        lockout_cache.put(email, buckets)
 
-async def record_login_attempt(email: str, success: bool, ip: Optional[str] = None):
-    """Record login attempt"""
+    failures = _recent_failures(buckets, time.time())
+    if failures >= settings.MAX_LOGIN_ATTEMPTS:
+        login_lockout_checks.labels(outcome="locked").inc()
+        return False, _lockout_message(failures)
+    login_lockout_checks.labels(outcome="allowed").inc()
+    return True, ""
+
+
+async def record_login_attempt(email: str, success: bool, ip: Optional[str] = None) -> int:
+    """Record login attempt; returns the failures now counted in the window.
+
+    A failure is one atomic pipeline update on the email's counter document:
+    drop buckets that left the window, increment the current bucket, push the
+    TTL out. A success clears the counter.
+    """
+    email = _normalize_email(email)
     db = get_database()
     if db is None:
-        return
+        return 0
     
     try:
-        await db.login_attempts.insert_one({
-            "email": email,
-            "success": success,
-            "ip_address": ip,
-            "timestamp": datetime.utcnow()
-        })
+        if success:
+            lockout_cache.discard(email)
+            await db.login_counters.delete_one({"_id": email})
+            return 0
+
+        now = time.time()
+        bucket = int(now // _bucket_seconds())
+        oldest = int((now - _lockout_window_seconds()) // _bucket_seconds())
+        doc = await db.login_counters.find_one_and_update(
+            {"_id": email},
+            [
+                {"$set": {"buckets": {"$filter": {
+                    "input": {"$ifNull": ["$buckets", []]},
+                    "cond": {"$gt": ["$$this.t", oldest]}
+                }}}},
+                {"$set": {"buckets": {"$cond": [
+                    {"$in": [bucket, "$buckets.t"]},
+                    {"$map": {
+                        "input": "$buckets",
+                        "in": {"$cond": [
+                            {"$eq": ["$$this.t", bucket]},
+                            {"t": "$$this.t", "n": {"$add": ["$$this.n", 1]}},
+                            "$$this"
+                        ]}
+                    }},
+                    {"$concatArrays": ["$buckets", [{"t": bucket, "n": 1}]]}
+                ]}}},
+                {"$set": {
+                    "expires_at": datetime.utcnow() + timedelta(seconds=_lockout_window_seconds()),
+                    "last_ip": ip
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        buckets = doc.get("buckets", [])
+        lockout_cache.put(email, buckets)
+        failures = _recent_failures(buckets, now)
+        if failures == settings.MAX_LOGIN_ATTEMPTS:
+            login_lockout_checks.labels(outcome="lock_started").inc()
+            await log_audit_event("account_locked", resource=email, status="failed",
+                                  details={"failures": failures}, ip_address=ip)
+        return failures
     except Exception as e:
         print(f"⚠️ Error recording login attempt: {str(e)}")
+        return 0
 
 
 async def check_password_history(user_id: str, new_password: str) -> tuple[bool, str]:
@@ -64,7 +177,7 @@ async def check_password_history(user_id: str, new_password: str) -> tuple[bool,
         
         if history:
             for entry in history:
-                if verify_password(new_password, entry.get("password_hash", "")):
+                if await asyncio.to_thread(verify_password, new_password, entry.get("password_hash", "")):
                     return False, f"Password was used recently. Choose a different password"
         
         return True, ""
@@ -89,23 +202,130 @@ async def store_password_history(user_id: str, password_hash: str):
         print(f"⚠️ Error storing password history: {str(e)}")
 
 
-async def cleanup_old_refresh_tokens(user_id: str):
-    """Keep only latest MAX_REFRESH_TOKENS_PER_USER tokens (max 3 active sessions)"""
+def expired_refresh_tokens(now: Optional[datetime] = None) -> dict:
+    """Sessions past expires_at; rotation no longer accepts them"""
+    return {"expires_at": {"$lte": now or datetime.utcnow()}}
+
+
+async def cleanup_old_refresh_tokens(user_id: str, keep: Optional[int] = None) -> int:
+    """Keep only latest MAX_REFRESH_TOKENS_PER_USER tokens (max 3 active sessions)
+
+    By default leaves room for one more, as it runs before a new session is
+    stored; the nightly cleanup_tokens job passes keep=MAX_REFRESH_TOKENS_PER_USER.
+    Returns the number of sessions removed.
+    """
     db = get_database()
     if db is None:
-        return
+        return 0
+    if keep is None:
+        keep = settings.MAX_REFRESH_TOKENS_PER_USER - 1
     
     try:
         # Get token count for user
         token_count = await db.refresh_tokens.count_documents({"user_id": user_id})
         
-        if token_count >= settings.MAX_REFRESH_TOKENS_PER_USER:
-            # Delete oldest token
-            oldest = await db.refresh_tokens.find_one(
-                {"user_id": user_id},
-                sort=[("created_at", 1)]
-            )
-            if oldest:
-                await db.refresh_tokens.delete_one({"_id": oldest["_id"]})
+        surplus = token_count - keep
+        if surplus > 0:
+            # Delete oldest sessions
+            oldest = await db.refresh_tokens.find(
+                {"user_id": user_id}, {"_id": 1}
+            ).sort("created_at", 1).limit(surplus).to_list(surplus)
+            result = await db.refresh_tokens.delete_many({"_id": {"$in": [t["_id"] for t in oldest]}})
+            return result.deleted_count
     except Exception as e:
         print(f"⚠️ Error cleaning refresh tokens: {str(e)}")
+    return 0
+
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are long random JWTs, so a fast hash is enough (no bcrypt)
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenReused(Exception):
+    """An already-rotated refresh token was presented again"""
+
+
+async def issue_refresh_token(user_id: str, ip: Optional[str] = None, user_agent: Optional[str] = None) -> str:
+    """Start a new session: one refresh_tokens document per session, holding
+    the SHA-256 of the current token"""
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+    
+    await cleanup_old_refresh_tokens(user_id)
+    session_id = uuid.uuid4().hex
+    token = create_refresh_token(data={"sub": user_id, "sid": session_id})
+    now = datetime.utcnow()
+    await db.refresh_tokens.insert_one({
+        "_id": session_id,
+        "user_id": user_id,
+        "token_hash": hash_refresh_token(token),
+        "previous_hash": None,
+        "created_at": now,
+        "rotated_at": now,
+        "expires_at": now + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DAYS),
+        "ip_address": ip,
+        "user_agent": user_agent
+    })
+    return token
+
+
+async def rotate_refresh_token(token: str) -> tuple:
+    """Exchange a refresh token for its successor; returns (user_id, new_token).
+
+    ``new_token`` is None when the token was rotated moments ago by a parallel
+    request (the client already holds the successor). Presenting an older
+    token again revokes the whole session and raises RefreshTokenReused.
+    Returns (None, None) for unknown or expired tokens.
+    """
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+    
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "refresh":
+        return None, None
+    
+    token_hash = hash_refresh_token(token)
+    new_token = create_refresh_token(data={"sub": payload["sub"], "sid": payload.get("sid")})
+    now = datetime.utcnow()
+    session = await db.refresh_tokens.find_one_and_update(
+        {"token_hash": token_hash, "expires_at": {"$gt": now}},
+        {"$set": {
+            "token_hash": hash_refresh_token(new_token),
+            "previous_hash": token_hash,
+            "rotated_at": now,
+            "expires_at": now + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DAYS)
+        }}
+    )
+    if session is not None:
+        return session["user_id"], new_token
+    
+    rotated = await db.refresh_tokens.find_one({"previous_hash": token_hash})
+    if rotated is None:
+        return None, None
+    if now - rotated["rotated_at"] <= timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS):
+        return rotated["user_id"], None
+    
+    await db.refresh_tokens.delete_one({"_id": rotated["_id"]})
+    await log_audit_event("refresh_token_reuse", user_id=rotated["user_id"], resource=rotated["_id"], status="failed")
+    raise RefreshTokenReused()
+
+
+async def revoke_refresh_token(token: str):
+    """End the session a refresh token belongs to (logout)"""
+    db = get_database()
+    if db is None:
+        return
+    token_hash = hash_refresh_token(token)
+    await db.refresh_tokens.delete_one({"$or": [{"token_hash": token_hash}, {"previous_hash": token_hash}]})
+
+
+async def revoke_user_refresh_tokens(user_id: str) -> int:
+    """End every session of a user (password change); returns how many were ended"""
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+    result = await db.refresh_tokens.delete_many({"user_id": user_id})
+    return result.deleted_count
@@ -1,4 +1,5 @@
 import aiosmtplib
+import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
@@ -50,6 +51,59 @@ async def send_email(
         return False
 
 
+def _build_message(to_email: str, subject: str, html_content: str, plain_text: Optional[str] = None) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = SMTP_FROM_EMAIL
+    msg["To"] = to_email
+    if plain_text:
+        msg.attach(MIMEText(plain_text, "plain"))
+    msg.attach(MIMEText(html_content, "html"))
+    return msg
+
+
+async def send_bulk_email(messages: list) -> int:
+    """Send many (to_email, subject, html_content, plain_text) messages over one SMTP session.
+
+    Returns the number sent; individual failures are logged and skipped.
+    """
+    if not messages:
+        return 0
+
+    sent = 0
+    try:
+        async with aiosmtplib.SMTP(hostname=SMTP_HOST, port=SMTP_PORT, timeout=5) as smtp:
+            if SMTP_TLS:
+                await smtp.starttls()
+            if SMTP_USER and SMTP_PASSWORD:
+                await smtp.login(SMTP_USER, SMTP_PASSWORD)
+            for to_email, subject, html_content, plain_text in messages:
+                if not to_email:
+                    continue
+                try:
+                    await smtp.send_message(_build_message(to_email, subject, html_content, plain_text))
+                    sent += 1
+                except Exception as e:
+                    logger.warning(f"Failed to send email to {to_email}: {str(e)}")
+    except Exception as e:
+        logger.warning(f"SMTP unavailable, skipping {len(messages) - sent} emails: {str(e)}")
+
+    logger.info(f"Bulk email: sent {sent}/{len(messages)}")
+    return sent
+
+
+_background_sends: set = set()
+
+
+def send_bulk_email_in_background(messages: list):
+    """Hand a batch to send_bulk_email without making the caller wait on SMTP"""
+    if not messages:
+        return
+    task = asyncio.create_task(send_bulk_email(messages))
+    _background_sends.add(task)
+    task.add_done_callback(_background_sends.discard)
+
+
 async def send_membership_confirmation(user_email: str, user_name: str, amount: int):
     """Send membership payment confirmation"""
     html_content = f"""
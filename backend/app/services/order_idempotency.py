@@ -0,0 +1,142 @@
+"""Collapse duplicate checkout requests onto one pending gateway order.
+
+A request is identified by an idempotency key - the client's ``Idempotency-Key``
+header, or one derived from user + purpose + amount. Lookups go through an
+in-process TTL cache, then any identical request already in flight in this
+process, then the collection (partial unique index on ``idempotency_key`` for
+``status: created``), so retries and double clicks return the existing order
+without another upstream call. Keys only collapse requests while the order is
+unpaid and younger than ``ORDER_IDEMPOTENCY_WINDOW_MINUTES``: a cache hit is
+re-checked against the collection, because the order may have been paid via
+another worker or the webhook. A client key reused for a different amount is
+rejected rather than answered with the old order.
+"""
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ..core.settings import settings
+from ..db import get_database
+from ..monitoring import order_idempotency_hits
+
+
+class IdempotencyKeyReused(ValueError):
+    """The Idempotency-Key already belongs to an order for a different amount"""
+
+
+def resolve_idempotency_key(user_id: str, purpose: str, amount: int, header_key: Optional[str] = None, extra: str = "") -> str:
+    """Client keys are scoped to the user so they cannot collide across accounts"""
+    if header_key:
+        raw = f"{user_id}|key|{header_key.strip()}"
+    else:
+        raw = f"{user_id}|{purpose}|{amount}|{extra}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class IdempotentOrders:
+    """Per-collection guard around "call gateway, then insert order row" """
+
+    def __init__(self, collection: str):
+        self.collection = collection
+        self._cache: dict = {}
+        self._inflight: dict = {}
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[dict]], amount: Optional[int] = None) -> tuple:
+        """Return (order_doc, reused). ``create`` must insert a doc carrying ``idempotency_key``.
+
+        Raises IdempotencyKeyReused if the order found for ``key`` is not for ``amount``.
+        """
+        doc, reused = await self._get_or_create(key, create)
+        if amount is not None and doc.get("amount") != amount:
+            raise IdempotencyKeyReused(f"Idempotency-Key was already used for an order of {doc.get('amount')}")
+        return doc, reused
+
+    async def _get_or_create(self, key: str, create: Callable[[], Awaitable[dict]]) -> tuple:
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            if await self._still_unpaid(cached[1]):
+                order_idempotency_hits.labels(collection=self.collection, source="cache").inc()
+                return cached[1], True
+            self._cache.pop(key, None)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            order_idempotency_hits.labels(collection=self.collection, source="inflight").inc()
+            return await asyncio.shield(inflight), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            doc, reused = await self._lookup_or_create(key, create)
+            future.set_result(doc)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters receive the exception; don't warn about it going unretrieved here
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self._remember(key, doc)
+        return doc, reused
+
+    async def _still_unpaid(self, doc: dict) -> bool:
+        db = get_database()
+        if db is None:
+            return True
+        current = await db[self.collection].find_one({"order_id": doc.get("order_id")}, {"status": 1})
+        return current is not None and current.get("status") == "created"
+
+    async def _lookup_or_create(self, key: str, create: Callable[[], Awaitable[dict]]) -> tuple:
+        db = get_database()
+        if db is None:
+            return await create(), False
+
+        collection = db[self.collection]
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.ORDER_IDEMPOTENCY_WINDOW_MINUTES)
+
+        existing = await collection.find_one({"idempotency_key": key, "status": "created", "created_at": {"$gte": cutoff}})
+        if existing:
+            order_idempotency_hits.labels(collection=self.collection, source="db").inc()
+            return existing, True
+
+        # An older unpaid order still holds the key: release it so a fresh order can take it
+        await collection.update_many(
+            {"idempotency_key": key, "status": "created", "created_at": {"$lt": cutoff}},
+            {"$unset": {"idempotency_key": ""}}
+        )
+
+        try:
+            return await create(), False
+        except DuplicateKeyError:
+            # Lost a race with another worker; its order wins
+            winner = await collection.find_one({"idempotency_key": key, "status": "created"})
+            if winner is None:
+                raise
+            order_idempotency_hits.labels(collection=self.collection, source="db").inc()
+            return winner, True
+
+    def invalidate(self, key: Optional[str]):
+        """Drop a cached order once it has been paid (other workers find out on their next hit)"""
+        if key:
+            self._cache.pop(key, None)
+
+    def _remember(self, key: str, doc: dict):
+        now = time.monotonic()
+        if len(self._cache) >= settings.ORDER_IDEMPOTENCY_CACHE_SIZE:
+            for stale in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                del self._cache[stale]
+            if len(self._cache) >= settings.ORDER_IDEMPOTENCY_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (now + settings.ORDER_IDEMPOTENCY_CACHE_SECONDS, doc)
+
+
+payment_orders = IdempotentOrders("payments")
+donation_orders = IdempotentOrders("donations")
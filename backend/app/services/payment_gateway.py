@@ -0,0 +1,226 @@
+"""Async Razorpay gateway client with pooled connections, retries and a circuit breaker
+
+GET requests are retried on timeouts and 429/5xx. Other methods are retried
+only when the connection could not be made, since the gateway may already
+have acted on them.
+"""
+import asyncio
+import hashlib
+import hmac
+import random
+import time
+from typing import TYPE_CHECKING, Optional
+
+from ..core.settings import settings
+from ..monitoring import gateway_request_duration, gateway_circuit_state
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class GatewayError(Exception):
+    """Base error for payment gateway failures"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GatewayBadRequest(GatewayError):
+    """Gateway rejected the request (4xx) - retrying will not help"""
+
+
+class GatewayUnavailable(GatewayError):
+    """Gateway unreachable, retries exhausted or circuit open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self.state = self.CLOSED
+
+    def allow_request(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at >= self.reset_timeout:
+                # Let a single probe through; its outcome decides the next state
+                self.probe_started_at = now
+                self._set_state(self.HALF_OPEN)
+                return True
+            return False
+        if self.state == self.HALF_OPEN:
+            # Hold everyone else back while the probe is in flight, unless it never reported back
+            if now - self.probe_started_at >= self.reset_timeout:
+                self.probe_started_at = now
+                return True
+            return False
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def release_probe(self):
+        """Call ended without an outcome (e.g. cancelled): free the probe slot, count nothing"""
+        if self.state == self.HALF_OPEN:
+            # opened_at is already past reset_timeout, so the next request probes at once
+            self._set_state(self.OPEN)
+
+    def _set_state(self, state: str):
+        self.state = state
+        gateway_circuit_state.set({self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state])
+
+
+class RazorpayGateway:
+    """Shared async client for the Razorpay REST API"""
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        key_id: str,
+        key_secret: str,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        # httpx is only needed once payments are configured; keep it off the startup path
+        import httpx
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.max_retries = settings.RZP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.RZP_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.RZP_CIRCUIT_RESET_SECONDS,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.RZP_API_BASE_URL,
+            auth=(key_id, key_secret),
+            timeout=httpx.Timeout(timeout or settings.RZP_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.RZP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.RZP_POOL_MAX_KEEPALIVE,
+            ),
+            transport=transport,
+        )
+        self._http_error = httpx.HTTPError
+        # Failures where the request never reached the gateway; anything else may have been applied
+        self._connect_errors = (httpx.ConnectError, httpx.ConnectTimeout)
+
+    async def create_order(self, data: dict) -> dict:
+        """Create an order - POST /orders"""
+        return await self._request("POST", "/orders", "create_order", json=data)
+
+    async def fetch_order(self, order_id: str) -> dict:
+        """Fetch an order - GET /orders/{id}"""
+        return await self._request("GET", f"/orders/{order_id}", "fetch_order")
+
+    def verify_payment_signature(self, order_id: str, payment_id: str, signature: str) -> bool:
+        """Verify checkout signature locally (HMAC-SHA256 of order_id|payment_id)"""
+        expected = hmac.new(
+            self.key_secret.encode(),
+            f"{order_id}|{payment_id}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    async def close(self):
+        await self._client.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform(0, min(cap, base * 2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, method: str, path: str, operation: str, **kwargs) -> dict:
+        last_error: Optional[GatewayError] = None
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise GatewayUnavailable("Payment gateway circuit open")
+
+            start = time.perf_counter()
+            # Orders have no idempotency key: a POST that timed out may still have created one
+            retryable = method == "GET"
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except self._http_error as e:
+                self.breaker.record_failure()
+                last_error = GatewayUnavailable(f"{type(e).__name__}: {str(e)}")
+                retryable = retryable or isinstance(e, self._connect_errors)
+            except BaseException:
+                # Cancelled (client went away) or unexpected: says nothing about gateway health
+                self.breaker.release_probe()
+                raise
+            else:
+                if response.status_code < 400:
+                    self.breaker.record_success()
+                    gateway_request_duration.labels(operation=operation, outcome="success").observe(time.perf_counter() - start)
+                    return response.json()
+
+                if response.status_code not in self.RETRYABLE_STATUS:
+                    # Client errors say nothing about gateway health
+                    self.breaker.record_success()
+                    gateway_request_duration.labels(operation=operation, outcome="rejected").observe(time.perf_counter() - start)
+                    raise GatewayBadRequest(_error_description(response), response.status_code)
+
+                self.breaker.record_failure()
+                last_error = GatewayUnavailable(_error_description(response), response.status_code)
+
+            gateway_request_duration.labels(operation=operation, outcome="error").observe(time.perf_counter() - start)
+            if not retryable:
+                break
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise last_error
+
+
+def _error_description(response: "httpx.Response") -> str:
+    try:
+        return response.json().get("error", {}).get("description") or response.text
+    except ValueError:
+        return response.text
+
+
+_gateway: Optional[RazorpayGateway] = None
+
+
+def get_payment_gateway() -> Optional[RazorpayGateway]:
+    """Return the process-wide gateway client, or None if Razorpay is not configured"""
+    global _gateway
+    if not settings.RZP_KEY_ID or not settings.RZP_KEY_SECRET:
+        return None
+    if _gateway is None:
+        _gateway = RazorpayGateway(settings.RZP_KEY_ID, settings.RZP_KEY_SECRET)
+    return _gateway
+
+
+async def close_payment_gateway():
+    """Close pooled gateway connections on shutdown"""
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+        _gateway = None
@@ -0,0 +1,344 @@
+"""Settlement reconciliation: merge-join a gateway export against payments/donations.
+
+Both inputs are consumed as streams sorted by ``order_id``: the database side
+through indexed cursors, the CSV side through an external sort (sorted runs
+spilled to temp files, then a k-way merge). Memory stays bounded by
+``RECON_SORT_CHUNK_ROWS`` regardless of how many transactions the export holds.
+Only exceptions are written to ``reconciliation_items``; matched rows are
+counted in the ``reconciliation_reports`` summary.
+"""
+import asyncio
+import csv
+import heapq
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Iterator, Optional
+
+from bson import ObjectId
+
+from ..core.settings import settings
+from ..db import get_database
+
+MATCHED = "matched"
+MISSING_IN_DB = "missing_in_db"
+MISSING_IN_GATEWAY = "missing_in_gateway"
+AMOUNT_MISMATCH = "amount_mismatch"
+STATUS_MISMATCH = "status_mismatch"
+DUPLICATE_IN_GATEWAY = "duplicate_in_gateway"
+
+OUTCOMES = [MATCHED, MISSING_IN_DB, MISSING_IN_GATEWAY, AMOUNT_MISMATCH, STATUS_MISMATCH, DUPLICATE_IN_GATEWAY]
+
+# Gateway and local status vocabularies mapped onto one set
+_STATUS_ALIASES = {
+    "captured": "captured",
+    "verified": "captured",
+    "completed": "captured",
+    "settled": "captured",
+    "processed": "captured",
+    "created": "created",
+    "failed": "failed",
+    "refunded": "refunded",
+}
+
+
+def normalize_status(value: Optional[str]) -> str:
+    return _STATUS_ALIASES.get((value or "").strip().lower(), (value or "unknown").strip().lower())
+
+
+@dataclass(slots=True)
+class Txn:
+    order_id: str
+    amount: int  # paise
+    status: str
+    payment_id: Optional[str] = None
+    source: Optional[str] = None
+
+
+def _to_paise(value: str, unit: str) -> int:
+    try:
+        amount = Decimal(str(value).replace(",", "").strip() or "0")
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+    return int(amount * 100) if unit == "rupees" else int(amount)
+
+
+def parse_settlement_csv(lines: Iterator[str], amount_unit: str = "rupees") -> Iterator[Txn]:
+    """Yield payment rows from a Razorpay settlement/recon export.
+
+    Expects at least ``order_id`` and ``amount`` columns; ``entity_id``/``payment_id``
+    and ``status`` are used when present. Non-payment rows (fees, refunds,
+    adjustments) are skipped via the ``type`` column.
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {"order_id", "amount"} <= {f.strip() for f in reader.fieldnames}:
+        raise ValueError("Settlement file must have 'order_id' and 'amount' columns")
+
+    for row in reader:
+        row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        if row.get("type") and row["type"].lower() != "payment":
+            continue
+        if not row.get("order_id"):
+            continue
+        yield Txn(
+            order_id=row["order_id"],
+            amount=_to_paise(row["amount"], amount_unit),
+            status=normalize_status(row.get("status") or "captured"),
+            payment_id=row.get("entity_id") or row.get("payment_id") or None,
+            source="gateway"
+        )
+
+
+class SortedSettlement:
+    """A settlement export sorted by order_id, as in-memory rows or spilled runs.
+
+    ``build`` is CPU-bound (CSV parsing + sorting) and is meant to run in a
+    worker thread; iterating afterwards is a lazy k-way merge.
+    """
+
+    def __init__(self, rows: Optional[list] = None, runs: Optional[list] = None):
+        self._rows = rows or []
+        self._runs = runs or []
+
+    @classmethod
+    def build(cls, rows: Iterator[Txn], chunk_rows: int) -> "SortedSettlement":
+        runs = []
+        chunk = []
+        try:
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_rows:
+                    runs.append(_spill(chunk))
+                    chunk = []
+        except Exception:
+            for f in runs:
+                f.close()
+            raise
+
+        if not runs:
+            # Everything fit in one chunk - no need to touch disk
+            chunk.sort(key=lambda t: t.order_id)
+            return cls(rows=chunk)
+        if chunk:
+            runs.append(_spill(chunk))
+        return cls(runs=runs)
+
+    def __iter__(self) -> Iterator[Txn]:
+        if not self._runs:
+            return iter(self._rows)
+        return heapq.merge(*(_read_run(f) for f in self._runs), key=lambda t: t.order_id)
+
+    def close(self):
+        for f in self._runs:
+            f.close()
+        self._runs = []
+
+
+def _spill(chunk: list):
+    chunk.sort(key=lambda t: t.order_id)
+    f = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+    for t in chunk:
+        f.write(json.dumps([t.order_id, t.amount, t.status, t.payment_id]))
+        f.write("\n")
+    f.seek(0)
+    return f
+
+
+def _read_run(f) -> Iterator[Txn]:
+    for line in f:
+        order_id, amount, status, payment_id = json.loads(line)
+        yield Txn(order_id, amount, status, payment_id, "gateway")
+
+
+async def merge_join(gateway: Iterator[Txn], local: AsyncIterator[Txn]) -> AsyncIterator[tuple]:
+    """Walk two order_id-sorted streams, yielding (outcome, gateway_txn, local_txn).
+
+    Local rows that never reached the gateway (still ``created``/``failed``)
+    are not reported as missing - those are abandoned checkouts, not money.
+    A second gateway row for an order already seen is a double settlement.
+    """
+    g = next(gateway, None)
+    l = await anext(local, None)
+    last_gateway_order = None
+
+    while g is not None or l is not None:
+        if g is not None and g.order_id == last_gateway_order:
+            yield DUPLICATE_IN_GATEWAY, g, None
+            g = next(gateway, None)
+        elif l is None or (g is not None and g.order_id < l.order_id):
+            yield MISSING_IN_DB, g, None
+            last_gateway_order = g.order_id
+            g = next(gateway, None)
+        elif g is None or l.order_id < g.order_id:
+            if l.status == "captured":
+                yield MISSING_IN_GATEWAY, None, l
+            l = await anext(local, None)
+        else:
+            if g.amount != l.amount:
+                outcome = AMOUNT_MISMATCH
+            elif g.status != l.status:
+                outcome = STATUS_MISMATCH
+            else:
+                outcome = MATCHED
+            yield outcome, g, l
+            last_gateway_order = g.order_id
+            g = next(gateway, None)
+            l = await anext(local, None)
+
+
+async def coalesce_by_order(rows: AsyncIterator[Txn]) -> AsyncIterator[Txn]:
+    """Collapse adjacent rows for one order (a donation can live in both collections)"""
+    current = None
+    async for row in rows:
+        if current is not None and row.order_id == current.order_id:
+            if row.status == "captured" and current.status != "captured":
+                current = row
+            continue
+        if current is not None:
+            yield current
+        current = row
+    if current is not None:
+        yield current
+
+
+async def merge_sorted(*streams: AsyncIterator[Txn]) -> AsyncIterator[Txn]:
+    """k-way merge of async streams already sorted by order_id"""
+    heads = []
+    for idx, stream in enumerate(streams):
+        first = await anext(stream, None)
+        if first is not None:
+            heads.append((first.order_id, idx, first))
+    heapq.heapify(heads)
+    while heads:
+        _, idx, item = heapq.heappop(heads)
+        yield item
+        nxt = await anext(streams[idx], None)
+        if nxt is not None:
+            heapq.heappush(heads, (nxt.order_id, idx, nxt))
+
+
+async def _collection_stream(collection, query: dict, source: str) -> AsyncIterator[Txn]:
+    cursor = collection.find(
+        query, {"order_id": 1, "amount": 1, "status": 1, "payment_id": 1, "_id": 0}
+    ).sort("order_id", 1).batch_size(settings.RECON_DB_BATCH_SIZE)
+    async for doc in cursor:
+        if doc.get("order_id"):
+            yield Txn(doc["order_id"], int(doc.get("amount", 0)), normalize_status(doc.get("status")), doc.get("payment_id"), source)
+
+
+def _item(report_id: ObjectId, outcome: str, g: Optional[Txn], l: Optional[Txn]) -> dict:
+    return {
+        "report_id": report_id,
+        "outcome": outcome,
+        "order_id": (g or l).order_id,
+        "gateway_amount": g.amount if g else None,
+        "local_amount": l.amount if l else None,
+        "gateway_status": g.status if g else None,
+        "local_status": l.status if l else None,
+        "payment_id": (g.payment_id if g else None) or (l.payment_id if l else None),
+        "local_source": l.source if l else None,
+    }
+
+
+async def create_report(filename: str, amount_unit: str, period_start: Optional[datetime], period_end: Optional[datetime], created_by: str) -> ObjectId:
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+    result = await db.reconciliation_reports.insert_one({
+        "filename": filename,
+        "amount_unit": amount_unit,
+        "period_start": period_start,
+        "period_end": period_end,
+        "status": "running",
+        "created_by": created_by,
+        "created_at": datetime.utcnow()
+    })
+    return result.inserted_id
+
+
+async def run_settlement_reconciliation(
+    report_id: ObjectId,
+    csv_path: str,
+    amount_unit: str = "rupees",
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None
+):
+    """Reconcile a settlement export on disk against payments + donations.
+
+    ``period_start``/``period_end`` bound the local side by ``created_at`` so
+    captured payments outside the export's window are not flagged as missing.
+    The CSV file is deleted when the run finishes.
+    """
+    db = get_database()
+    if db is None:
+        print("⚠️ Database unavailable for settlement reconciliation")
+        return
+
+    settlement = None
+    started = datetime.utcnow()
+    try:
+        def build():
+            with open(csv_path, newline="", encoding="utf-8-sig") as f:
+                return SortedSettlement.build(parse_settlement_csv(f, amount_unit), settings.RECON_SORT_CHUNK_ROWS)
+
+        settlement = await asyncio.to_thread(build)
+
+        query: dict = {}
+        if period_start or period_end:
+            query["created_at"] = {}
+            if period_start:
+                query["created_at"]["$gte"] = period_start
+            if period_end:
+                query["created_at"]["$lt"] = period_end
+
+        local = coalesce_by_order(merge_sorted(
+            _collection_stream(db.payments, query, "payments"),
+            _collection_stream(db.donations, query, "donations")
+        ))
+
+        counts = dict.fromkeys(OUTCOMES, 0)
+        gateway_total = 0
+        matched_total = 0
+        batch = []
+        async for outcome, g, l in merge_join(iter(settlement), local):
+            counts[outcome] += 1
+            if g is not None:
+                gateway_total += g.amount
+            if outcome == MATCHED:
+                matched_total += g.amount
+                continue
+            batch.append(_item(report_id, outcome, g, l))
+            if len(batch) >= settings.RECON_WRITE_BATCH_SIZE:
+                await db.reconciliation_items.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.reconciliation_items.insert_many(batch, ordered=False)
+
+        await db.reconciliation_reports.update_one(
+            {"_id": report_id},
+            {"$set": {
+                "status": "completed",
+                "counts": counts,
+                "gateway_amount_total": gateway_total,
+                "matched_amount_total": matched_total,
+                "duration_seconds": (datetime.utcnow() - started).total_seconds(),
+                "finished_at": datetime.utcnow()
+            }}
+        )
+        print(f"✅ Settlement reconciliation {report_id}: {counts}")
+    except Exception as e:
+        print(f"❌ Settlement reconciliation {report_id} failed: {str(e)}")
+        await db.reconciliation_reports.update_one(
+            {"_id": report_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}}
+        )
+    finally:
+        if settlement is not None:
+            settlement.close()
+        try:
+            os.remove(csv_path)
+        except OSError:
+            pass
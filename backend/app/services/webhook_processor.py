@@ -0,0 +1,278 @@
+"""Webhook ingestion: persist-and-ack, then process in the background.
+
+The HTTP handler only verifies the signature and stores the raw event in
+``webhook_logs`` (unique ``event_id``), so gateway retries are deduplicated and
+the gateway gets its 200 immediately. ``WebhookConsumer`` picks up pending
+events, applies them in ``received_at`` order per ``order_id``, retries with
+backoff and parks exhausted events in the dead-letter state (``failed``) where
+admins can replay them.
+"""
+import asyncio
+import hashlib
+import random
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from ..core.settings import settings
+from ..crud import update_payment_status, update_membership_status, get_payment_by_order_id
+from ..db import get_database
+from ..monitoring import webhook_events_total
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_PROCESSED = "processed"
+STATUS_RETRYING = "retrying"
+STATUS_DEAD_LETTER = "failed"
+
+READY_STATUSES = [STATUS_PENDING, STATUS_RETRYING]
+
+
+def webhook_event_id(body: bytes, header_event_id: Optional[str] = None) -> str:
+    """Razorpay sends X-Razorpay-Event-Id; fall back to a digest of the signed body"""
+    if header_event_id:
+        return header_event_id
+    return "sha256:" + hashlib.sha256(body).hexdigest()
+
+
+def _order_id(payload: dict) -> Optional[str]:
+    entities = payload.get("payload", {})
+    for key in ("payment", "order", "refund"):
+        entity = entities.get(key, {}).get("entity", {})
+        if entity.get("order_id"):
+            return entity["order_id"]
+        if key == "order" and entity.get("id"):
+            return entity["id"]
+    return None
+
+
+async def ingest_webhook(event_id: str, payload: dict) -> bool:
+    """Store a verified webhook; returns False if this event was already received"""
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+
+    now = datetime.utcnow()
+    try:
+        await db.webhook_logs.insert_one({
+            "event_id": event_id,
+            "provider": "razorpay",
+            "event": payload.get("event"),
+            "order_id": _order_id(payload),
+            "payload": payload,
+            "status": STATUS_PENDING,
+            "retry_count": 0,
+            "received_at": now,
+            "next_attempt_at": now
+        })
+    except DuplicateKeyError:
+        webhook_events_total.labels(outcome="duplicate").inc()
+        return False
+
+    webhook_events_total.labels(outcome="received").inc()
+    webhook_consumer.notify()
+    return True
+
+
+async def apply_webhook_event(payload: dict):
+    """Apply a Razorpay event to payments/membership. Safe to run more than once."""
+    event = payload.get("event")
+
+    if event == "payment.captured":
+        payment_entity = payload.get("payload", {}).get("payment", {}).get("entity", {})
+        order_id = payment_entity.get("order_id")
+        payment_id = payment_entity.get("id")
+
+        if order_id:
+            await update_payment_status(order_id, payment_id, "captured", payment_entity)
+
+            payment = await get_payment_by_order_id(order_id)
+            if payment and payment.get("purpose") == "membership":
+                await update_membership_status(str(payment["user_id"]), "active")
+
+    elif event == "payment.failed":
+        payment_entity = payload.get("payload", {}).get("payment", {}).get("entity", {})
+        order_id = payment_entity.get("order_id")
+        payment_id = payment_entity.get("id")
+
+        if order_id:
+            payment = await get_payment_by_order_id(order_id)
+            # A late failure for an earlier attempt must not undo a capture
+            if not payment or payment.get("status") != "captured":
+                await update_payment_status(order_id, payment_id, "failed", payment_entity)
+
+    elif event == "refund.processed":
+        refund_entity = payload.get("payload", {}).get("refund", {}).get("entity", {})
+        payment_id = refund_entity.get("payment_id")
+
+
+async def requeue_webhook(webhook_id: str) -> bool:
+    """Move a dead-lettered (or stuck) webhook back to the queue for another run"""
+    db = get_database()
+    if db is None:
+        raise RuntimeError("Database unavailable")
+
+    result = await db.webhook_logs.update_one(
+        {"_id": ObjectId(webhook_id), "status": {"$ne": STATUS_PROCESSED}},
+        {
+            "$set": {
+                "status": STATUS_RETRYING,
+                "retry_count": 0,
+                "next_attempt_at": datetime.utcnow(),
+                "last_retry": datetime.utcnow()
+            },
+            "$inc": {"replay_count": 1}
+        }
+    )
+    if result.modified_count:
+        webhook_consumer.notify()
+    return result.modified_count > 0
+
+
+class WebhookConsumer:
+    """Background task draining webhook_logs"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            print("✅ Webhook consumer started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            print("✅ Webhook consumer stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Webhook consumer error: {str(e)}")
+                processed = 0
+
+            if processed < settings.WEBHOOK_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Process one batch of ready events; returns the number claimed and attempted"""
+        db = get_database()
+        if db is None:
+            return 0
+
+        now = datetime.utcnow()
+        await self._release_stale_claims(db, now)
+
+        batch = await db.webhook_logs.find(
+            {"status": {"$in": READY_STATUSES}, "next_attempt_at": {"$lte": now}},
+            {"payload": 0}
+        ).sort("received_at", 1).limit(settings.WEBHOOK_BATCH_SIZE).to_list(settings.WEBHOOK_BATCH_SIZE)
+
+        # Events for the same order run sequentially, different orders concurrently
+        by_order: "OrderedDict[str, list]" = OrderedDict()
+        for doc in batch:
+            by_order.setdefault(doc.get("order_id") or str(doc["_id"]), []).append(doc)
+
+        counts = await asyncio.gather(*(self._process_order_events(db, docs) for docs in by_order.values()))
+        return sum(counts)
+
+    async def _process_order_events(self, db, docs: list) -> int:
+        attempted = 0
+        for doc in docs:
+            ok = await self._process_one(db, doc)
+            if ok is None:
+                break
+            attempted += 1
+            if not ok:
+                # Keep per-order ordering: later events wait until this one succeeds
+                break
+        return attempted
+
+    async def _process_one(self, db, doc: dict) -> Optional[bool]:
+        """Returns None if the event could not be claimed, else whether it succeeded"""
+        if doc.get("order_id"):
+            # An earlier event for this order is still queued (e.g. backing off) or running elsewhere
+            earlier = await db.webhook_logs.find_one({
+                "order_id": doc["order_id"],
+                "received_at": {"$lt": doc["received_at"]},
+                "status": {"$in": READY_STATUSES + [STATUS_PROCESSING]}
+            }, {"_id": 1})
+            if earlier is not None:
+                return None
+
+        webhook_id = doc["_id"]
+        claimed = await db.webhook_logs.find_one_and_update(
+            {"_id": webhook_id, "status": {"$in": READY_STATUSES}},
+            {"$set": {"status": STATUS_PROCESSING, "claimed_at": datetime.utcnow()}}
+        )
+        if claimed is None:
+            # Another worker got there first
+            return None
+
+        try:
+            await apply_webhook_event(claimed["payload"])
+        except Exception as e:
+            await self._record_failure(db, claimed, str(e))
+            return False
+
+        await db.webhook_logs.update_one(
+            {"_id": webhook_id},
+            {"$set": {"status": STATUS_PROCESSED, "processed_at": datetime.utcnow()}, "$unset": {"last_error": ""}}
+        )
+        webhook_events_total.labels(outcome="processed").inc()
+        return True
+
+    async def _record_failure(self, db, doc: dict, error: str):
+        retry_count = doc.get("retry_count", 0) + 1
+        update = {"retry_count": retry_count, "last_error": error, "last_retry": datetime.utcnow()}
+
+        if retry_count >= settings.WEBHOOK_MAX_ATTEMPTS:
+            update["status"] = STATUS_DEAD_LETTER
+            webhook_events_total.labels(outcome="dead_letter").inc()
+            print(f"❌ Webhook {doc.get('event_id')} dead-lettered after {retry_count} attempts: {error}")
+        else:
+            delay = random.uniform(0, min(300, 2 ** retry_count))
+            update["status"] = STATUS_RETRYING
+            update["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+            webhook_events_total.labels(outcome="retry").inc()
+
+        await db.webhook_logs.update_one({"_id": doc["_id"]}, {"$set": update})
+
+    async def _release_stale_claims(self, db, now: datetime):
+        # A worker died mid-event: hand its claim back to the queue
+        await db.webhook_logs.update_many(
+            {"status": STATUS_PROCESSING, "claimed_at": {"$lt": now - timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)}},
+            {"$set": {"status": STATUS_RETRYING, "next_attempt_at": now}}
+        )
+
+
+webhook_consumer = WebhookConsumer()
+
+
+def start_webhook_consumer():
+    webhook_consumer.start()
+
+
+async def stop_webhook_consumer():
+    await webhook_consumer.stop()
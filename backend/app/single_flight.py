@@ -0,0 +1,59 @@
+"""Single-flight coalescing for identical concurrent reads
+
+During spikes many clients request the same list at the same instant. The
+first request for a key (route, params, authorization scope) runs the read;
+requests for the same key that arrive while it is in flight await the same
+task and get the same result (or exception) instead of issuing their own
+query. Nothing is kept once the read completes, so this never serves data
+older than a request that was already running.
+
+The read runs in its own task, so a client disconnecting does not cancel it
+for the others. Results are shared objects: callers must not mutate them.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from .core.settings import settings
+from .monitoring import single_flight_requests
+
+
+def auth_scope(user: Optional[dict]) -> str:
+    """Requests only share a result within the same role"""
+    return "public" if user is None else f"role:{user.get('role')}"
+
+
+def flight_key(route: str, params: Optional[dict] = None, scope: str = "public") -> tuple:
+    return (route, scope, tuple(sorted((params or {}).items())))
+
+
+def _retrieve(task: asyncio.Task):
+    # Mark the exception retrieved even if every waiter went away
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, route: str, fn: Callable[[], Awaitable], params: Optional[dict] = None,
+                 scope: str = "public") -> Any:
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await fn()
+        key = flight_key(route, params, scope)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._calls.pop(key, None) if self._calls.get(key) is t else None)
+            task.add_done_callback(_retrieve)
+            single_flight_requests.labels(route=route, role="leader").inc()
+        else:
+            single_flight_requests.labels(route=route, role="shared").inc()
+        return await asyncio.shield(task)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,113 @@
+"""Per-module import time profile for application startup
+
+Like ``python -X importtime`` but also sees modules loaded through
+``importlib.import_module`` (how main.py loads the route modules), which the
+interpreter's own report leaves out. Prints the slowest modules by cumulative
+time, the route modules, and the time to construct the app:
+
+    cd backend && python -m app.startup_profile
+    cd backend && python -m app.startup_profile --top 40 --min-ms 5
+"""
+import argparse
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler, name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+
+
+class ImportProfiler(MetaPathFinder):
+    """Times module execution; records (name, self_seconds, cumulative_seconds, depth)"""
+
+    def __init__(self):
+        self.records: list = []
+        self._stack: list = []
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self, name)
+                return spec
+        return None
+
+    def _enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append((name, cumulative - children, cumulative, len(self._stack)))
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc):
+        sys.meta_path.remove(self)
+
+    def top(self, n: int = 25, min_seconds: float = 0.0, prefix: str = "") -> list:
+        rows = [r for r in self.records if r[0].startswith(prefix) and r[2] >= min_seconds]
+        return sorted(rows, key=lambda r: r[2], reverse=True)[:n]
+
+
+def profile_app_import() -> tuple:
+    """Import app.main under the profiler; returns (profiler, seconds)"""
+    if "app.main" in sys.modules:
+        raise RuntimeError("app.main is already imported; profile in a fresh interpreter")
+    with ImportProfiler() as profiler:
+        start = time.perf_counter()
+        import app.main  # noqa: F401
+        elapsed = time.perf_counter() - start
+    return profiler, elapsed
+
+
+def _print_rows(rows: list):
+    print(f"{'self ms':>10} | {'cumulative ms':>13} | module")
+    for name, own, cumulative, depth in rows:
+        print(f"{own * 1000:>10.1f} | {cumulative * 1000:>13.1f} | {'  ' * depth}{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile application startup imports")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--min-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    profiler, elapsed = profile_app_import()
+    from .core.settings import settings
+
+    status = "within" if elapsed <= settings.STARTUP_BUDGET_SECONDS else "OVER"
+    print(f"app.main imported and app constructed in {elapsed * 1000:.0f} ms "
+          f"({status} budget of {settings.STARTUP_BUDGET_SECONDS * 1000:.0f} ms)\n")
+    print(f"Slowest {args.top} modules:")
+    _print_rows(profiler.top(args.top, args.min_ms / 1000))
+    print("\nRoute modules:")
+    _print_rows(profiler.top(100, 0.0, prefix="app.routes."))
+
+
+if __name__ == "__main__":
+    main()
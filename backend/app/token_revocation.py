@@ -0,0 +1,80 @@
+"""In-memory JWT revocation filter backed by the token_blacklist collection
+
+Revoked ``jti`` values are held in a dict (jti -> expiry) so request
+authentication never queries the database. Each worker adds its own
+revocations immediately and pulls the others' every REVOCATION_SYNC_SECONDS;
+entries (and the documents, via TTL) disappear once the token would have
+expired anyway.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .core.settings import settings
+from .db import get_database
+
+
+class RevocationFilter:
+    def __init__(self):
+        self._revoked: dict = {}
+        self._synced_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+    async def revoke(self, jti: str, expires_at: datetime, user_id: Optional[str] = None):
+        """Revoke a token until its expiry; effective in this worker at once"""
+        self._revoked[jti] = expires_at
+        db = get_database()
+        if db is None:
+            raise RuntimeError("Database unavailable")
+        await db.token_blacklist.update_one(
+            {"jti": jti},
+            {"$setOnInsert": {"jti": jti, "user_id": user_id, "expires_at": expires_at, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def sync(self):
+        """Pull revocations recorded since the last sync (full load on first call)"""
+        db = get_database()
+        if db is None:
+            return
+        now = datetime.utcnow()
+        query = {"expires_at": {"$gt": now}}
+        if self._synced_until is not None:
+            # Overlap one interval so writes from workers with lagging clocks aren't missed
+            query["created_at"] = {"$gte": self._synced_until - timedelta(seconds=settings.REVOCATION_SYNC_SECONDS)}
+        async for doc in db.token_blacklist.find(query, {"jti": 1, "expires_at": 1}):
+            if doc.get("jti"):
+                self._revoked[doc["jti"]] = doc["expires_at"]
+        self._synced_until = now
+        for jti in [j for j, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"⚠️ Token revocation sync failed: {str(e)}")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+
+token_revocations = RevocationFilter()
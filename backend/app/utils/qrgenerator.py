@@ -1,9 +1,9 @@
-import qrcode
 from io import BytesIO
 import base64
 
 
 def generate_ticket_qr(ticket_id: str, event_id: str, user_id: str) -> str:
+    import qrcode  # pulls in PIL; loaded on first ticket only
     qr_data = f"TICKET:{ticket_id}|EVENT:{event_id}|USER:{user_id}"
     
     qr = qrcode.QRCode(
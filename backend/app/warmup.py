@@ -0,0 +1,141 @@
+"""Post-startup warm-up and readiness state
+
+Runs once after the lifespan startup, in the background so /api/health
+answers at once: opens MONGO_MIN_POOL_SIZE pooled connections, then reads
+the hot data the first page loads need (homepage content, approved events
+and jobs, featured items) and loads the student master lookup. /api/ready
+reports 503 until this completes and again once shutdown begins, so a load
+balancer only routes to warm instances.
+
+If Mongo is unreachable the connection step is retried with exponential
+backoff (reconnecting when startup could not connect at all), so an instance
+booted during a database outage joins rotation once the database is back
+instead of staying unready for its whole lifetime.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+from .core.settings import settings
+from .db import connect_to_mongo, get_database
+
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.status = "pending"
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.steps: dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "steps": self.steps
+        }
+
+
+warmup_state = WarmupState()
+
+
+async def open_connections(db) -> str:
+    # Concurrent commands each check out a connection, so the pool grows to n
+    n = settings.MONGO_MIN_POOL_SIZE
+    await asyncio.gather(*(db.command("ping") for _ in range(n)))
+    return f"{n} connections"
+
+
+async def preload_content(db) -> str:
+    # Homepage, sections, gallery, featured lists and donation stats stay in memory
+    from .content_cache import content_cache
+    return f"{await content_cache.load()} content documents"
+
+
+async def preload_events_jobs(db) -> str:
+    from .crud import get_events, get_jobs
+    events, jobs = await asyncio.gather(get_events(approved_only=True), get_jobs(approved_only=True))
+    return f"{len(events)} events, {len(jobs)} jobs"
+
+
+async def preload_student_master(db) -> str:
+    from .crud import student_master_lookup
+    return f"{await student_master_lookup.load()} student records"
+
+
+# The connection step must succeed; preloads only make the first requests faster
+STEPS = [
+    ("connections", open_connections, True),
+    ("content", preload_content, False),
+    ("events_jobs", preload_events_jobs, False),
+    ("student_master", preload_student_master, False),
+]
+
+
+async def connected_database():
+    db = get_database()
+    if db is None:
+        # Startup could not connect (e.g. Mongo still coming up): try again
+        await connect_to_mongo()
+        db = get_database()
+        if db is None:
+            raise ConnectionError("Database unavailable")
+    return db
+
+
+async def run_step(state: WarmupState, name: str, step) -> bool:
+    async def call():
+        return await step(await connected_database())
+
+    start = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(call(), timeout=settings.WARMUP_STEP_TIMEOUT_SECONDS)
+        state.steps[name] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1), "detail": detail}
+        return True
+    except Exception as e:
+        state.steps[name] = {"ok": False, "ms": round((time.perf_counter() - start) * 1000, 1), "detail": str(e) or type(e).__name__}
+        print(f"⚠️ Warm-up step {name} failed: {str(e)}")
+        return False
+
+
+async def run_warmup(state: WarmupState = warmup_state) -> bool:
+    state.started_at = datetime.utcnow()
+    state.status = "warming"
+    for name, step, required in STEPS:
+        attempt = 0
+        while not await run_step(state, name, step) and required:
+            delay = min(settings.WARMUP_RETRY_MAX_SECONDS, settings.WARMUP_RETRY_BASE_SECONDS * 2 ** attempt)
+            attempt += 1
+            state.status = "retrying"
+            state.steps[name]["attempts"] = attempt
+            print(f"⚠️ Warm-up retrying {name} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+        state.status = "warming"
+
+    state.completed_at = datetime.utcnow()
+    state.status = "ready"
+    state.ready = True
+    total = (state.completed_at - state.started_at).total_seconds()
+    print(f"✅ Warm-up complete in {total:.2f}s")
+    return True
+
+
+def start_warmup():
+    warmup_state._task = asyncio.create_task(run_warmup())
+
+
+async def stop_warmup():
+    """Report not-ready from the start of shutdown so traffic drains away"""
+    warmup_state.ready = False
+    warmup_state.status = "stopping"
+    task = warmup_state._task
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
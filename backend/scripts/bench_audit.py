@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Audit log analytics benchmark.
+
+Seeds N synthetic audit entries into a scratch database, builds the hourly
+rollups and times the summary and paging queries against the raw-collection
+equivalents they replace.
+
+    cd backend && MONGO_URI=... python scripts/bench_audit.py --entries 5000000
+    cd backend && MONGO_URI=... python scripts/bench_audit.py --skip-seed   # reuse seeded data
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app import db as app_db
+from app.audit import rebuild_hourly_counts
+from app.core.settings import settings
+from app.routes.audit_logs import encode_cursor, decode_cursor
+
+ACTIONS = ["login_attempt", "password_change", "payment", "admin_create", "admin_update", "admin_delete",
+           "event_register", "job_apply", "profile_update", "logout"]
+
+
+async def seed(db, n: int, days: int, users: int, seed: int):
+    rng = random.Random(seed)
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    span = int((end - start).total_seconds())
+    batch = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        batch.append({
+            "action": rng.choice(ACTIONS),
+            "user_id": f"user_{rng.randrange(users)}",
+            "resource": f"res_{rng.randrange(10000)}",
+            "status": "success" if rng.random() > 0.05 else "failed",
+            "details": {},
+            "timestamp": start + timedelta(seconds=rng.randrange(span))
+        })
+        if len(batch) == 10000:
+            await db.audit_logs.insert_many(batch, ordered=False)
+            batch = []
+            if (i + 1) % 500000 == 0:
+                print(f"  seeded {i + 1}")
+    if batch:
+        await db.audit_logs.insert_many(batch, ordered=False)
+    print(f"Seeded {n} entries in {time.perf_counter() - t0:.1f}s")
+
+
+async def create_indexes(db):
+    await db.audit_logs.create_index([("timestamp", -1), ("_id", -1)])
+    await db.audit_logs.create_index([("action", 1), ("timestamp", -1), ("_id", -1)])
+    await db.audit_logs.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+    await db.audit_logs.create_index([("resource", 1), ("timestamp", -1), ("_id", -1)])
+    await db.audit_hourly.create_index([("hour", 1), ("action", 1)])
+
+
+async def timed(label: str, coro):
+    t0 = time.perf_counter()
+    result = await coro
+    print(f"  {label:<48} {(time.perf_counter() - t0) * 1000:>10.1f} ms")
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench_audit")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[args.database]
+    # rebuild_hourly_counts goes through app.db.get_database()
+    app_db.db = db
+
+    if not args.skip_seed:
+        await db.audit_logs.drop()
+        await db.audit_hourly.drop()
+        await seed(db, args.entries, args.days, args.users, args.seed)
+    await timed("create indexes", create_indexes(db))
+
+    now = datetime.utcnow()
+    buckets = await timed("backfill hourly rollups", rebuild_hourly_counts(now - timedelta(days=args.days + 1), now + timedelta(hours=1)))
+    print(f"  {buckets} hourly buckets for {await db.audit_logs.estimated_document_count()} entries")
+
+    print("Summary (all time):")
+    await timed("raw $group over audit_logs", db.audit_logs.aggregate([
+        {"$group": {"_id": "$action", "count": {"$sum": 1}}}
+    ]).to_list(None))
+    await timed("$group over audit_hourly", db.audit_hourly.aggregate([
+        {"$group": {"_id": "$action", "count": {"$sum": "$count"}}}
+    ]).to_list(None))
+
+    week = now - timedelta(days=7)
+    print("Summary (last 7 days):")
+    await timed("raw $match+$group over audit_logs", db.audit_logs.aggregate([
+        {"$match": {"timestamp": {"$gte": week}}},
+        {"$group": {"_id": "$action", "count": {"$sum": 1}}}
+    ]).to_list(None))
+    await timed("$match+$group over audit_hourly", db.audit_hourly.aggregate([
+        {"$match": {"hour": {"$gte": week}}},
+        {"$group": {"_id": "$action", "count": {"$sum": "$count"}}}
+    ]).to_list(None))
+    await timed("single actor via (user_id, timestamp)", db.audit_logs.aggregate([
+        {"$match": {"user_id": "user_42"}},
+        {"$group": {"_id": "$action", "count": {"$sum": 1}}}
+    ]).to_list(None))
+
+    print(f"Browsing {args.pages} pages of 100:")
+
+    async def skip_paging():
+        for page in range(args.pages):
+            await db.audit_logs.find({}).sort("timestamp", -1).skip(page * 100).limit(100).to_list(100)
+
+    async def cursor_paging():
+        query = {}
+        for _ in range(args.pages):
+            logs = await db.audit_logs.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(100).to_list(100)
+            if len(logs) < 100:
+                break
+            query = decode_cursor(encode_cursor(logs[-1]))
+
+    await timed("skip/limit", skip_paging())
+    await timed("(timestamp, _id) cursor", cursor_paging())
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Database commands per request for typical faculty and alumni page loads.
+
+Seeds a faculty member and an alumnus into a scratch database, then replays
+the requests each dashboard makes on load through the ASGI app twice: with
+tokens carrying claims (authorized from the token) and with role-only tokens
+(the user document is loaded on every request, as before claims). Reports
+commands per page load and per request.
+
+    cd backend && MONGO_URI=... python scripts/bench_auth_queries.py
+    cd backend && MONGO_URI=... python scripts/bench_auth_queries.py --loads 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app import db as app_db
+from app.auth_claims import user_claims
+from app.core.security import create_access_token
+from app.core.settings import settings
+
+PAGES = {
+    "faculty": ["/api/faculty/dashboard", "/api/faculty/announcements", "/api/faculty/alumni",
+                "/api/notifications/", "/api/notifications/unread-count"],
+    "alumni": ["/api/events", "/api/jobs", "/api/discussion/department", "/api/alumni/stats",
+               "/api/notifications/", "/api/notifications/unread-count"],
+}
+
+
+class OpCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+        self.users = 0
+
+    def started(self, event):
+        if event.command_name in ("hello", "isMaster", "ping", "endSessions"):
+            return
+        self.count += 1
+        if event.command.get(event.command_name) == "users":
+            self.users += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def seed(db) -> dict:
+    await db.users.delete_many({"email": {"$in": ["bench.faculty@example.com", "bench.alumni@example.com"]}})
+    users = {
+        "faculty": {"name": "Bench Faculty", "email": "bench.faculty@example.com", "role": "faculty",
+                    "department": "CSE", "auth_version": 0, "created_at": datetime.utcnow()},
+        "alumni": {"name": "Bench Alumni", "email": "bench.alumni@example.com", "role": "alumni",
+                   "department": "CSE", "membership_status": "active", "passout_year": 2020,
+                   "auth_version": 0, "created_at": datetime.utcnow()},
+    }
+    for user in users.values():
+        user["_id"] = (await db.users.insert_one(user)).inserted_id
+    return users
+
+
+async def replay(client, token: str, paths: list, loads: int, ops: OpCounter) -> tuple:
+    headers = {"Authorization": f"Bearer {token}"}
+    ops.count = ops.users = 0
+    start = time.perf_counter()
+    for _ in range(loads):
+        for path in paths:
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 400:
+                raise SystemExit(f"{path}: {response.status_code} {response.text[:200]}")
+    return ops.count, ops.users, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=20, help="page loads per role")
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench_auth")
+    args = parser.parse_args()
+
+    from app.main import app
+
+    ops = OpCounter()
+    mongo = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[ops])
+    db = mongo[args.database]
+    app_db.db = db
+    users = await seed(db)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for role, paths in PAGES.items():
+            user = users[role]
+            requests = args.loads * len(paths)
+            print(f"{role} page load ({len(paths)} requests) x {args.loads}:")
+            for label, claims in (("role-only token (DB lookup)", {"sub": str(user["_id"]), "role": user["role"]}),
+                                  ("claims token", user_claims(user))):
+                count, user_reads, elapsed = await replay(client, create_access_token(claims), paths, args.loads, ops)
+                print(f"  {label:<28} {count / args.loads:6.1f} commands/load, {count / requests:5.2f}/request "
+                      f"({user_reads / requests:.2f} users reads), {elapsed / requests * 1000:.2f} ms/request")
+
+    await db.users.delete_many({"_id": {"$in": [u["_id"] for u in users.values()]}})
+    mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
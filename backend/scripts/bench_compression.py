@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Bytes on wire and CPU cost of response compression per response size.
+
+Builds directory-style JSON payloads of several sizes and sends each through
+CompressionMiddleware around a bare ASGI app (no sockets), for gzip at a few
+levels and brotli qualities when the ``brotli`` package is installed.
+Reports compressed size, ratio and CPU microseconds per response, plus the
+pass-through overhead for clients that send no Accept-Encoding.
+
+    cd backend && python scripts/bench_compression.py
+    cd backend && python scripts/bench_compression.py --sizes 1 16 256 --gzip-levels 1 6
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import orjson
+
+from app import compression
+from app.compression import CompressionMiddleware
+
+
+def payload(kib: int) -> bytes:
+    rows, i = [], 0
+    while True:
+        rows.append({
+            "id": f"65f1c0ffee{i:014d}",
+            "name": f"Alumni Member {i}",
+            "department": ["CSE", "ECE", "ME", "CE", "EE"][i % 5],
+            "passout_year": 2000 + i % 25,
+            "current_company": ["Infosys", "TCS", "Wipro", "Google", None][i % 5],
+            "designation": "Software Engineer" if i % 3 else None,
+            "location": "Kolkata, India",
+            "membership_status": "active" if i % 4 else "inactive"
+        })
+        i += 1
+        if i % 16 == 0:
+            body = orjson.dumps(rows)
+            if len(body) >= kib * 1024:
+                return body[:kib * 1024 - 1].rsplit(b"},", 1)[0] + b"}]"
+
+
+def bare_app(body: bytes):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def measure(middleware, accept: bytes, repeat: int) -> tuple:
+    """(wire bytes, CPU microseconds per response)"""
+    wire = 0
+
+    async def send(message):
+        nonlocal wire
+        if message["type"] == "http.response.body":
+            wire += len(message.get("body", b""))
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept)] if accept else []}
+    start = time.process_time()
+    for _ in range(repeat):
+        await middleware(scope, receive, send)
+    return wire // repeat, (time.process_time() - start) / repeat * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256, 1024], help="payload sizes in KiB")
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--brotli-levels", type=int, nargs="+", default=[1, 4, 6])
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="approximate CPU time per case")
+    args = parser.parse_args()
+
+    codings = [("gzip", level) for level in args.gzip_levels]
+    if compression.brotli is not None:
+        codings += [("br", level) for level in args.brotli_levels]
+    else:
+        print("brotli not installed: gzip only\n")
+
+    print(f"{'size':>8} | {'coding':>8} | {'wire bytes':>10} | {'ratio':>6} | {'CPU us/resp':>11}")
+    for kib in args.sizes:
+        body = payload(kib)
+        repeat = max(3, int(args.budget_ms * 1000 / (kib * 40)))
+        app = bare_app(body)
+        # Pass-through: no Accept-Encoding, only the middleware bookkeeping
+        wire, cpu = await measure(CompressionMiddleware(app, minimum_size=1024), b"", repeat)
+        print(f"{kib:>6}Ki | {'identity':>8} | {wire:>10} | {1.0:>6.2f} | {cpu:>11.1f}")
+        for coding, level in codings:
+            middleware = CompressionMiddleware(app, minimum_size=1024, gzip_levels={"application/json": level},
+                                               brotli_levels={"application/json": level})
+            wire, cpu = await measure(middleware, coding.encode(), repeat)
+            print(f"{kib:>6}Ki | {f'{coding}-{level}':>8} | {wire:>10} | {len(body) / wire:>6.2f} | {cpu:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Credential-stuffing simulation for the login lockout path.
+
+Replays an attack at a fixed rate (default 10k attempts/minute) against both
+the old per-attempt documents (insert + count_documents) and the counter
+documents in app.security_utils, and reports latency, database operations
+and how many attempts were rejected before reaching password hashing.
+
+    cd backend && MONGO_URI=... python scripts/bench_login_lockout.py
+    cd backend && MONGO_URI=... python scripts/bench_login_lockout.py --rate 20000 --duration 30 --targets 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app import db as app_db
+from app import security_utils
+from app.core.settings import settings
+
+
+class OpCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in ("hello", "isMaster", "ping", "endSessions"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_attempt(db, email: str) -> bool:
+    """Pre-counter behaviour: count recent failures, then insert one document per attempt"""
+    cutoff = datetime.utcnow() - timedelta(minutes=settings.LOCKOUT_DURATION_MINUTES)
+    failures = await db.login_attempts_bench.count_documents({"email": email, "success": False, "timestamp": {"$gte": cutoff}})
+    if failures >= settings.MAX_LOGIN_ATTEMPTS:
+        return False
+    await db.login_attempts_bench.insert_one({"email": email, "success": False, "ip_address": None, "timestamp": datetime.utcnow()})
+    return True
+
+
+async def counter_attempt(db, email: str) -> bool:
+    allowed, _ = await security_utils.check_login_attempts(email)
+    if not allowed:
+        return False
+    await security_utils.record_login_attempt(email, False)
+    return True
+
+
+async def run(name: str, attempt, db, emails: list, rate: int, duration: float, ops: OpCounter):
+    interval = 60.0 / rate
+    total = int(rate * duration / 60)
+    latencies = []
+    reached_hashing = 0
+    pending = set()
+    ops.count = 0
+
+    async def one(email):
+        nonlocal reached_hashing
+        t0 = time.perf_counter()
+        if await attempt(db, email):
+            reached_hashing += 1
+        latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    for i in range(total):
+        # Keep to the schedule; attempts overlap like concurrent requests would
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(one(emails[i % len(emails)]))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{name}:")
+    print(f"  {total} attempts in {elapsed:.1f}s ({total / elapsed * 60:,.0f}/min)")
+    print(f"  latency p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"  database commands {ops.count} ({ops.count / total:.2f}/attempt), reached password check {reached_hashing}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=10000, help="attempts per minute")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--targets", type=int, default=100, help="distinct emails under attack")
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench_lockout")
+    args = parser.parse_args()
+
+    ops = OpCounter()
+    client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[ops])
+    db = client[args.database]
+    app_db.db = db
+    await db.login_attempts_bench.drop()
+    await db.login_counters.drop()
+    await db.login_attempts_bench.create_index([("email", 1), ("success", 1), ("timestamp", -1)])
+    await db.login_counters.create_index("expires_at", expireAfterSeconds=0)
+
+    emails = [f"target{i}@example.com" for i in range(args.targets)]
+    random.Random(7).shuffle(emails)
+
+    await run("per-attempt documents", legacy_attempt, db, emails, args.rate, args.duration, ops)
+    await run("counter documents + hot-key cache", counter_attempt, db, emails, args.rate, args.duration, ops)
+    print(f"  documents: login_attempts {await db.login_attempts_bench.count_documents({})}, "
+          f"login_counters {await db.login_counters.count_documents({})}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Login throughput per core at each password hashing cost.
+
+Times one verification (the CPU work of a login) for bcrypt at each round
+count and, when argon2-cffi is installed, argon2id at each time cost, and
+reports ms/login and logins/second per core. Marks the setting calibration
+would pick for the target.
+
+    cd backend && python scripts/bench_password_hashing.py
+    cd backend && python scripts/bench_password_hashing.py --target-ms 100 --rounds 10 14
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.password_policy import ARGON2ID, BCRYPT, PasswordPolicy, _argon2
+
+PASSWORD = "Bench#Passw0rd"
+
+
+def per_login(policy: PasswordPolicy, samples: int) -> float:
+    hashed = policy.hash(PASSWORD)
+    start = time.perf_counter()
+    for _ in range(samples):
+        policy.verify(PASSWORD, hashed)
+    return (time.perf_counter() - start) / samples
+
+
+def report(label: str, seconds: float, marked: bool):
+    mark = "  <- calibrated" if marked else ""
+    print(f"  {label:<28} {seconds * 1000:8.1f} ms/login {1 / seconds:8.1f} logins/s per core{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, nargs=2, default=[10, 14], metavar=("MIN", "MAX"))
+    parser.add_argument("--time-costs", type=int, nargs=2, default=[1, 6], metavar=("MIN", "MAX"))
+    parser.add_argument("--memory-kib", type=int, default=65536)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    calibrated = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=args.rounds[0])
+    calibrated.calibrate(args.target_ms)
+    print(f"bcrypt (target {args.target_ms:.0f} ms):")
+    for rounds in range(args.rounds[0], args.rounds[1] + 1):
+        seconds = per_login(PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=rounds), args.samples)
+        report(f"rounds={rounds}", seconds, rounds == calibrated.bcrypt_rounds)
+
+    if _argon2() is None:
+        print("argon2id: argon2-cffi not installed, skipped")
+        return
+    calibrated = PasswordPolicy(scheme=ARGON2ID, argon2_time_cost=args.time_costs[0], argon2_memory_kib=args.memory_kib)
+    calibrated.calibrate(args.target_ms)
+    print(f"argon2id, {args.memory_kib} KiB (target {args.target_ms:.0f} ms):")
+    for time_cost in range(args.time_costs[0], args.time_costs[1] + 1):
+        policy = PasswordPolicy(scheme=ARGON2ID, argon2_time_cost=time_cost, argon2_memory_kib=args.memory_kib)
+        report(f"time_cost={time_cost}", per_login(policy, args.samples), time_cost == calibrated.argon2_time_cost)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark order creation latency: blocking per-request client vs pooled async gateway.
+
+Starts tests/stub_gateway.py on a local port with simulated upstream latency and
+fires concurrent create-order calls the way the request handlers do.
+
+    cd backend && python scripts/bench_payment_gateway.py --requests 200 --concurrency 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+
+from app.services.payment_gateway import RazorpayGateway
+from tests import stub_gateway
+
+ORDER = {"amount": 50000, "currency": "INR", "receipt": "bench"}
+
+
+def start_stub(port: int, latency: float) -> uvicorn.Server:
+    stub_gateway.reset(latency=latency)
+    server = uvicorn.Server(uvicorn.Config(stub_gateway.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run(call, total: int, concurrency: int) -> list:
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+def report(name: str, latencies: list, wall: float):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} {len(latencies) / wall:>8.1f} req/s   p50 {statistics.median(latencies) * 1000:>7.1f} ms   p95 {p95 * 1000:>7.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated upstream latency (s)")
+    parser.add_argument("--port", type=int, default=9010)
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    # Old behaviour: a fresh client per request, blocking the event loop for the round trip
+    async def blocking_call():
+        with httpx.Client(base_url=base_url, auth=("k", "s")) as client:
+            client.post("/orders", json=ORDER).raise_for_status()
+
+    gateway = RazorpayGateway("k", "s", base_url=base_url)
+
+    async def pooled_call():
+        await gateway.create_order(ORDER)
+
+    for name, call in (("blocking per-request", blocking_call), ("pooled async", pooled_call)):
+        start = time.perf_counter()
+        latencies = await run(call, args.requests, args.concurrency)
+        report(name, latencies, time.perf_counter() - start)
+
+    await gateway.close()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
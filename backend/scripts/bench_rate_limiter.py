@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Per-request overhead of the rate limiting middleware.
+
+Drives a bare ASGI app directly (no sockets) with and without
+RateLimitMiddleware, for an unlimited route and a limited one, and reports
+the added microseconds per request.
+
+    cd backend && python scripts/bench_rate_limiter.py
+    cd backend && python scripts/bench_rate_limiter.py --storage redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.rate_limiter import RateLimitMiddleware, create_storage, parse_rate
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure(app, method: str, path: str, requests: int, clients: int) -> float:
+    scopes = [{"type": "http", "method": method, "path": path, "headers": [], "client": (f"10.0.{i // 256}.{i % 256}", 5000)}
+              for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % clients], receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--storage", default="", help="RATE_LIMIT_STORAGE_URL to test (default in-memory)")
+    args = parser.parse_args()
+
+    storage = create_storage(args.storage)
+    # Generous limit so the measured path is the "allowed" one
+    limited = RateLimitMiddleware(
+        bare_app,
+        storage=storage,
+        route_policies={("POST", "/api/auth/login"): parse_rate("login", "1000000/minute")}
+    )
+
+    requests = args.requests if args.storage == "" else min(args.requests, 20000)
+    baseline = await measure(bare_app, "POST", "/api/auth/login", requests, args.clients)
+    passthrough = await measure(limited, "GET", "/api/events", requests, args.clients)
+    checked = await measure(limited, "POST", "/api/auth/login", requests, args.clients)
+
+    print(f"storage: {type(storage).__name__}, {requests} requests over {args.clients} clients")
+    print(f"  bare app                   {baseline:8.2f} us/request")
+    print(f"  unlimited route            {passthrough:8.2f} us/request (+{passthrough - baseline:.2f})")
+    print(f"  limited route (allowed)    {checked:8.2f} us/request (+{checked - baseline:.2f})")
+    await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
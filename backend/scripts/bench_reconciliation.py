@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Synthetic settlement dataset generator and reconciliation benchmark.
+
+Generates N local transactions plus a shuffled gateway export with a small
+rate of injected discrepancies, then runs the external sort + merge-join and
+reports throughput and peak Python memory (tracemalloc).
+
+    cd backend && python scripts/bench_reconciliation.py --transactions 500000
+    cd backend && python scripts/bench_reconciliation.py --transactions 200000 --write-csv /tmp/settlement.csv
+    cd backend && MONGO_URI=... python scripts/bench_reconciliation.py --transactions 200000 --seed-mongo
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.reconciliation import SortedSettlement, parse_settlement_csv, merge_join, Txn
+
+
+def generate(n: int, discrepancy_rate: float, seed: int):
+    """Return (local_rows sorted by order_id, gateway csv rows in random order)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 4, 1)
+    local, gateway = [], []
+    for i in range(n):
+        order_id = f"order_{i:012d}"
+        amount = rng.choice([50000, 100000, 250000, rng.randint(100, 5000000)])
+        created_at = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        status = "captured" if rng.random() > 0.1 else "created"
+        roll = rng.random()
+
+        if status == "captured" and roll < discrepancy_rate:
+            # Captured locally, never settled
+            local.append((order_id, amount, status, created_at))
+            continue
+        local_entry = (order_id, amount, status, created_at)
+        if status == "captured":
+            gw_amount = amount + 100 if roll < 2 * discrepancy_rate else amount
+            gateway.append({"entity_id": f"pay_{i:012d}", "type": "payment", "amount": f"{gw_amount / 100:.2f}", "order_id": order_id})
+        if roll > 1 - discrepancy_rate:
+            # Settled but the local record was lost
+            gateway.append({"entity_id": f"pay_x{i:011d}", "type": "payment", "amount": f"{amount / 100:.2f}", "order_id": f"order_x{i:011d}"})
+        local.append(local_entry)
+    rng.shuffle(gateway)
+    return local, gateway
+
+
+def write_csv(path: str, rows: list):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["entity_id", "type", "amount", "order_id"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+async def seed_mongo(local: list):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.settings import settings
+    from bson import ObjectId
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.DATABASE_NAME]
+    batch = []
+    for order_id, amount, status, created_at in local:
+        batch.append({"user_id": ObjectId(), "order_id": order_id, "amount": amount, "purpose": "membership",
+                      "status": status, "created_at": created_at})
+        if len(batch) == 5000:
+            await db.payments.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.payments.insert_many(batch, ordered=False)
+    await db.payments.create_index("order_id")
+    client.close()
+    print(f"Seeded {len(local)} payments into {settings.DATABASE_NAME}.payments")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=200000)
+    parser.add_argument("--discrepancy-rate", type=float, default=0.002)
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--write-csv", help="keep the generated settlement CSV at this path")
+    parser.add_argument("--seed-mongo", action="store_true", help="insert the local side into MONGO_URI")
+    args = parser.parse_args()
+
+    local, gateway = generate(args.transactions, args.discrepancy_rate, args.seed)
+    csv_path = args.write_csv or tempfile.mktemp(suffix=".csv")
+    write_csv(csv_path, gateway)
+    del gateway
+    print(f"Generated {len(local)} local transactions, settlement file {os.path.getsize(csv_path) / 1e6:.1f} MB")
+
+    if args.seed_mongo:
+        await seed_mongo(local)
+
+    async def local_stream():
+        for order_id, amount, status, _ in local:
+            yield Txn(order_id, amount, status, source="payments")
+
+    async def reconcile():
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            settlement = SortedSettlement.build(parse_settlement_csv(f), args.chunk_rows)
+        counts = Counter()
+        async for outcome, _, _ in merge_join(iter(settlement), local_stream()):
+            counts[outcome] += 1
+        settlement.close()
+        return counts
+
+    # Timed pass, then a separate pass under tracemalloc (which slows Python code down)
+    start = time.perf_counter()
+    counts = await reconcile()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await reconcile()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(counts.values())
+    print(f"{total} records in {elapsed:.2f}s ({total / elapsed:,.0f} records/s), "
+          f"peak traced memory {peak / 1e6:.1f} MB (chunk {args.chunk_rows} rows)")
+    for outcome, count in sorted(counts.items()):
+        print(f"  {outcome:<22} {count}")
+
+    if not args.write_csv:
+        os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
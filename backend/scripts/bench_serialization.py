@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Rows/second serialized for the admin users and alumni directory lists.
+
+Builds synthetic Mongo documents and times, per request of --rows rows, the
+previous path (Pydantic model per row, response_model re-validation,
+jsonable_encoder, stdlib json) against the current one (TypeAdapter dump or
+orjson without the jsonable_encoder pass). No database needed.
+
+    cd backend && python scripts/bench_serialization.py
+    cd backend && python scripts/bench_serialization.py --rows 500 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import AlumniDirectoryResponse
+from app.responses import json_response
+from app.routes.alumni import directory_fields, directory_list
+
+DEPARTMENTS = ["CSE", "ECE", "ME", "CE", "EE"]
+
+
+def user_docs(n: int, rng: random.Random) -> list:
+    start = datetime(2018, 1, 1)
+    return [{
+        "_id": ObjectId(),
+        "name": f"Alumnus {i}",
+        "email": f"alumnus{i}@example.com",
+        "department": rng.choice(DEPARTMENTS),
+        "registration_number": f"REG{i:06d}",
+        "passout_year": rng.randint(2005, 2024),
+        "role": rng.choice(["alumni", "student"]),
+        "membership_status": rng.choice(["active", "unpaid"]),
+        "joined_at": start + timedelta(minutes=rng.randrange(3_000_000)),
+        "current_company": f"Company {rng.randrange(300)}",
+        "current_position": "Engineer",
+        "location": "Kolkata",
+        "gender": rng.choice(["male", "female"]),
+        "professional": {"workplace": f"Company {rng.randrange(300)}", "designation": "Engineer",
+                         "industry": "Software", "skills": ["python", "sql", "react"]}
+    } for i in range(n)]
+
+
+def admin_user_rows(users: list) -> list:
+    return [{
+        "id": str(u["_id"]),
+        "name": u.get("name", ""),
+        "email": u.get("email", ""),
+        "department": u.get("department", ""),
+        "registration_number": u.get("registration_number", ""),
+        "passout_year": u.get("passout_year", 0),
+        "role": u.get("role", ""),
+        "membership_status": u.get("membership_status", "unpaid"),
+        "joined_at": u.get("joined_at")
+    } for u in users]
+
+
+async def timed(label: str, requests: int, rows: int, fn):
+    await fn()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44} {elapsed / requests * 1000:7.2f} ms/request {rows * requests / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    users = user_docs(args.rows, random.Random(1))
+    directory_field = create_response_field(name="directory", type_=list[AlumniDirectoryResponse])
+
+    async def users_before():
+        JSONResponse(jsonable_encoder(admin_user_rows(users)))
+
+    async def users_after():
+        json_response(admin_user_rows(users))
+
+    async def directory_before():
+        models = [AlumniDirectoryResponse(**directory_fields(u)) for u in users]
+        content = await serialize_response(field=directory_field, response_content=models, is_coroutine=True)
+        JSONResponse(content)
+
+    async def directory_after():
+        directory_list.response(directory_fields(u) for u in users)
+
+    for name, before, after in (("GET /api/admin/users", users_before, users_after),
+                                ("GET /api/alumni/directory", directory_before, directory_after)):
+        print(f"{name} ({args.rows} rows):")
+        slow = await timed("jsonable_encoder + validation + json", args.requests, args.rows, before)
+        fast = await timed("orjson / TypeAdapter, no re-validation", args.requests, args.rows, after)
+        print(f"  speedup {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Load test: database queries and latency for a burst of identical reads.
+
+Fires --clients concurrent requests at GET /api/events, /api/jobs and
+/api/alumni/stats through the real routers (ASGI, no sockets) against an
+in-memory database that adds --latency-ms to every query and, like the real
+connection pool, runs at most --pool queries at once, with single-flight
+coalescing off and on. Reports queries issued and p50/p95 latency per burst.
+
+    cd backend && python scripts/bench_single_flight.py
+    cd backend && python scripts/bench_single_flight.py --clients 500 --latency-ms 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app import crud
+from app.core.settings import settings
+from app.deps import get_current_claims
+from app.routes import alumni, events, jobs
+
+
+class Cursor:
+    def __init__(self, db, docs):
+        self.db = db
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        await self.db.query()
+        return list(self.docs)
+
+
+class Collection:
+    def __init__(self, db, docs):
+        self.db = db
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        return Cursor(self.db, self.docs)
+
+    async def find_one(self, query):
+        await self.db.query()
+        return next((d for d in self.docs if d["_id"] == query.get("_id")), None)
+
+    async def count_documents(self, query):
+        await self.db.query()
+        return len(self.docs)
+
+    def aggregate(self, pipeline):
+        return Cursor(self.db, [{"_id": "CSE", "count": len(self.docs)}])
+
+
+class LatencyDB:
+    def __init__(self, latency: float, pool: int):
+        self.latency = latency
+        self.queries = 0
+        self.pool = asyncio.Semaphore(pool)
+        author = ObjectId()
+        now = datetime.utcnow()
+        self.users = Collection(self, [{"_id": author, "name": "Asha", "role": "alumni", "department": "CSE"}])
+        self.events = Collection(self, [
+            {"_id": ObjectId(), "title": f"Event {i}", "description": "Meetup", "event_date": now, "location": "Hall",
+             "created_by": author, "approved": True, "attendees": [], "created_at": now} for i in range(30)])
+        self.jobs = Collection(self, [
+            {"_id": ObjectId(), "title": f"Job {i}", "company": "Acme", "description": "Role", "location": "Remote",
+             "job_type": "full-time", "created_by": author, "approved": True, "created_at": now} for i in range(10)])
+
+    async def query(self):
+        self.queries += 1
+        async with self.pool:
+            await asyncio.sleep(self.latency)
+
+
+async def burst(client: AsyncClient, path: str, clients: int) -> list:
+    async def one():
+        start = time.perf_counter()
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+        return time.perf_counter() - start
+    return sorted(await asyncio.gather(*(one() for _ in range(clients))))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--pool", type=int, default=settings.MONGO_MAX_POOL_SIZE)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    for module in (events, jobs, alumni):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_current_claims] = lambda: {"_id": str(ObjectId()), "role": "alumni", "claims_only": True}
+
+    print(f"{args.clients} concurrent clients per burst, {args.latency_ms:.0f} ms per query, pool of {args.pool}\n")
+    print(f"{'route':<18} | {'single-flight':>13} | {'queries':>7} | {'p50 ms':>7} | {'p95 ms':>7}")
+    for path in ("/api/events", "/api/jobs", "/api/alumni/stats"):
+        for enabled in (False, True):
+            db = LatencyDB(args.latency_ms / 1000, args.pool)
+            crud.get_database = alumni.get_database = lambda: db
+            settings.SINGLE_FLIGHT_ENABLED = enabled
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                timings = await burst(client, path, args.clients)
+            p50 = timings[len(timings) // 2] * 1000
+            p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+            print(f"{path:<18} | {'on' if enabled else 'off':>13} | {db.queries:>7} | {p50:>7.1f} | {p95:>7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,10 +2,13 @@
 """Fix admin password hash in MongoDB"""
 import asyncio
 import os
+import sys
 from motor.motor_asyncio import AsyncIOMotorClient
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Same scheme and cost as the app (PASSWORD_SCHEME, BCRYPT_ROUNDS / ARGON2_*)
+from app.core.security import get_password_hash
 
 async def fix_password():
     mongo_uri = os.getenv("MONGO_URI")
@@ -17,9 +20,9 @@ async def fix_password():
     db = client[os.getenv("DATABASE_NAME", "alumni_portal")]
     
     try:
-        # Create new password hash using bcrypt
-        new_hash = pwd_context.hash("admin123")
-        print(f"✅ Generated bcrypt hash for 'admin123'")
+        # Create new password hash with the app's hashing policy
+        new_hash = get_password_hash("admin123")
+        print(f"✅ Generated password hash for 'admin123'")
         
         # Update admin user in database
         result = await db.users.update_one(
@@ -1,6 +1,10 @@
 """Test configuration"""
+import copy
 import pytest
 from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 @pytest.fixture
 def sample_user():
@@ -36,3 +40,241 @@ def sample_event():
         "created_by": "faculty_123",
         "registration_count": 10
     }
+
+
+# ---------------------------------------------------------------------------
+# In-memory Mongo stand-in shared by the tests that monkeypatch get_database.
+# Supports the query/update operators the app uses; anything else raises.
+# ---------------------------------------------------------------------------
+_MISSING = object()
+
+
+def _compare(op, value, arg):
+    if op == "$in":
+        return (value in arg) if not isinstance(value, list) else any(v in arg for v in value)
+    if op == "$nin":
+        return value not in arg
+    if op == "$ne":
+        return value != arg
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if value is _MISSING or value is None:
+        return False
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    raise NotImplementedError(f"FakeCollection does not support {op}")
+
+
+def _is_operator(cond) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def matches(doc: dict, query: dict) -> bool:
+    """Mongo-style filter match; {field: None} also matches a missing field"""
+    for field, cond in (query or {}).items():
+        if field == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+            continue
+        if field == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+            continue
+        value = doc.get(field, _MISSING)
+        if _is_operator(cond):
+            if not all(_compare(op, None if value is _MISSING and op in ("$in", "$nin", "$ne") else value, arg)
+                       for op, arg in cond.items()):
+                return False
+        elif (None if value is _MISSING else value) != cond:
+            return False
+    return True
+
+
+def project(doc: dict, projection) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(v for v in fields.values()):
+        keep = set(fields) | ({"_id"} if projection.get("_id", 1) else set())
+        return {k: v for k, v in doc.items() if k in keep}
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+class FakeResult:
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None, deleted_count=0, inserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.deleted_count = deleted_count
+        self.inserted_id = inserted_id
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda d: d.get(field), reverse=order < 0)
+        return self
+
+    def skip(self, n):
+        self.docs = self.docs[n:]
+        return self
+
+    def limit(self, n):
+        if n:
+            self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else list(self.docs)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """A list of documents with a unique ``_id`` (plus any ``unique`` fields)"""
+
+    def __init__(self, docs=(), unique=()):
+        self.docs = [dict(d) for d in docs]
+        self.unique = tuple(unique)
+        self.indexes = []
+        self.reads = 0
+
+    def _check_unique(self, doc, ignore=None):
+        for field in ("_id",) + self.unique:
+            if field in doc and any(d is not ignore and d.get(field) == doc[field] for d in self.docs):
+                raise DuplicateKeyError(f"E11000 duplicate key error: {field}")
+
+    def _apply(self, doc: dict, update: dict, inserting: bool = False):
+        for op, fields in update.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                doc.update(copy.deepcopy(fields))
+            elif op == "$inc":
+                for field, n in fields.items():
+                    doc[field] = doc.get(field, 0) + n
+            elif op == "$unset":
+                for field in fields:
+                    doc.pop(field, None)
+            elif op == "$push":
+                for field, value in fields.items():
+                    doc.setdefault(field, []).append(value)
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"FakeCollection does not support {op}")
+
+    def _upsert(self, query: dict, update: dict) -> dict:
+        doc = {k: copy.deepcopy(v) for k, v in query.items() if not k.startswith("$") and not _is_operator(v)}
+        self._apply(doc, update, inserting=True)
+        doc.setdefault("_id", ObjectId())
+        self._check_unique(doc)
+        self.docs.append(doc)
+        return doc
+
+    def get(self, **fields) -> dict:
+        """The stored (live) document with these field values"""
+        return next(d for d in self.docs if all(d.get(k) == v for k, v in fields.items()))
+
+    async def create_index(self, keys, **options):
+        self.indexes.append((keys, options))
+
+    def _insert(self, doc: dict):
+        doc.setdefault("_id", ObjectId())
+        self._check_unique(doc)
+        self.docs.append(copy.deepcopy(doc))
+
+    async def insert_one(self, doc):
+        self._insert(doc)
+        return FakeResult(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self._insert(doc)
+
+    def find(self, query=None, projection=None):
+        self.reads += 1
+        return FakeCursor([project(d, projection) for d in self.docs if matches(d, query)])
+
+    async def find_one(self, query=None, projection=None):
+        self.reads += 1
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        return None if doc is None else project(doc, projection)
+
+    async def count_documents(self, query=None):
+        return sum(1 for d in self.docs if matches(d, query))
+
+    async def distinct(self, field, query=None):
+        return list({d[field] for d in self.docs if field in d and matches(d, query)})
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            return FakeResult(upserted_id=self._upsert(query, update)["_id"] if upsert else None)
+        self._apply(doc, update)
+        return FakeResult(matched_count=1, modified_count=1)
+
+    async def update_many(self, query, update, upsert=False):
+        docs = [d for d in self.docs if matches(d, query)]
+        for doc in docs:
+            self._apply(doc, update)
+        if not docs and upsert:
+            return FakeResult(upserted_id=self._upsert(query, update)["_id"])
+        return FakeResult(matched_count=len(docs), modified_count=len(docs))
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return None
+            doc = self._upsert(query, update)
+            return project(doc, projection) if return_document else None
+        before = project(doc, projection)
+        self._apply(doc, update)
+        return project(doc, projection) if return_document else before
+
+    async def delete_one(self, query):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is not None:
+            self.docs.remove(doc)
+        return FakeResult(deleted_count=int(doc is not None))
+
+    async def delete_many(self, query):
+        kept = [d for d in self.docs if not matches(d, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return FakeResult(deleted_count=deleted)
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+
+class FakeDB:
+    """Collections are created on first access, like Mongo's"""
+
+    def __init__(self, **collections):
+        for name, collection in collections.items():
+            setattr(self, name, collection)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        collection = FakeCollection()
+        setattr(self, name, collection)
+        return collection
+
+    def __getitem__(self, name):
+        return getattr(self, name)
@@ -0,0 +1,74 @@
+"""Local stand-in for the Razorpay orders API.
+
+Used in-process by tests (via httpx.ASGITransport) and over a real socket by
+scripts/bench_payment_gateway.py:
+
+    uvicorn tests.stub_gateway:app --port 9010
+"""
+import asyncio
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+
+# Knobs tests/benchmarks may tweak
+app.state.latency = 0.0          # seconds added to every call
+app.state.fail_next = []         # status codes returned (FIFO) before succeeding
+app.state.calls = 0
+app.state.orders = {}
+
+
+def reset(latency: float = 0.0, fail_next=None):
+    app.state.latency = latency
+    app.state.fail_next = list(fail_next or [])
+    app.state.calls = 0
+    app.state.orders = {}
+
+
+async def _delay_or_fail():
+    app.state.calls += 1
+    if app.state.latency:
+        await asyncio.sleep(app.state.latency)
+    if app.state.fail_next:
+        code = app.state.fail_next.pop(0)
+        return JSONResponse(
+            {"error": {"code": "SERVER_ERROR" if code >= 500 else "BAD_REQUEST_ERROR", "description": f"stub {code}"}},
+            status_code=code
+        )
+    return None
+
+
+@app.post("/v1/orders")
+async def create_order(request: Request):
+    failure = await _delay_or_fail()
+    if failure:
+        return failure
+    data = await request.json()
+    if not isinstance(data.get("amount"), int) or data["amount"] < 100:
+        return JSONResponse(
+            {"error": {"code": "BAD_REQUEST_ERROR", "description": "Order amount less than minimum amount allowed"}},
+            status_code=400
+        )
+    order = {
+        "id": f"order_{uuid.uuid4().hex[:14]}",
+        "entity": "order",
+        "amount": data["amount"],
+        "currency": data.get("currency", "INR"),
+        "receipt": data.get("receipt"),
+        "notes": data.get("notes", {}),
+        "status": "created",
+    }
+    app.state.orders[order["id"]] = order
+    return order
+
+
+@app.get("/v1/orders/{order_id}")
+async def fetch_order(order_id: str):
+    failure = await _delay_or_fail()
+    if failure:
+        return failure
+    order = app.state.orders.get(order_id)
+    if not order:
+        return JSONResponse({"error": {"code": "BAD_REQUEST_ERROR", "description": "The id provided does not exist"}}, status_code=400)
+    return order
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app import audit
+from app.audit import AuditWriter, bump_hourly_counts, hour_bucket, rebuild_hourly_counts
+from app.core.settings import settings
+from app.routes.audit_logs import encode_cursor, decode_cursor
+from tests.conftest import FakeCollection, FakeDB
+
+
+class AuditLogs(FakeCollection):
+    """Remembers how documents arrived: in batches or one at a time"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.singles = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+        await super().insert_many(docs, ordered)
+
+    async def insert_one(self, doc):
+        self.singles.append(doc)
+        return await super().insert_one(doc)
+
+
+def audit_db():
+    return FakeDB(audit_logs=AuditLogs())
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = audit_db()
+    monkeypatch.setattr(audit, "get_database", lambda: db)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_and_drains_on_stop(fake_db):
+    writer = AuditWriter(max_size=100, batch_size=10, flush_seconds=5)
+    writer.start()
+    for i in range(25):
+        assert await writer.submit({"action": "test", "n": i})
+    await writer.stop()
+
+    sizes = [len(b) for b in fake_db.audit_logs.batches]
+    assert sum(sizes) == 25 and max(sizes) <= 10
+    assert [d["n"] for b in fake_db.audit_logs.batches for d in b] == list(range(25))
+    assert fake_db.audit_logs.singles == []
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_partial_batch_on_interval(fake_db):
+    writer = AuditWriter(max_size=100, batch_size=50, flush_seconds=0.05)
+    writer.start()
+    await writer.submit({"action": "test"})
+    await asyncio.sleep(0.2)
+    assert len(fake_db.audit_logs.batches) == 1
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_writer_drops_when_full(fake_db):
+    writer = AuditWriter(max_size=2, batch_size=10, flush_seconds=5)
+    writer.start()
+    # The writer task hasn't run yet, so nothing leaves the queue
+    results = [await writer.submit({"action": "test"}) for _ in range(3)]
+    assert results == [True, True, False]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_writes_directly_when_not_started(fake_db):
+    await audit.log_audit_event("login_attempt", resource="a@b.c")
+    assert fake_db.audit_logs.singles[0]["action"] == "login_attempt"
+
+
+@pytest.mark.asyncio
+async def test_hourly_counts_bucket_by_action_and_hour():
+    db = audit_db()
+    await bump_hourly_counts(db, [
+        {"action": "login_attempt", "status": "success", "timestamp": datetime(2025, 1, 1, 10, 5)},
+        {"action": "login_attempt", "status": "failed", "timestamp": datetime(2025, 1, 1, 10, 59)},
+        {"action": "login_attempt", "status": "success", "timestamp": datetime(2025, 1, 1, 11, 0)},
+        {"action": "payment", "status": "success", "timestamp": datetime(2025, 1, 1, 10, 30)},
+    ])
+    counts = {(d["_id"]["action"], d["_id"]["hour"]): (d["count"], d["failed"]) for d in db.audit_hourly.docs}
+    assert counts == {
+        ("login_attempt", datetime(2025, 1, 1, 10)): (2, 1),
+        ("login_attempt", datetime(2025, 1, 1, 11)): (1, 0),
+        ("payment", datetime(2025, 1, 1, 10)): (1, 0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_rebuild_leaves_rollups_of_archived_hours_alone(fake_db):
+    now = datetime.utcnow()
+    archived = hour_bucket(now - timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS + 1))
+    retained = hour_bucket(now - timedelta(days=1))
+    for hour in (archived, retained):
+        await bump_hourly_counts(fake_db, [{"action": "login_attempt", "timestamp": hour}])
+    pipelines = []
+
+    class NoLogs:
+        async def to_list(self, length):
+            return []
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        return NoLogs()
+
+    fake_db.audit_logs.aggregate = aggregate
+    await rebuild_hourly_counts(archived - timedelta(days=30))
+
+    # Only the retained hour is recomputed; the archived one can no longer be
+    assert [d["hour"] for d in fake_db.audit_hourly.docs] == [archived]
+    assert pipelines[0][0]["$match"]["timestamp"]["$gte"] > archived
+
+    pipelines.clear()
+    assert await rebuild_hourly_counts(archived - timedelta(days=30), archived + timedelta(hours=2)) == 0
+    assert pipelines == [] and len(fake_db.audit_hourly.docs) == 1
+
+
+def test_cursor_round_trip():
+    from bson import ObjectId
+    log = {"_id": ObjectId(), "timestamp": datetime(2025, 1, 1, 10, 5, 0, 123000)}
+    query = decode_cursor(encode_cursor(log))
+    assert query["$or"][0] == {"timestamp": {"$lt": log["timestamp"]}}
+    assert query["$or"][1] == {"timestamp": log["timestamp"], "_id": {"$lt": log["_id"]}}
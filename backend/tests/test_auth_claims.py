@@ -0,0 +1,92 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app import auth_claims, deps
+from app.auth_claims import AuthVersionFilter, REMOVED_VERSION, user_claims
+from app.core.security import create_access_token
+from app.deps import get_current_claims, get_faculty_claims, load_user
+from tests.conftest import FakeCollection, FakeDB
+
+
+class UserLoads(FakeCollection):
+    """Counts single-user loads; the bulk read after an auth version bump is not one"""
+
+    def find(self, query=None, projection=None):
+        cursor = super().find(query, projection)
+        self.reads -= 1
+        return cursor
+
+
+def faculty():
+    return {"_id": ObjectId(), "name": "Dr. Rao", "role": "faculty", "department": "CSE", "email": "rao@example.com"}
+
+
+def credentials_for(user):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(user_claims(user)))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    user = faculty()
+    db = FakeDB(users=UserLoads([user]))
+    db.user = db.users.docs[0]
+    versions = AuthVersionFilter()
+    monkeypatch.setattr(auth_claims, "get_database", lambda: db)
+    monkeypatch.setattr(deps, "get_database", lambda: db)
+    monkeypatch.setattr(deps, "auth_versions", versions)
+    db.versions = versions
+    return db
+
+
+@pytest.mark.asyncio
+async def test_fresh_token_authorizes_without_db(db):
+    user = await get_faculty_claims(await get_current_claims(credentials_for(db.user)))
+    assert user["_id"] == str(db.user["_id"]) and user["department"] == "CSE"
+    assert db.users.reads == 0
+
+    assert (await load_user(user))["email"] == "rao@example.com"
+    assert db.users.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_token_older_than_a_change_falls_back_to_db(db):
+    credentials = credentials_for(db.user)
+    db.user["department"] = "ECE"
+    await db.versions.record_change([db.user["_id"]])
+
+    user = await get_current_claims(credentials)
+    assert user["department"] == "ECE" and db.users.reads == 1
+
+    # A token issued after the change is trusted again
+    await get_current_claims(credentials_for(db.user))
+    assert db.users.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_change_reaches_other_workers_on_sync(db):
+    other = AuthVersionFilter()
+    await db.versions.record_change([db.user["_id"]])
+    assert not other.is_stale(str(db.user["_id"]), 0)
+    await other.sync()
+    assert other.is_stale(str(db.user["_id"]), 0)
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_tokens_are_rejected(db):
+    credentials = credentials_for(db.user)
+    db.users.docs.remove(db.user)
+    await db.versions.record_change([db.user["_id"]])
+    assert db.auth_changes.docs[0]["version"] == REMOVED_VERSION
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_claims(credentials)
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_claims_variant_still_enforces_role(db):
+    db.user["role"] = "alumni"
+    with pytest.raises(HTTPException) as exc:
+        await get_faculty_claims(await get_current_claims(credentials_for(db.user)))
+    assert exc.value.status_code == 403
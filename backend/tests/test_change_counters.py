@@ -0,0 +1,59 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from app import change_counters as counters_module
+from app.change_counters import ChangeCounters, conditional_get, etag_matches
+from tests.conftest import FakeDB
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    db = FakeDB()
+    counters = ChangeCounters()
+    monkeypatch.setattr(counters_module, "get_database", lambda: db)
+    monkeypatch.setattr(counters_module, "change_counters", counters)
+    return counters
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('W/"events-3"', 'W/"events-3"')
+    assert etag_matches('"events-3", W/"gallery-1"', 'W/"events-3"')
+    assert etag_matches("*", 'W/"events-3"')
+    assert not etag_matches('W/"events-2"', 'W/"events-3"')
+
+
+@pytest.mark.asyncio
+async def test_bump_and_sync_share_versions(counters):
+    await counters.bump("events")
+    await counters.bump("events", "content")
+    assert counters.version("events") == 2 and counters.version("content") == 1
+
+    other_worker = ChangeCounters()
+    assert other_worker.etag("events", "events") == 'W/"events-0"'
+    await other_worker.sync()
+    assert other_worker.etag("landing", "events", "content") == 'W/"landing-2.1"'
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_gets_304_without_running_handler(counters):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/events")
+    async def list_events(cache: dict = Depends(conditional_get("events"))):
+        calls.append(1)
+        return [{"title": "Meetup"}]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/events")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and first.headers["cache-control"].startswith("public, max-age=")
+
+        cached = await client.get("/events", headers={"if-none-match": etag})
+        assert cached.status_code == 304 and cached.content == b"" and cached.headers["etag"] == etag
+        assert len(calls) == 1
+
+        await counters.bump("events")
+        changed = await client.get("/events", headers={"if-none-match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        assert len(calls) == 2
@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from httpx import AsyncClient
+from app.compression import CompressionMiddleware, level_for, parse_accept_encoding
+
+ROWS = [{"id": i, "name": f"Alumni {i}", "department": "CSE"} for i in range(200)]
+
+
+def make_app(minimum_size: int = 1024):
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return ROWS
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" + b"\x00" * 5000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield json.dumps(ROWS).encode() if i == 0 else b"\n"
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    @app.get("/tiny-stream")
+    async def tiny_stream():
+        async def chunks():
+            yield b"{"
+            yield b"}"
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size,
+                       gzip_levels={"application/json": 6, "text/": 6}, brotli_levels={"application/json": 4})
+    return app
+
+
+def test_accept_encoding_parsing():
+    assert parse_accept_encoding("gzip, deflate, br;q=0") == {"gzip", "deflate"}
+    assert parse_accept_encoding("br;q=0.5, GZIP") == {"br", "gzip"}
+
+
+def test_level_lookup_prefers_exact_type():
+    levels = {"application/json": 4, "text/": 6}
+    assert level_for(levels, "application/json; charset=utf-8") == 4
+    assert level_for(levels, "text/csv") == 6
+    assert level_for(levels, "image/png") is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped():
+    async with AsyncClient(app=make_app(), base_url="http://test") as client:
+        response = await client.get("/big", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(ROWS))
+    assert response.json() == ROWS
+
+
+@pytest.mark.asyncio
+async def test_small_body_and_media_pass_through():
+    async with AsyncClient(app=make_app(), base_url="http://test") as client:
+        small = await client.get("/small", headers={"accept-encoding": "gzip"})
+        image = await client.get("/image", headers={"accept-encoding": "gzip"})
+        tiny = await client.get("/tiny-stream", headers={"accept-encoding": "gzip"})
+        plain = await client.get("/big", headers={"accept-encoding": "identity"})
+    for response in (small, image, tiny, plain):
+        assert "content-encoding" not in response.headers
+    assert tiny.content == b"{}"
+    assert plain.json() == ROWS
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_compressed_per_chunk():
+    app = make_app()
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.sleep(3600)
+
+    scope = {"type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+             "headers": [(b"accept-encoding", b"gzip")], "http_version": "1.1", "scheme": "http",
+             "server": ("test", 80), "client": ("127.0.0.1", 5000), "root_path": ""}
+    await app(scope, receive, send)
+
+    start = messages[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    bodies = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    assert len(bodies) > 2 and bodies[0]["more_body"] and bodies[0]["body"]
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == json.dumps(ROWS).encode() + b"\n" * 4
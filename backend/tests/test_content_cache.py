@@ -0,0 +1,110 @@
+import pytest
+from bson import ObjectId
+from app import change_counters as counters_module
+from app import content_cache as cache_module
+from app.change_counters import ChangeCounters
+from app.content_cache import ContentCache
+from app.routes import content as content_routes
+from app.routes import donations_admin
+from tests.conftest import FakeCollection, FakeDB
+
+
+def content_db():
+    db = FakeDB(
+        content=FakeCollection([
+            {"_id": 1, "type": "homepage", "title": "Alumni Portal 2025"},
+            {"_id": 2, "type": "section", "name": "about", "body": "About us"},
+            {"_id": 3, "type": "gallery", "images": ["a.jpg"]},
+        ]),
+        content_sections=FakeCollection(),
+        donation_stats=FakeCollection([{"_id": "main", "total_donated": 42}]),
+        settings=FakeCollection(),
+    )
+    db.reads = lambda: sum(db[c].reads for c in ("content", "content_sections", "donation_stats", "settings"))
+    return db
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = content_db()
+    counters = ChangeCounters()
+    cache = ContentCache()
+    for module in (counters_module, cache_module):
+        monkeypatch.setattr(module, "get_database", lambda: db)
+    monkeypatch.setattr(counters_module, "change_counters", counters)
+    monkeypatch.setattr(cache_module, "change_counters", counters)
+    for module in (cache_module, content_routes, donations_admin):
+        monkeypatch.setattr(module, "content_cache", cache)
+    db.cache, db.counters = cache, counters
+    return db
+
+
+@pytest.mark.asyncio
+async def test_page_reads_are_served_from_memory(db):
+    assert await db.cache.load() == 4
+    reads = db.reads()
+
+    assert (await content_routes.get_homepage_content(cache={}))["title"] == "Alumni Portal 2025"
+    assert (await content_routes.get_section("About"))["body"] == "About us"
+    assert (await content_routes.get_gallery_images(cache={}))["images"] == ["a.jpg"]
+    assert (await donations_admin.get_donation_stats(cache={}))["total_donated"] == 42
+    assert (await content_routes.get_featured_jobs(cache={}))["job_ids"] == []
+    assert db.reads() == reads
+
+
+@pytest.mark.asyncio
+async def test_write_refreshes_here_and_invalidates_other_workers(db):
+    await db.cache.load()
+    other_counters, other_cache = ChangeCounters(), ContentCache()
+    cache_module.change_counters = other_counters
+    await other_cache.load()
+    cache_module.change_counters = db.counters
+
+    db.content.docs[0]["title"] = "Reunion 2025"
+    await db.cache.refresh("content")
+    assert (await db.cache.get("content", ("homepage", None)))["title"] == "Reunion 2025"
+
+    # The other worker serves its copy until its counters sync, then reloads once
+    cache_module.change_counters = other_counters
+    assert (await other_cache.get("content", ("homepage", None)))["title"] == "Alumni Portal 2025"
+    await other_counters.sync()
+    assert (await other_cache.get("content", ("homepage", None)))["title"] == "Reunion 2025"
+    loads = other_cache.loads
+    await other_cache.get("content", ("gallery", None))
+    assert other_cache.loads == loads
+
+
+class QueryLog(FakeCollection):
+    def __init__(self, docs):
+        super().__init__(docs)
+        self.queries = []
+
+    def find(self, query=None, projection=None):
+        self.queries.append(query)
+        return super().find(query, projection)
+
+
+@pytest.mark.asyncio
+async def test_featured_jobs_are_hydrated_in_configured_order(db, monkeypatch):
+    a, b, c = ObjectId(), ObjectId(), ObjectId()
+    db.jobs = QueryLog([
+        {"_id": a, "title": "Backend Engineer", "company": "Acme", "description": "long text", "approved": True},
+        {"_id": b, "title": "Data Analyst", "company": "Initech", "description": "long text", "approved": True},
+        {"_id": c, "title": "Pending role", "company": "Hooli", "approved": False},
+    ])
+    db.content.docs.append({"_id": 4, "type": "featured_jobs", "job_ids": [str(b), "not-an-id", str(a), str(c)]})
+    monkeypatch.setattr(content_routes, "get_database", lambda: db)
+    monkeypatch.setattr(content_routes, "change_counters", db.counters)
+    monkeypatch.setattr(content_routes, "_featured_cards", {})
+
+    featured = await content_routes.featured_jobs()
+    assert [job["title"] for job in featured["jobs"]] == ["Data Analyst", "Backend Engineer"]
+    assert featured["jobs"][0] == {"id": str(b), "title": "Data Analyst", "company": "Initech"}
+    assert len(db.jobs.queries) == 1 and len(db.jobs.queries[0]["_id"]["$in"]) == 3
+
+    await content_routes.featured_jobs()
+    assert len(db.jobs.queries) == 1
+
+    await db.counters.bump("jobs")
+    await content_routes.featured_jobs()
+    assert len(db.jobs.queries) == 2
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from app import change_counters as counters_module
+from app.change_counters import ChangeCounters
+from app.routes import landing
+
+
+@pytest.fixture
+def client_app(monkeypatch):
+    counters = ChangeCounters()
+    calls = []
+
+    def part(name, value):
+        async def load():
+            calls.append(name)
+            await asyncio.sleep(0.05)
+            return value
+        return load
+
+    monkeypatch.setattr(counters_module, "change_counters", counters)
+    monkeypatch.setattr(landing, "landing_cache", landing.LandingCache())
+    monkeypatch.setattr(landing, "homepage_content", part("homepage", {"title": "Alumni Portal"}))
+    monkeypatch.setattr(landing, "gallery_images", part("gallery", {"images": []}))
+    monkeypatch.setattr(landing, "featured_events", part("events", {"event_ids": []}))
+    monkeypatch.setattr(landing, "featured_jobs", part("jobs", {"job_ids": []}))
+    monkeypatch.setattr(landing, "latest_announcements", part("announcements", []))
+    monkeypatch.setattr(landing, "donation_stats", part("stats", {"total_donated": 1}))
+
+    app = FastAPI()
+    app.include_router(landing.router, prefix="/api")
+    return app, counters, calls
+
+
+@pytest.mark.asyncio
+async def test_landing_is_assembled_concurrently_and_cached(client_app):
+    app, counters, calls = client_app
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        start = time.perf_counter()
+        first = await client.get("/api/landing")
+        assert time.perf_counter() - start < 0.25
+        assert first.status_code == 200 and len(calls) == 6
+        assert first.json()["homepage"]["title"] == "Alumni Portal"
+
+        second = await client.get("/api/landing")
+        assert second.content == first.content and len(calls) == 6
+
+        cached = await client.get("/api/landing", headers={"if-none-match": first.headers["etag"]})
+        assert cached.status_code == 304 and len(calls) == 6
+
+        counters.versions["announcements"] = 1
+        changed = await client.get("/api/landing", headers={"if-none-match": first.headers["etag"]})
+        assert changed.status_code == 200 and changed.headers["etag"] != first.headers["etag"]
+        assert len(calls) == 12
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_build_once(client_app):
+    app, counters, calls = client_app
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/api/landing") for _ in range(10)))
+    assert all(r.status_code == 200 for r in responses)
+    assert landing.landing_cache.builds == 1 and len(calls) == 6
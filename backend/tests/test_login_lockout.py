@@ -0,0 +1,45 @@
+import time
+import pytest
+from app import security_utils
+from app.core.settings import settings
+from app.security_utils import LockoutCache, check_login_attempts, _bucket_seconds, _recent_failures
+
+
+def buckets_ago(*seconds_ago):
+    now = time.time()
+    return [{"t": int((now - s) // _bucket_seconds()), "n": 1} for s in seconds_ago]
+
+
+def test_recent_failures_only_counts_the_window():
+    window = settings.LOCKOUT_DURATION_MINUTES * 60
+    buckets = buckets_ago(0, 30, window - 2 * _bucket_seconds(), window + 2 * _bucket_seconds())
+    assert _recent_failures(buckets, time.time()) == 3
+
+
+@pytest.mark.asyncio
+async def test_locked_email_is_answered_from_cache(monkeypatch):
+    def no_db():
+        raise AssertionError("locked email should not touch the database")
+
+    cache = LockoutCache()
+    cache.put("victim@example.com", buckets_ago(*range(settings.MAX_LOGIN_ATTEMPTS)))
+    monkeypatch.setattr(security_utils, "lockout_cache", cache)
+    monkeypatch.setattr(security_utils, "get_database", no_db)
+
+    allowed, message = await check_login_attempts(" Victim@Example.com ")
+    assert not allowed and "locked" in message
+
+
+def test_unlocked_cache_entries_expire(monkeypatch):
+    monkeypatch.setattr(settings, "LOCKOUT_CACHE_SECONDS", 0)
+    cache = LockoutCache()
+    cache.put("user@example.com", buckets_ago(0))
+    assert cache.get("user@example.com") is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "LOCKOUT_CACHE_SIZE", 2)
+    cache = LockoutCache()
+    for email in ("a", "b", "c"):
+        cache.put(email, [])
+    assert cache.get("a") is None and cache.get("c") == []
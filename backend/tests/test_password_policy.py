@@ -0,0 +1,71 @@
+import bcrypt
+import pytest
+from app.core import password_policy as policy_module
+from app.core import security
+from app.core.password_policy import ARGON2ID, BCRYPT, PasswordPolicy, identify
+
+
+def test_lower_cost_hash_verifies_and_needs_rehash():
+    old = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=4)
+    new = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=5)
+    hashed = old.hash("S3cret!pass")
+    assert identify(hashed) == BCRYPT
+    assert new.verify("S3cret!pass", hashed) and not new.verify("wrong", hashed)
+    assert new.needs_rehash(hashed)
+    assert not new.needs_rehash(new.hash("S3cret!pass"))
+
+
+def test_unknown_hashes_are_rejected_and_flagged():
+    policy = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=4)
+    assert not policy.verify("x", "plaintext")
+    assert policy.needs_rehash("plaintext")
+
+
+def test_argon2_falls_back_to_bcrypt_when_missing(monkeypatch):
+    monkeypatch.setattr(policy_module, "_argon2", lambda: None)
+    assert PasswordPolicy(scheme=ARGON2ID).scheme == BCRYPT
+
+
+def test_calibration_never_lowers_cost():
+    policy = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=5)
+    policy.calibrate(target_ms=0.001)
+    assert policy.bcrypt_rounds == 5
+    policy.calibrate(target_ms=20)
+    assert policy.bcrypt_rounds > 5
+
+
+@pytest.mark.asyncio
+async def test_verify_and_rehash_upgrades_outdated_hash(monkeypatch):
+    monkeypatch.setattr(security, "password_policy", PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=5))
+    outdated = bcrypt.hashpw(b"S3cret!pass", bcrypt.gensalt(rounds=4)).decode()
+
+    valid, new_hash = await security.verify_and_rehash("S3cret!pass", outdated)
+    assert valid and new_hash.startswith("$2b$05$")
+    assert await security.verify_and_rehash("S3cret!pass", new_hash) == (True, None)
+    assert await security.verify_and_rehash("wrong", outdated) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_outdated_admin_hash_is_verified_but_never_rehashed(monkeypatch, capsys):
+    policy = PasswordPolicy(scheme=BCRYPT, bcrypt_rounds=5)
+    monkeypatch.setattr(security, "password_policy", policy)
+    monkeypatch.setattr(security, "_admin_hash_reported", False)
+    monkeypatch.setattr(security.settings, "ADMIN_PASSWORD_HASH", bcrypt.hashpw(b"S3cret!pass", bcrypt.gensalt(rounds=4)).decode())
+    hashes = []
+    monkeypatch.setattr(policy, "hash", lambda password: hashes.append(password))
+
+    assert await security.verify_admin_password("S3cret!pass")
+    assert await security.verify_admin_password("S3cret!pass")
+    assert not await security.verify_admin_password("wrong")
+    assert hashes == []
+    assert capsys.readouterr().out.count("ADMIN_PASSWORD_HASH is below the password policy") == 1
+
+
+def test_argon2id_round_trip():
+    pytest.importorskip("argon2")
+    policy = PasswordPolicy(scheme=ARGON2ID, argon2_time_cost=1, argon2_memory_kib=8192)
+    hashed = policy.hash("S3cret!pass")
+    assert identify(hashed) == ARGON2ID and policy.verify("S3cret!pass", hashed)
+    assert not policy.needs_rehash(hashed)
+    assert PasswordPolicy(scheme=ARGON2ID, argon2_time_cost=2, argon2_memory_kib=8192).needs_rehash(hashed)
+    assert policy.needs_rehash(bcrypt.hashpw(b"S3cret!pass", bcrypt.gensalt(rounds=4)).decode())
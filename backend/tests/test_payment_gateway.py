@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import hmac
+import pytest
+import time
+from types import SimpleNamespace
+import httpx
+from app.services import payment_gateway
+from app.services.payment_gateway import (
+    RazorpayGateway, CircuitBreaker, GatewayBadRequest, GatewayUnavailable
+)
+from tests import stub_gateway
+
+
+def make_gateway(**kwargs):
+    return RazorpayGateway(
+        "rzp_test_key", "secret",
+        base_url="http://stub/v1",
+        backoff_base=0,
+        transport=httpx.ASGITransport(app=stub_gateway.app),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order():
+    stub_gateway.reset()
+    gateway = make_gateway()
+    order = await gateway.create_order({"amount": 50000, "currency": "INR", "receipt": "membership_u1"})
+    assert order["id"].startswith("order_")
+    assert order["amount"] == 50000
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors():
+    stub_gateway.reset()
+    gateway = make_gateway(max_retries=2)
+    created = await gateway.create_order({"amount": 50000})
+    stub_gateway.app.state.fail_next = [503, 502]
+    order = await gateway.fetch_order(created["id"])
+    assert order["status"] == "created"
+    assert stub_gateway.app.state.calls == 4
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_order_creation_is_only_retried_when_connect_fails():
+    stub_gateway.reset(fail_next=[503])
+    gateway = make_gateway(max_retries=2)
+    with pytest.raises(GatewayUnavailable):
+        await gateway.create_order({"amount": 50000})
+    assert stub_gateway.app.state.calls == 1
+    await gateway.close()
+
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        if len(attempts) == 2:
+            raise httpx.ReadTimeout("read timed out", request=request)
+        return httpx.Response(200, json={"id": "order_1"})
+
+    gateway = RazorpayGateway("rzp_test_key", "secret", base_url="http://stub/v1", backoff_base=0,
+                              max_retries=3, transport=httpx.MockTransport(handler))
+    with pytest.raises(GatewayUnavailable, match="ReadTimeout"):
+        await gateway.create_order({"amount": 50000})
+    assert len(attempts) == 2
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_bad_request_is_not_retried():
+    stub_gateway.reset()
+    gateway = make_gateway(max_retries=2)
+    with pytest.raises(GatewayBadRequest):
+        await gateway.create_order({"amount": 1})
+    assert stub_gateway.app.state.calls == 1
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_failures():
+    stub_gateway.reset(fail_next=[500] * 10)
+    gateway = make_gateway(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(GatewayUnavailable):
+            await gateway.create_order({"amount": 50000})
+    with pytest.raises(GatewayUnavailable, match="circuit open"):
+        await gateway.create_order({"amount": 50000})
+    assert stub_gateway.app.state.calls == 2
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_leave_circuit_half_open(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(payment_gateway, "time", SimpleNamespace(monotonic=lambda: clock[0], perf_counter=time.perf_counter))
+    stub_gateway.reset(latency=10)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    gateway = make_gateway(max_retries=0, breaker=breaker)
+
+    clock[0] = 30
+    probe = asyncio.create_task(gateway.create_order({"amount": 50000}))
+    await asyncio.sleep(0.01)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.state == CircuitBreaker.OPEN and breaker.failures == 1
+
+    # The cancel was not a gateway failure: the next request probes at once and closes the circuit
+    stub_gateway.reset()
+    assert (await gateway.create_order({"amount": 50000}))["status"] == "created"
+    assert breaker.state == CircuitBreaker.CLOSED
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_client_disconnects_do_not_open_circuit():
+    stub_gateway.reset(latency=10)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    gateway = make_gateway(max_retries=0, breaker=breaker)
+
+    for _ in range(3):
+        checkout = asyncio.create_task(gateway.create_order({"amount": 50000}))
+        await asyncio.sleep(0.01)
+        checkout.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await checkout
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    await gateway.close()
+
+
+def test_half_open_probe_that_never_reports_times_out(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(payment_gateway, "time", SimpleNamespace(monotonic=lambda: clock[0], perf_counter=time.perf_counter))
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] = 30
+    assert breaker.allow_request() and breaker.state == CircuitBreaker.HALF_OPEN
+    clock[0] = 59
+    assert not breaker.allow_request()
+    clock[0] = 60
+    assert breaker.allow_request()
+
+
+def test_verify_payment_signature():
+    gateway = RazorpayGateway("rzp_test_key", "secret")
+    signature = hmac.new(b"secret", b"order_1|pay_1", hashlib.sha256).hexdigest()
+    assert gateway.verify_payment_signature("order_1", "pay_1", signature)
+    assert not gateway.verify_payment_signature("order_1", "pay_2", signature)
@@ -1,6 +1,7 @@
 import pytest
 from httpx import AsyncClient
 from app.main import app
+from tests.conftest import FakeDB
 
 
 @pytest.mark.asyncio
@@ -16,3 +17,67 @@ async def test_verify_payment():
 @pytest.mark.asyncio
 async def test_webhook_handling():
     pass
+
+
+@pytest.mark.asyncio
+async def test_duplicate_create_order_requests_share_one_order():
+    import asyncio
+    from app.services.order_idempotency import IdempotentOrders, resolve_idempotency_key
+
+    orders = IdempotentOrders("payments")
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"order_id": f"order_{len(calls)}", "amount": 50000}
+
+    key = resolve_idempotency_key("user_1", "membership", 50000)
+    results = await asyncio.gather(*(orders.get_or_create(key, create) for _ in range(5)))
+    again, reused = await orders.get_or_create(key, create)
+
+    assert len(calls) == 1
+    assert {doc["order_id"] for doc, _ in results} == {"order_1"}
+    assert reused and again["order_id"] == "order_1"
+    assert resolve_idempotency_key("user_2", "membership", 50000) != key
+
+
+@pytest.mark.asyncio
+async def test_cached_order_paid_elsewhere_is_not_reused(monkeypatch):
+    from app.services import order_idempotency
+    from app.services.order_idempotency import IdempotentOrders, resolve_idempotency_key
+
+    db = FakeDB()
+    payments = db.payments
+    monkeypatch.setattr(order_idempotency, "get_database", lambda: db)
+    orders = IdempotentOrders("payments")
+    key = resolve_idempotency_key("user_1", "donation", 50000)
+
+    async def create():
+        doc = {"order_id": f"order_{len(payments.docs) + 1}", "amount": 50000, "status": "created", "idempotency_key": key}
+        await payments.insert_one(doc)
+        return doc
+
+    first, _ = await orders.get_or_create(key, create, 50000)
+    assert (await orders.get_or_create(key, create, 50000))[0]["order_id"] == "order_1"
+
+    # Captured by the webhook (or /verify on another worker): this worker's cache must not hand it out
+    payments.get(order_id=first["order_id"])["status"] = "captured"
+    second, reused = await orders.get_or_create(key, create, 50000)
+    assert not reused and second["order_id"] == "order_2"
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_reused_for_another_amount_is_rejected():
+    from app.services.order_idempotency import IdempotentOrders, IdempotencyKeyReused, resolve_idempotency_key
+
+    orders = IdempotentOrders("payments")
+    key = resolve_idempotency_key("user_1", "donation", 50000, header_key="checkout-1")
+    assert key == resolve_idempotency_key("user_1", "donation", 90000, header_key="checkout-1")
+
+    async def create():
+        return {"order_id": "order_1", "amount": 50000}
+
+    await orders.get_or_create(key, create, 50000)
+    with pytest.raises(IdempotencyKeyReused):
+        await orders.get_or_create(key, create, 90000)
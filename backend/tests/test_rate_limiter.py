@@ -0,0 +1,105 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.rate_limiter import MemoryStorage, RedisStorage, RateLimitMiddleware, parse_rate
+
+
+def make_app(storage, trusted_proxies="", peer=None):
+    app = FastAPI()
+
+    @app.post("/api/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @app.post("/api/events")
+    async def create_event():
+        return {"ok": True}
+
+    @app.get("/api/events")
+    async def list_events():
+        return {"ok": True}
+
+    @app.post("/api/webhooks/razorpay")
+    async def webhook():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        storage=storage,
+        route_policies={("POST", "/api/auth/login"): parse_rate("login", "3/minute")},
+        trusted_proxies=trusted_proxies
+    )
+    if peer is None:
+        return TestClient(app)
+
+    async def from_peer(scope, receive, send):
+        scope["client"] = (peer, 50000)
+        await app(scope, receive, send)
+    return TestClient(from_peer)
+
+
+def test_parse_rate():
+    policy = parse_rate("login", "5/minute")
+    assert (policy.limit, policy.period, policy.emission_interval) == (5, 60, 12)
+    assert parse_rate("x", "100/hours").period == 3600
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_burst_then_spaces_requests():
+    storage = MemoryStorage()
+    policy = parse_rate("login", "3/minute")
+    results = [await storage.hit("k", policy) for _ in range(4)]
+    assert [r[0] for r in results] == [True, True, True, False]
+    assert [r[1] for r in results[:3]] == [2, 1, 0]
+    # Next slot opens one emission interval (20s) after the burst started
+    assert 19 < results[3][2] <= 20
+
+
+def test_middleware_limits_per_route_and_passes_others():
+    client = make_app(MemoryStorage())
+    codes = [client.post("/api/auth/login").status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+
+    limited = client.post("/api/auth/login")
+    assert limited.json()["detail"].startswith("Too many requests")
+    assert int(limited.headers["retry-after"]) >= 1
+
+    assert all(client.get("/api/events").status_code == 200 for _ in range(10))
+    # Only listed routes are limited: other writes share no per-IP bucket
+    assert all(client.post("/api/events").status_code == 200 for _ in range(10))
+    assert all(client.post("/api/webhooks/razorpay").status_code == 200 for _ in range(10))
+
+
+def test_forwarded_clients_behind_trusted_proxy_get_separate_buckets():
+    client = make_app(MemoryStorage(), trusted_proxies="10.0.0.0/8", peer="10.0.0.7")
+    first = {"X-Forwarded-For": "203.0.113.5"}
+    # A client-supplied entry on the left is not trusted; the proxy appended the real address
+    second = {"X-Forwarded-For": "203.0.113.5, 198.51.100.9"}
+    assert [client.post("/api/auth/login", headers=first).status_code for _ in range(4)] == [200, 200, 200, 429]
+    assert [client.post("/api/auth/login", headers=second).status_code for _ in range(3)] == [200, 200, 200]
+
+
+def test_forwarded_header_from_untrusted_peer_is_ignored():
+    client = make_app(MemoryStorage(), trusted_proxies="10.0.0.0/8", peer="198.51.100.20")
+    codes = [client.post("/api/auth/login", headers={"X-Forwarded-For": f"203.0.113.{i}"}).status_code for i in range(4)]
+    assert codes == [200, 200, 200, 429]
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_stays_bounded():
+    storage = MemoryStorage(max_keys=10)
+    policy = parse_rate("login", "3/minute")
+    for i in range(50):
+        await storage.hit(f"ip{i}", policy)
+    assert len(storage._tat) <= 10
+
+
+@pytest.mark.asyncio
+async def test_redis_storage_shares_state_between_instances():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    workers = [RedisStorage(client=fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)]
+    policy = parse_rate("login", "3/minute")
+    results = [await workers[i % 2].hit("login:1.2.3.4", policy) for i in range(4)]
+    assert [r[0] for r in results] == [True, True, True, False]
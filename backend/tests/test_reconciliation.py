@@ -0,0 +1,76 @@
+import io
+import pytest
+from app.services.reconciliation import (
+    Txn, SortedSettlement, parse_settlement_csv, merge_join, merge_sorted, coalesce_by_order,
+    MATCHED, MISSING_IN_DB, MISSING_IN_GATEWAY, AMOUNT_MISMATCH, STATUS_MISMATCH, DUPLICATE_IN_GATEWAY
+)
+
+
+async def aiter_of(rows):
+    for row in rows:
+        yield row
+
+
+async def collect(gateway, local):
+    return [(outcome, (g or l).order_id) async for outcome, g, l in merge_join(iter(gateway), aiter_of(local))]
+
+
+def test_parse_settlement_csv_skips_non_payments():
+    csv_text = (
+        "entity_id,type,amount,order_id\n"
+        "pay_1,payment,500.00,order_b\n"
+        "rfnd_1,refund,500.00,order_b\n"
+        "pay_2,payment,\"1,250.50\",order_a\n"
+    )
+    rows = list(parse_settlement_csv(io.StringIO(csv_text)))
+    assert [(r.order_id, r.amount, r.payment_id) for r in rows] == [("order_b", 50000, "pay_1"), ("order_a", 125050, "pay_2")]
+
+
+def test_parse_settlement_csv_requires_columns():
+    with pytest.raises(ValueError):
+        list(parse_settlement_csv(io.StringIO("id,total\n1,2\n")))
+
+
+def test_external_sort_spills_runs():
+    rows = [Txn(f"order_{i:04d}", i, "captured") for i in reversed(range(25))]
+    settlement = SortedSettlement.build(iter(rows), chunk_rows=4)
+    try:
+        assert [t.order_id for t in settlement] == sorted(t.order_id for t in rows)
+    finally:
+        settlement.close()
+
+
+@pytest.mark.asyncio
+async def test_merge_join_classifies_records():
+    gateway = [
+        Txn("o1", 500, "captured"),
+        Txn("o2", 500, "captured"),
+        Txn("o3", 700, "captured"),
+        Txn("o4", 500, "captured"),
+        Txn("o4", 500, "captured"),
+        Txn("o6", 500, "captured"),
+    ]
+    local = [
+        Txn("o1", 500, "captured"),
+        Txn("o3", 500, "captured"),
+        Txn("o4", 500, "created"),
+        Txn("o5", 500, "captured"),
+        Txn("o7", 500, "created"),
+    ]
+    assert await collect(gateway, local) == [
+        (MATCHED, "o1"),
+        (MISSING_IN_DB, "o2"),
+        (AMOUNT_MISMATCH, "o3"),
+        (STATUS_MISMATCH, "o4"),
+        (DUPLICATE_IN_GATEWAY, "o4"),
+        (MISSING_IN_GATEWAY, "o5"),
+        (MISSING_IN_DB, "o6"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_local_streams_merge_and_coalesce():
+    payments = [Txn("o1", 500, "captured", source="payments"), Txn("o3", 500, "created", source="payments")]
+    donations = [Txn("o1", 500, "created", source="donations"), Txn("o2", 900, "captured", source="donations")]
+    merged = [t async for t in coalesce_by_order(merge_sorted(aiter_of(payments), aiter_of(donations)))]
+    assert [(t.order_id, t.status) for t in merged] == [("o1", "captured"), ("o2", "captured"), ("o3", "created")]
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+import pytest
+from app import security_utils, audit
+from app.core.settings import settings
+from app.security_utils import issue_refresh_token, rotate_refresh_token, revoke_refresh_token, hash_refresh_token, RefreshTokenReused
+from tests.conftest import FakeCollection, FakeDB
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(security_utils, "get_database", lambda: fake)
+    # Reuse alerts go to the audit log; keep them off the (absent) database
+    monkeypatch.setattr(audit, "get_database", lambda: None)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_rotation_replaces_token_and_stores_only_hashes(db):
+    token = await issue_refresh_token("u1")
+    assert db.refresh_tokens.docs[0]["token_hash"] == hash_refresh_token(token)
+    assert token not in str(db.refresh_tokens.docs)
+
+    user_id, new_token = await rotate_refresh_token(token)
+    assert user_id == "u1" and new_token and new_token != token
+    assert len(db.refresh_tokens.docs) == 1
+    assert (await rotate_refresh_token(new_token))[0] == "u1"
+
+
+@pytest.mark.asyncio
+async def test_parallel_refresh_within_grace_is_not_reuse(db):
+    token = await issue_refresh_token("u1")
+    await rotate_refresh_token(token)
+    assert await rotate_refresh_token(token) == ("u1", None)
+    assert len(db.refresh_tokens.docs) == 1
+
+
+@pytest.mark.asyncio
+async def test_reuse_after_grace_revokes_the_session(db):
+    token = await issue_refresh_token("u1")
+    _, new_token = await rotate_refresh_token(token)
+    db.refresh_tokens.docs[0]["rotated_at"] -= timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS + 1)
+
+    with pytest.raises(RefreshTokenReused):
+        await rotate_refresh_token(token)
+    # The legitimate successor dies with the session
+    assert await rotate_refresh_token(new_token) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_capped_per_user(db):
+    tokens = [await issue_refresh_token("u1") for _ in range(settings.MAX_REFRESH_TOKENS_PER_USER + 2)]
+    assert len(db.refresh_tokens.docs) == settings.MAX_REFRESH_TOKENS_PER_USER
+    assert await rotate_refresh_token(tokens[0]) == (None, None)
+    assert (await rotate_refresh_token(tokens[-1]))[0] == "u1"
+
+
+@pytest.mark.asyncio
+async def test_logout_ends_session(db):
+    token = await issue_refresh_token("u1")
+    await revoke_refresh_token(token)
+    assert db.refresh_tokens.docs == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_a_bearer_token(db, monkeypatch):
+    from bson import ObjectId
+    from fastapi import Depends, FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from app import deps
+    from app.auth_claims import user_claims
+    from app.core.security import create_access_token
+    from app.deps import get_current_claims
+
+    user = {"_id": ObjectId(), "role": "alumni", "auth_version": 0}
+
+    # The user exists, so a refresh token would otherwise pass via the DB fallback
+    db.users = FakeCollection([user])
+    monkeypatch.setattr(deps, "get_database", lambda: db)
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(user: dict = Depends(get_current_claims)):
+        return {"id": user["_id"]}
+
+    refresh = await issue_refresh_token(str(user["_id"]))
+    access = create_access_token(data=user_claims(user))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        rejected = await client.get("/protected", headers={"Authorization": f"Bearer {refresh}"})
+        accepted = await client.get("/protected", headers={"Authorization": f"Bearer {access}"})
+    assert rejected.status_code == 401
+    assert accepted.status_code == 200 and accepted.json() == {"id": str(user["_id"])}
+
+
+@pytest.mark.asyncio
+async def test_password_change_ends_every_other_session(db, monkeypatch):
+    import bcrypt
+    from bson import ObjectId
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from app import crud, deps, token_revocation
+    from app.auth_claims import user_claims
+    from app.core.password_policy import password_policy
+    from app.core.security import create_access_token, verify_password
+    from app.routes import auth
+    from app.token_revocation import RevocationFilter
+
+    user = {"_id": ObjectId(), "name": "Asha", "email": "asha@example.com", "role": "alumni", "auth_version": 0,
+            "password_hash": bcrypt.hashpw(b"Old#Pass1", bcrypt.gensalt(rounds=4)).decode()}
+    db.users = FakeCollection([user])
+    revocations = RevocationFilter()
+    for module in (deps, crud, token_revocation):
+        monkeypatch.setattr(module, "get_database", lambda: db)
+    for module in (deps, auth):
+        monkeypatch.setattr(module, "token_revocations", revocations)
+    monkeypatch.setattr(password_policy, "bcrypt_rounds", 4)
+
+    stolen = await issue_refresh_token(str(user["_id"]))
+    own = await issue_refresh_token(str(user["_id"]))
+    access = create_access_token(data=user_claims(user))
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        headers = {"Authorization": f"Bearer {access}"}
+        changed = await client.post("/api/auth/change-password", headers=headers,
+                                    json={"old_password": "Old#Pass1", "new_password": "New#Pass2"})
+        assert changed.status_code == 200
+        assert settings.REFRESH_COOKIE_NAME in changed.cookies
+
+        # The old access token is revoked; the one handed back works
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+        fresh = {"Authorization": f"Bearer {changed.json()['access_token']}"}
+        assert (await client.get("/api/auth/me", headers=fresh)).status_code == 200
+
+    assert await rotate_refresh_token(stolen) == (None, None)
+    assert await rotate_refresh_token(own) == (None, None)
+    assert len(db.refresh_tokens.docs) == 1
+    assert verify_password("New#Pass2", db.users.docs[0]["password_hash"])
+
+
+@pytest.mark.asyncio
+async def test_cleanup_job_uses_the_login_cap_and_expiry(db, monkeypatch):
+    from app import maintenance
+    from app.maintenance import JobContext, cleanup_tokens
+    from tests.conftest import FakeCursor
+
+    cap = settings.MAX_REFRESH_TOKENS_PER_USER
+    tokens = [await issue_refresh_token("u1") for _ in range(cap)]
+    now = datetime.utcnow()
+    # Sessions written before the cap was lowered, plus one that already expired
+    for i in range(2):
+        db.refresh_tokens.docs.append({"_id": f"old{i}", "user_id": "u1", "created_at": now - timedelta(days=1, minutes=i),
+                                       "expires_at": now + timedelta(days=1)})
+    db.refresh_tokens.docs.append({"_id": "expired", "user_id": "u2", "created_at": now, "expires_at": now - timedelta(seconds=1)})
+    db.refresh_tokens.aggregate = lambda pipeline: FakeCursor([{"_id": "u1", "count": cap + 2}])
+    monkeypatch.setattr(maintenance, "get_database", lambda: db)
+
+    assert await cleanup_tokens(JobContext(batch_size=100)) == 3
+    assert {t["_id"] for t in db.refresh_tokens.docs}.isdisjoint({"old0", "old1", "expired"})
+    assert [(await rotate_refresh_token(t))[0] for t in tokens] == ["u1"] * cap
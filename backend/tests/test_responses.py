@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from app.models import EventResponse
+from app.responses import ModelSerializer, json_response
+from app.routes.events import event_fields
+
+EVENT = {
+    "_id": ObjectId(),
+    "title": "Reunion",
+    "description": "Annual meet",
+    "event_date": datetime(2025, 3, 1, 18, 30),
+    "location": "Auditorium",
+    "is_paid": True,
+    "fee_amount": 500,
+    "created_by": ObjectId(),
+    "approved": True,
+    "attendees": [{}, {}],
+    "created_at": datetime(2025, 1, 2, 3, 4, 5, 678000)
+}
+
+
+def test_json_response_encodes_objectid_and_datetime():
+    oid = ObjectId()
+    body = json.loads(json_response({"id": oid, "at": datetime(2025, 1, 2, 3, 4, 5)}).body)
+    assert body == {"id": str(oid), "at": "2025-01-02T03:04:05"}
+
+
+def test_serializer_matches_validated_output():
+    serializer = ModelSerializer(EventResponse)
+    expected = jsonable_encoder([EventResponse(**event_fields(EVENT))])
+    assert json.loads(serializer.dump([event_fields(EVENT)])) == expected
+    assert json.loads(serializer.dump([EventResponse(**event_fields(EVENT))])) == expected
+    assert expected[0]["attendees_count"] == 2 and expected[0]["department"] == "All"
+
+
+def test_untrusted_rows_are_validated():
+    serializer = ModelSerializer(EventResponse)
+    with pytest.raises(ValidationError):
+        serializer.dump([{"id": "x", "title": "missing fields"}], trusted=False)
@@ -0,0 +1,58 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app import retention
+from app.core.settings import settings
+from tests.conftest import FakeDB
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ARCHIVE_BACKEND", "file")
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_archive_partitions_by_day_and_reads_back(archive_dir):
+    policy = retention.POLICIES["audit_logs"]
+    docs = [
+        {"_id": ObjectId(), "action": "login_attempt", "timestamp": datetime(2025, 1, 1, 23, 59)},
+        {"_id": ObjectId(), "action": "payment", "timestamp": datetime(2025, 1, 2, 0, 1)},
+        {"_id": ObjectId(), "action": "payment", "timestamp": datetime(2025, 1, 3, 12, 0)},
+    ]
+    written = await retention._archive_batch(None, policy, docs)
+    assert written > 0
+    assert (archive_dir / "audit_logs" / "2025" / "01" / "2025-01-02.ndjson.gz").exists()
+
+    # A second batch for the same day is appended, not overwritten
+    extra = {"_id": ObjectId(), "action": "payment", "timestamp": datetime(2025, 1, 2, 8, 0)}
+    await retention._archive_batch(None, policy, [extra])
+
+    found = await retention.query_archive("audit_logs", datetime(2025, 1, 1, 12), datetime(2025, 1, 3))
+    assert [d["_id"] for d in found] == [docs[0]["_id"], docs[1]["_id"], extra["_id"]]
+
+    payments = await retention.query_archive("audit_logs", datetime(2025, 1, 1), datetime(2025, 1, 4), query={"action": "payment"}, limit=2)
+    assert [d["_id"] for d in payments] == [docs[1]["_id"], extra["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_retention_indexes_cover_ttl_live_and_archive_collections(monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_BACKEND", "collection")
+    db = FakeDB()
+    await retention.ensure_retention_indexes(db)
+
+    assert "login_attempts" not in retention.POLICIES
+    assert ("created_at", {"expireAfterSeconds": settings.NOTIFICATION_TTL_DAYS * 86400}) in db.notifications.indexes
+    for name, policy in retention.POLICIES.items():
+        if policy.mode == retention.ARCHIVE:
+            assert (policy.time_field, {}) in db[name].indexes
+            assert (policy.time_field, {}) in db[f"{name}_archive"].indexes
+
+
+def test_file_backend_requires_explicit_archive_dir(monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_BACKEND", "file")
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", "")
+    assert retention.archive_backend() == "collection"
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", "/var/data/archive")
+    assert retention.archive_backend() == "file"
@@ -0,0 +1,122 @@
+import pytest
+from datetime import datetime, timedelta
+from apscheduler.triggers.cron import CronTrigger
+from app.leader_election import LeaderLease
+from app.maintenance import JobContext, update_in_batches
+from app import leader_election, scheduler
+from tests.conftest import FakeCollection, FakeDB
+
+
+class SweptCollection(FakeCollection):
+    """Docs with a 'done' flag; counts the batched updates"""
+
+    def __init__(self, n):
+        super().__init__({"_id": i, "done": False} for i in range(n))
+        self.batches = 0
+
+    async def update_many(self, query, update, upsert=False):
+        self.batches += 1
+        return await super().update_many(query, update, upsert)
+
+
+@pytest.mark.asyncio
+async def test_update_in_batches_walks_every_document():
+    collection = SweptCollection(25)
+    ctx = JobContext(batch_size=10)
+    assert await update_in_batches(collection, {"done": False}, {"$set": {"done": True}}, ctx) == 25
+    assert collection.batches == 3
+    assert ctx.rows == 25 and not ctx.budget_exhausted
+
+
+@pytest.mark.asyncio
+async def test_update_in_batches_stops_at_time_budget():
+    collection = SweptCollection(25)
+    ctx = JobContext(batch_size=10, time_budget_seconds=-1)
+    assert await update_in_batches(collection, {"done": False}, {"$set": {"done": True}}, ctx) == 0
+    assert ctx.budget_exhausted
+
+
+@pytest.mark.asyncio
+async def test_run_job_reports_rows_and_errors():
+    async def touch_rows(ctx):
+        ctx.rows += 7
+
+    async def broken(ctx):
+        raise RuntimeError("boom")
+
+    scheduler.register_job("test_rows", "Test rows", CronTrigger(hour=0), touch_rows, batch_size=5)
+    scheduler.register_job("test_broken", "Test broken", CronTrigger(hour=0), broken)
+    try:
+        run = await scheduler.run_job("test_rows", force=True)
+        assert run["status"] == "success" and run["rows"] == 7 and run["manual"]
+
+        run = await scheduler.run_job("test_broken", force=True)
+        assert run["status"] == "error" and run["error"] == "boom"
+    finally:
+        scheduler.JOBS.pop("test_rows", None)
+        scheduler.JOBS.pop("test_broken", None)
+
+
+def expire(db, name):
+    db.leader_leases.get(_id=name)["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+
+
+@pytest.fixture
+def lease_db(monkeypatch):
+    db = FakeDB()
+    for module in (leader_election, scheduler):
+        monkeypatch.setattr(module, "get_database", lambda: db)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_lease_acquire_renew_and_takeover_after_expiry(lease_db):
+    a = LeaderLease("scheduler", ttl_seconds=30, instance_id="worker-a")
+    b = LeaderLease("scheduler", ttl_seconds=30, instance_id="worker-b")
+
+    assert await a.try_acquire() and a.is_leader and a.fencing_token == 1
+    assert not await b.try_acquire() and not b.is_leader and b.fencing_token is None
+
+    # Renewing extends the lease without a new token
+    first_expiry = lease_db.leader_leases.get(_id="scheduler")["expires_at"]
+    assert await a.try_acquire() and a.fencing_token == 1
+    assert lease_db.leader_leases.get(_id="scheduler")["expires_at"] >= first_expiry
+
+    # a stalls past the TTL: b takes over with a higher token and a steps down at its next heartbeat
+    expire(lease_db, "scheduler")
+    assert await b.try_acquire() and b.fencing_token == 2
+    assert lease_db.leader_leases.get(_id="scheduler")["holder"] == "worker-b"
+    assert not await a.try_acquire() and not a.is_leader and a.fencing_token is None
+
+    # Releasing hands the lease over at once
+    await b.release()
+    assert not b.is_leader
+    assert await a.try_acquire() and a.fencing_token == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduled_run_needs_the_lease(lease_db, monkeypatch):
+    contexts = []
+
+    async def job(ctx):
+        contexts.append(ctx)
+
+    holder = LeaderLease("scheduler", ttl_seconds=30, instance_id="worker-a")
+    assert await holder.try_acquire()
+    monkeypatch.setattr(scheduler, "scheduler_lease", LeaderLease("scheduler", ttl_seconds=30, instance_id="worker-b"))
+    scheduler.register_job("test_leased", "Test leased", CronTrigger(hour=0), job)
+    try:
+        assert await scheduler.run_job("test_leased") is None
+        assert contexts == [] and lease_db.job_runs.docs == []
+
+        # Manual runs skip the lease check and carry no token
+        run = await scheduler.run_job("test_leased", force=True)
+        assert run["manual"] and run["fencing_token"] is None
+
+        expire(lease_db, "scheduler")
+        run = await scheduler.run_job("test_leased")
+        assert run["status"] == "success" and run["instance"] == "worker-b"
+        assert contexts[-1].fencing_token == run["fencing_token"] == 2
+        assert len(lease_db.job_runs.docs) == 2
+    finally:
+        scheduler.JOBS.pop("test_leased", None)
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.single_flight import SingleFlight, auth_scope
+
+
+class SlowRead:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_call():
+    flights = SingleFlight()
+    read = SlowRead(result=[{"title": "Meetup"}])
+    results = await asyncio.gather(*(flights.do("GET /events", read) for _ in range(20)))
+    assert read.calls == 1
+    assert all(r is results[0] for r in results)
+    assert flights.in_flight() == 0
+
+    # Nothing is kept once the read completes
+    await flights.do("GET /events", read)
+    assert read.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_scope_and_params_separate_flights():
+    flights = SingleFlight()
+    read = SlowRead(result=1)
+    await asyncio.gather(
+        flights.do("GET /jobs", read, scope=auth_scope({"role": "alumni"})),
+        flights.do("GET /jobs", read, scope=auth_scope({"role": "admin"})),
+        flights.do("GET /jobs", read, params={"page": 2}, scope=auth_scope({"role": "alumni"})),
+        flights.do("GET /jobs", read, scope=auth_scope({"role": "alumni"})),
+    )
+    assert read.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancelled_waiter_does_not_cancel_read():
+    flights = SingleFlight()
+    failing = SlowRead(error=RuntimeError("db down"))
+    results = await asyncio.gather(*(flights.do("GET /alumni/stats", failing) for _ in range(5)), return_exceptions=True)
+    assert failing.calls == 1 and all(isinstance(r, RuntimeError) for r in results)
+
+    read = SlowRead(result={"total_alumni": 3})
+    leader = asyncio.create_task(flights.do("GET /alumni/stats", read))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("GET /alumni/stats", read))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == {"total_alumni": 3}
+    assert read.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_write_during_read_starts_a_new_flight(monkeypatch):
+    from app.change_counters import change_counters
+    from app.routes import events
+
+    titles = ["Meetup"]
+    reads = []
+
+    async def approved_event_list():
+        snapshot = list(titles)
+        reads.append(snapshot)
+        await asyncio.sleep(0.02)
+        return ",".join(snapshot).encode()
+
+    monkeypatch.setattr(events, "approved_event_list", approved_event_list)
+    monkeypatch.setattr(events, "single_flight", SingleFlight())
+    monkeypatch.setattr(change_counters, "versions", {"events": 1})
+
+    before = asyncio.create_task(events.list_events(cache={}))
+    while not reads:
+        await asyncio.sleep(0)
+    # A write lands while the first read is still in flight
+    titles.append("Reunion")
+    change_counters.versions["events"] = 2
+    after = await events.list_events(cache={})
+
+    assert (await before).body == b"Meetup"
+    assert after.body == b"Meetup,Reunion"
+    assert len(reads) == 2
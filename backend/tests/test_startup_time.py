@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from app.core.settings import settings
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fresh interpreter: the test process has already imported most of the app
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "routes": len(app.main.app.routes),
+                  "loaded": [m for m in ("pandas", "httpx", "qrcode") if m in sys.modules]}))
+"""
+
+
+def probe_startup() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_constructs_within_startup_budget():
+    startup = probe_startup()
+    assert startup["routes"] > 100
+    assert startup["seconds"] < settings.STARTUP_BUDGET_SECONDS, (
+        f"app construction took {startup['seconds']:.2f}s (budget {settings.STARTUP_BUDGET_SECONDS}s); "
+        "run `python -m app.startup_profile` to find the slow imports"
+    )
+    # Heavy optional dependencies load on first use, not at startup
+    assert startup["loaded"] == []
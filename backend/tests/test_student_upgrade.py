@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app import crud
+from app.crud import UPGRADE_JOB_ID, upgrade_students_to_alumni
+from tests.conftest import FakeCollection, FakeDB
+
+
+class FlakyCollection(FakeCollection):
+    """Raises on the n-th insert_many, as if the worker died there"""
+
+    def __init__(self, fail_on_insert=None):
+        super().__init__()
+        self.fail_on_insert = fail_on_insert
+
+    async def insert_many(self, docs, ordered=True):
+        if self.fail_on_insert is not None:
+            self.fail_on_insert -= 1
+            if self.fail_on_insert == 0:
+                raise ConnectionError("worker killed")
+        await super().insert_many(docs, ordered)
+
+
+class FakeAuthVersions:
+    async def record_change(self, user_ids):
+        pass
+
+
+def students(n):
+    year = datetime.now().year - 1
+    return FakeCollection([
+        {"_id": ObjectId(), "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student",
+         "passout_year": year, "upgraded_to_alumni_at": None} for i in range(n)
+    ])
+
+
+def checkpoint(db):
+    return db.job_checkpoints.docs[0]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB(users=students(7), notifications=FlakyCollection())
+    monkeypatch.setattr(crud, "get_database", lambda: db)
+    monkeypatch.setattr(crud, "auth_versions", FakeAuthVersions())
+    monkeypatch.setattr(crud, "send_bulk_email_in_background", lambda messages: None)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_without_duplicate_logs(db):
+    # Second batch: users upgraded and logged, then the worker dies before notifications
+    db.notifications.fail_on_insert = 2
+    with pytest.raises(ConnectionError):
+        await upgrade_students_to_alumni(batch_size=3)
+
+    interrupted = checkpoint(db)
+    assert interrupted["status"] == "running" and len(interrupted["pending_ids"]) == 3
+    assert interrupted["upgraded"] == 3 and len(db.upgrade_logs.docs) == 6
+
+    assert await upgrade_students_to_alumni(batch_size=3) == 7
+    user_ids = [log["user_id"] for log in db.upgrade_logs.docs]
+    assert len(user_ids) == len(set(user_ids)) == 7
+    assert {log["run_id"] for log in db.upgrade_logs.docs} == {interrupted["run_id"]}
+    assert len(db.notifications.docs) == 7
+    assert all(u["role"] == "alumni" for u in db.users.docs)
+    assert checkpoint(db)["status"] == "completed"
+
+    # A fresh run finds nothing left to do
+    assert await upgrade_students_to_alumni(batch_size=3) == 0
+    assert len(db.upgrade_logs.docs) == 7
+
+
+@pytest.mark.asyncio
+async def test_stale_fencing_token_stops_the_run(db):
+    original = db.users.update_many
+    batches = []
+
+    async def newer_leader_takes_over(query, update):
+        batches.append(query)
+        if len(batches) == 1:
+            # Another worker acquires the lease (token 2) and writes the checkpoint mid-batch
+            checkpoint(db)["fencing_token"] = 2
+        return await original(query, update)
+
+    db.users.update_many = newer_leader_takes_over
+    with pytest.raises(RuntimeError, match="fenced off"):
+        await upgrade_students_to_alumni(batch_size=3, fencing_token=1)
+
+    assert len(batches) == 1
+    assert sum(u["role"] == "alumni" for u in db.users.docs) == 3
+    assert checkpoint(db)["fencing_token"] == 2 and checkpoint(db)["last_id"] is None
+
+    # The old leader cannot start over either
+    with pytest.raises(RuntimeError, match="fenced off"):
+        await upgrade_students_to_alumni(batch_size=3, fencing_token=1)
+    assert len(batches) == 1
+
+    assert await upgrade_students_to_alumni(batch_size=3, fencing_token=2) == 7
+    assert checkpoint(db)["_id"] == UPGRADE_JOB_ID and checkpoint(db)["status"] == "completed"
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app import token_revocation
+from app.core.security import create_access_token, decode_token
+from app.deps import get_current_admin
+from app.token_revocation import RevocationFilter
+from tests.conftest import FakeDB
+
+
+def test_tokens_carry_unique_jti():
+    first = decode_token(create_access_token({"sub": "u1"}))
+    second = decode_token(create_access_token({"sub": "u1"}))
+    assert first["jti"] and first["jti"] != second["jti"]
+
+
+@pytest.mark.asyncio
+async def test_revocation_reaches_other_workers_on_sync(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(token_revocation, "get_database", lambda: db)
+    worker_a, worker_b = RevocationFilter(), RevocationFilter()
+    await worker_b.sync()
+
+    await worker_a.revoke("jti-1", datetime.utcnow() + timedelta(minutes=15), user_id="u1")
+    assert worker_a.is_revoked("jti-1") and not worker_b.is_revoked("jti-1")
+
+    await worker_b.sync()
+    assert worker_b.is_revoked("jti-1")
+
+
+@pytest.mark.asyncio
+async def test_expired_revocations_are_pruned(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(token_revocation, "get_database", lambda: db)
+    revocations = RevocationFilter()
+    await revocations.revoke("old", datetime.utcnow() - timedelta(seconds=1))
+    await revocations.sync()
+    assert len(revocations) == 0
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected_without_db(monkeypatch):
+    token = create_access_token({"sub": "admin", "role": "admin"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    assert (await get_current_admin(credentials))["sub"] == "admin"
+
+    monkeypatch.setitem(token_revocation.token_revocations._revoked, decode_token(token)["jti"], datetime.utcnow() + timedelta(minutes=15))
+    with pytest.raises(HTTPException) as exc:
+        await get_current_admin(credentials)
+    assert exc.value.status_code == 401
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from httpx import ASGITransport, AsyncClient
+from app import change_counters, content_cache, crud, warmup
+from app.change_counters import ChangeCounters
+from app.content_cache import ContentCache
+from app.crud import StudentMasterLookup
+from app.warmup import WarmupState, run_warmup
+from tests.conftest import FakeCollection, FakeDB
+
+
+class WarmupDB(FakeDB):
+    def __init__(self, fail_ping=False):
+        super().__init__(
+            content=FakeCollection([{"type": "homepage", "title": "Alumni"}]),
+            donation_stats=FakeCollection([{"_id": "main", "total_donated": 100}]),
+            events=FakeCollection([{"title": "Meetup", "approved": True}]),
+            student_master=FakeCollection([
+                {"registration_number": "R1", "department": "CSE", "passout_year": 2024, "name": "Asha", "status": "active"}
+            ]),
+        )
+        self.fail_ping = fail_ping
+        self.pings = 0
+
+    async def command(self, name):
+        if self.fail_ping:
+            raise ConnectionError("no servers")
+        self.pings += 1
+        return {"ok": 1}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    def install(db):
+        for module in (warmup, crud, content_cache):
+            monkeypatch.setattr(module, "get_database", lambda: db)
+        monkeypatch.setattr(crud, "student_master_lookup", StudentMasterLookup())
+        monkeypatch.setattr(crud, "change_counters", ChangeCounters())
+        monkeypatch.setattr(content_cache, "content_cache", ContentCache())
+        return db
+    return install
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_pool_and_preloads(fake_db):
+    db = fake_db(WarmupDB())
+    state = WarmupState()
+    assert await run_warmup(state)
+    assert state.ready and state.status == "ready"
+    assert db.pings == warmup.settings.MONGO_MIN_POOL_SIZE
+    assert all(step["ok"] for step in state.steps.values())
+    assert len(crud.student_master_lookup) == 1
+    assert state.steps["content"]["detail"] == "2 content documents"
+
+
+@pytest.mark.asyncio
+async def test_warmup_retries_until_database_is_reachable(fake_db, monkeypatch):
+    monkeypatch.setattr(warmup.settings, "WARMUP_RETRY_BASE_SECONDS", 0.001)
+    db = WarmupDB(fail_ping=True)
+    fake_db(None)
+    connected = []
+
+    async def connect_to_mongo():
+        # Startup failed to connect; the first retry gets a client but the server still refuses pings
+        connected.append(True)
+        monkeypatch.setattr(warmup, "get_database", lambda: db)
+
+    monkeypatch.setattr(warmup, "connect_to_mongo", connect_to_mongo)
+    state = WarmupState()
+    task = asyncio.create_task(run_warmup(state))
+    while state.steps.get("connections", {}).get("attempts", 0) < 3:
+        await asyncio.sleep(0.001)
+    assert not state.ready and state.status == "retrying"
+    assert connected == [True] and "content" not in state.steps
+
+    fake_db(db)
+    db.fail_ping = False
+    assert await asyncio.wait_for(task, timeout=1)
+    assert state.ready and state.status == "ready"
+
+
+@pytest.mark.asyncio
+async def test_student_master_hits_are_served_from_memory(fake_db):
+    db = fake_db(WarmupDB())
+    await crud.student_master_lookup.load()
+    reads = db.student_master.reads
+
+    assert (await crud.get_student_master_record("R1", "CSE", 2024))["name"] == "Asha"
+    assert db.student_master.reads == reads
+    # Misses still reach the database (records uploaded by another worker)
+    assert await crud.get_student_master_record("R2", "CSE", 2024) is None
+    assert db.student_master.reads == reads + 1
+
+
+@pytest.mark.asyncio
+async def test_student_master_removed_on_another_worker_stops_matching(fake_db, monkeypatch):
+    db = fake_db(WarmupDB())
+    monkeypatch.setattr(change_counters, "get_database", lambda: db)
+    await crud.student_master_lookup.load()
+    assert (await crud.get_student_master_record("R1", "CSE", 2024))["name"] == "Asha"
+
+    # An admin replaces the list on another worker; this worker learns of it at its next counter sync
+    db.student_master.docs.clear()
+    await ChangeCounters().bump("student_master")
+    await crud.change_counters.sync()
+    assert await crud.get_student_master_record("R1", "CSE", 2024) is None
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_tracks_warmup(monkeypatch):
+    from app.main import app
+    state = WarmupState()
+    monkeypatch.setattr("app.main.warmup_state", state)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/health")).status_code == 200
+        response = await client.get("/api/ready")
+        assert response.status_code == 503 and response.json()["status"] == "pending"
+        state.ready, state.status = True, "ready"
+        assert (await client.get("/api/ready")).status_code == 200
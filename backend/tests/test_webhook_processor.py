@@ -0,0 +1,107 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.settings import settings
+from app.services import webhook_processor
+from app.services.webhook_processor import (
+    WebhookConsumer, ingest_webhook, requeue_webhook,
+    STATUS_PENDING, STATUS_PROCESSED, STATUS_RETRYING, STATUS_DEAD_LETTER
+)
+from tests.conftest import FakeCollection, FakeDB
+
+
+def captured(order_id, payment_id):
+    return {"event": "payment.captured", "payload": {"payment": {"entity": {"id": payment_id, "order_id": order_id}}}}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB(webhook_logs=FakeCollection(unique=("event_id",)))
+    db.applied = []
+
+    async def apply(payload):
+        db.applied.append(payload["payload"]["payment"]["entity"]["id"])
+
+    monkeypatch.setattr(webhook_processor, "get_database", lambda: db)
+    monkeypatch.setattr(webhook_processor, "apply_webhook_event", apply)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_duplicate_event_id_is_acked_once(db):
+    assert await ingest_webhook("evt_1", captured("order_1", "pay_1"))
+    assert not await ingest_webhook("evt_1", captured("order_1", "pay_1"))
+    assert len(db.webhook_logs.docs) == 1
+
+    consumer = WebhookConsumer()
+    assert await consumer.drain_once() == 1
+    assert await consumer.drain_once() == 0
+    assert db.applied == ["pay_1"]
+    assert db.webhook_logs.get(event_id="evt_1")["status"] == STATUS_PROCESSED
+
+
+@pytest.mark.asyncio
+async def test_events_for_one_order_apply_in_received_order(db):
+    now = datetime.utcnow()
+    # Stored out of order: the batch is sorted by received_at, not insertion
+    for event_id, payment_id, seconds in (("evt_c", "pay_c", 3), ("evt_a", "pay_a", 1), ("evt_b", "pay_b", 2)):
+        await ingest_webhook(event_id, captured("order_1", payment_id))
+        db.webhook_logs.get(event_id=event_id)["received_at"] = now - timedelta(seconds=10 - seconds)
+    await ingest_webhook("evt_other", captured("order_2", "pay_other"))
+
+    assert await WebhookConsumer().drain_once() == 4
+    assert [p for p in db.applied if p != "pay_other"] == ["pay_a", "pay_b", "pay_c"]
+
+
+@pytest.mark.asyncio
+async def test_earlier_event_backing_off_holds_later_events(db):
+    now = datetime.utcnow()
+    await ingest_webhook("evt_1", captured("order_1", "pay_1"))
+    await ingest_webhook("evt_2", captured("order_1", "pay_2"))
+    first = db.webhook_logs.get(event_id="evt_1")
+    first.update(status=STATUS_RETRYING, received_at=now - timedelta(seconds=5), next_attempt_at=now + timedelta(minutes=1))
+
+    assert await WebhookConsumer().drain_once() == 0
+    assert db.applied == [] and db.webhook_logs.get(event_id="evt_2")["status"] == STATUS_PENDING
+
+
+@pytest.mark.asyncio
+async def test_failing_event_backs_off_then_dead_letters(db, monkeypatch):
+    async def broken(payload):
+        raise RuntimeError("payments collection unavailable")
+
+    monkeypatch.setattr(webhook_processor, "apply_webhook_event", broken)
+    monkeypatch.setattr(webhook_processor.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 3)
+    await ingest_webhook("evt_1", captured("order_1", "pay_1"))
+    consumer = WebhookConsumer()
+    doc = db.webhook_logs.get(event_id="evt_1")
+
+    for attempt, delay in ((1, 2), (2, 4)):
+        before = datetime.utcnow()
+        assert await consumer.drain_once() == 1
+        assert doc["status"] == STATUS_RETRYING and doc["retry_count"] == attempt
+        assert doc["last_error"] == "payments collection unavailable"
+        assert doc["next_attempt_at"] >= before + timedelta(seconds=delay)
+        # Not ready until the backoff has passed
+        assert await consumer.drain_once() == 0
+        doc["next_attempt_at"] = datetime.utcnow() - timedelta(seconds=1)
+
+    assert await consumer.drain_once() == 1
+    assert doc["status"] == STATUS_DEAD_LETTER and doc["retry_count"] == 3
+    assert await consumer.drain_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_requeue_webhook_replays_dead_letter(db):
+    await ingest_webhook("evt_1", captured("order_1", "pay_1"))
+    doc = db.webhook_logs.get(event_id="evt_1")
+    doc.update(status=STATUS_DEAD_LETTER, retry_count=5, next_attempt_at=datetime.utcnow() + timedelta(days=1))
+
+    assert await requeue_webhook(str(doc["_id"]))
+    assert doc["status"] == STATUS_RETRYING and doc["retry_count"] == 0 and doc["replay_count"] == 1
+    assert await WebhookConsumer().drain_once() == 1
+    assert doc["status"] == STATUS_PROCESSED and db.applied == ["pay_1"]
+
+    # Processed events are never replayed
+    assert not await requeue_webhook(str(doc["_id"]))
+    assert doc["replay_count"] == 1